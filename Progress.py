@@ -4,54 +4,48 @@ st.set_page_config(page_title="📊 Aithletique – Progress Tracker", layout="c
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from database.logger import get_all_sessions
+from database.progress_queries import (
+    list_poses, get_sessions, get_feedback_summaries, get_session_summary,
+    count_sessions, get_streaks, get_daily_counts, get_pose_counts, get_rollup_version, since_days
+)
 import pandas as pd
 import matplotlib.pyplot as plt
 import calplot
 import altair as alt
-from datetime import timedelta
 
 st.title("📊 My Progress")
 st.markdown("Track your session history, performance, and feedback.")
 
-# Load Data
-data = get_all_sessions()
 
-if not data:
+@st.cache_resource(max_entries=16, show_spinner=False)
+def render_calendar(pose_filter, cutoff, rollup_version):
+    # rollup_version is part of the cache key: the figure is rebuilt only after new sessions
+    daily_counts = get_daily_counts(pose_filter, cutoff)
+    if not daily_counts:
+        return None
+    calendar_counts = pd.Series([count for _, count in daily_counts],
+                                index=pd.to_datetime([day for day, _ in daily_counts]), dtype=float)
+    fig, ax = calplot.calplot(calendar_counts, cmap='YlGn', colorbar=True, suptitle='Your Activity Calendar')
+    return fig
+
+
+# Load Data: only the filtered range is read; aggregates come from the rollup tables
+pose_options = list_poses()
+
+if not pose_options:
     st.info("No sessions logged yet. Start a workout or meditation session first.")
 else:
-    df = pd.DataFrame(data, columns=["ID", "Pose", "Reps", "Feedback", "Duration (sec)", "Date"])
-    df["Date"] = pd.to_datetime(df["Date"])
-    df = df.sort_values("Date", ascending=False)
-
-    def summarize_feedback(raw_text):
-        if not raw_text or pd.isna(raw_text):
-            return "❔ No feedback available."
-        parts = [p.strip() for p in raw_text.split(";") if p.strip()]
-        good = [p for p in parts if "✅" in p or "Good posture" in p or "Soft breathing" in p]
-        issues = [p for p in parts if "❌" in p or "Not breathing" in p or "Go deeper" in p or "Keep your head" in p]
-        tips = [p for p in parts if "Try" in p or "Hold" in p or "Slow" in p]
-        summary = ""
-        if good:
-            summary += f"✅ Good: {', '.join(good[:2])}. "
-        if issues:
-            summary += f"⚠️ Needs work: {', '.join(issues[:2])}. "
-        if tips:
-            summary += f"🔁 Tip: {', '.join(tips[:1])}."
-        return summary or "😐 Neutral session."
-
-    df["Feedback Summary"] = df["Feedback"].apply(summarize_feedback)
-
-    pose_options = df["Pose"].unique().tolist()
     selected_pose = st.selectbox("🧘 Filter by Pose:", ["All"] + pose_options)
-
-    filtered_df = df.copy()
-    if selected_pose != "All":
-        filtered_df = df[df["Pose"] == selected_pose]
+    pose_filter = None if selected_pose == "All" else selected_pose
 
     recent_days = st.slider("📅 Show sessions from last X days:", 1, 30, 7)
-    cutoff = pd.Timestamp.now() - pd.Timedelta(days=recent_days)
-    filtered_df = filtered_df[filtered_df["Date"] >= cutoff]
+    cutoff = since_days(recent_days)
+
+    filtered_df = pd.DataFrame(get_sessions(pose_filter, cutoff),
+                               columns=["ID", "Pose", "Reps", "Feedback", "Duration (sec)", "Date"])
+    filtered_df["Date"] = pd.to_datetime(filtered_df["Date"])
+    summaries = get_feedback_summaries(filtered_df["ID"].tolist())
+    filtered_df["Feedback Summary"] = filtered_df["ID"].map(summaries)
 
     # Tabs for cleaner UI
     tabs = st.tabs([
@@ -66,9 +60,8 @@ else:
 
     with tabs[1]:
         st.markdown("### 📈 Session Summary")
-        total_sessions = len(filtered_df)
-        total_duration = filtered_df["Duration (sec)"].sum()
-        most_common_pose = filtered_df["Pose"].mode()[0] if total_sessions > 0 else "N/A"
+        total_sessions, total_duration, most_common_pose = get_session_summary(pose_filter, cutoff)
+        most_common_pose = most_common_pose or "N/A"
         st.metric("Total Sessions", total_sessions)
         st.metric("Total Time (mins)", round(total_duration / 60, 1))
         st.metric("Most Frequent Pose", most_common_pose)
@@ -78,9 +71,7 @@ else:
     with tabs[2]:
         st.markdown("### 🎯 Weekly Goal Progress")
         weekly_goal = st.slider("Set your weekly session goal:", 1, 14, 5)
-        last_7_days = pd.Timestamp.now() - pd.Timedelta(days=7)
-        weekly_df = df[df["Date"] >= last_7_days]
-        weekly_sessions = len(weekly_df)
+        weekly_sessions = count_sessions(since=since_days(7))
         goal_percent = int((weekly_sessions / weekly_goal) * 100)
         goal_percent = min(goal_percent, 100)
         st.progress(goal_percent)
@@ -94,41 +85,14 @@ else:
 
     with tabs[3]:
         st.markdown("### 🔥 Streak Tracker")
-        session_dates = pd.to_datetime(filtered_df["Date"].dt.date).sort_values().unique()
-        current_streak = 0
-        longest_streak = 0
-        today = pd.Timestamp.today().normalize()
-        yesterday = today - timedelta(days=1)
-        previous_date = None
-        for date in reversed(session_dates):
-            if previous_date is None:
-                if date in [today, yesterday]:
-                    current_streak = 1
-                previous_date = date
-            else:
-                if (previous_date - date).days == 1:
-                    current_streak += 1
-                    previous_date = date
-                elif (previous_date - date).days > 1:
-                    break
-        streak = 1
-        for i in range(1, len(session_dates)):
-            if (session_dates[i] - session_dates[i - 1]).days == 1:
-                streak += 1
-            else:
-                longest_streak = max(longest_streak, streak)
-                streak = 1
-        longest_streak = max(longest_streak, streak)
+        current_streak, longest_streak = get_streaks(pose_filter, cutoff)
         st.metric("🔥 Current Streak (days)", current_streak)
         st.metric("🏅 Longest Streak", longest_streak)
 
     with tabs[4]:
         st.markdown("### 📅 Calendar View")
-        calendar_data = filtered_df.copy()
-        calendar_data["date"] = pd.to_datetime(calendar_data["Date"].dt.date)
-        calendar_counts = calendar_data.groupby("date").size()
-        if not calendar_counts.empty:
-            fig, ax = calplot.calplot(calendar_counts, cmap='YlGn', colorbar=True, suptitle='Your Activity Calendar')
+        fig = render_calendar(pose_filter, cutoff, get_rollup_version())
+        if fig is not None:
             st.pyplot(fig)
         else:
             st.info("No session data available to show calendar heatmap.")
@@ -147,8 +111,7 @@ else:
             ).properties(height=300)
             st.altair_chart(line_chart, use_container_width=True)
 
-            pose_counts = filtered_df["Pose"].value_counts().reset_index()
-            pose_counts.columns = ["Pose", "Sessions"]
+            pose_counts = pd.DataFrame(get_pose_counts(pose_filter, cutoff), columns=["Pose", "Sessions"])
             st.markdown("### 🏋️ Session Count by Pose")
             bar_chart = alt.Chart(pose_counts).mark_bar().encode(
                 x=alt.X("Pose:N"),
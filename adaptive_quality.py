@@ -0,0 +1,96 @@
+# backend/pose_detection/adaptive_quality.py
+
+import time
+from collections import deque
+
+# Quality levels from best to cheapest: (model_complexity, input scale)
+QUALITY_LEVELS = [
+    (2, 1.0),
+    (1, 1.0),
+    (1, 0.75),
+    (0, 0.75),
+    (0, 0.5),
+]
+
+
+class AdaptiveQualityController:
+    """
+    Picks the pose model complexity and input downscale that hold a target frame rate.
+
+    observe() is fed the inference time of every frame. Once a full window
+    has been measured at the current level, the controller steps down a level
+    when the window's mean exceeds the frame budget (1000 / target_fps ms),
+    and steps back up only when the mean is below `upgrade_ratio` of the
+    budget and the better level was not measured over budget within the
+    last `retry_seconds`. Every switch restarts the window and is followed
+    by a cooldown, so the level doesn't flap. set_levels() narrows or widens
+    the levels on offer, e.g. as models finish loading.
+    """
+
+    def __init__(self, target_fps=15.0, levels=QUALITY_LEVELS, start=(1, 1.0), window=30,
+                 upgrade_ratio=0.6, cooldown_seconds=3.0, retry_seconds=30.0):
+        self.target_fps = target_fps
+        self.budget_ms = 1000.0 / target_fps
+        self.levels = list(levels)
+        self.level = self.levels.index(start) if start in self.levels else 0
+        self.upgrade_ratio = upgrade_ratio
+        self.cooldown_seconds = cooldown_seconds
+        self.retry_seconds = retry_seconds
+        self._samples = deque(maxlen=window)
+        self._level_ms = {}
+        self._last_switch = time.monotonic()
+        self.switches = 0
+
+    @property
+    def settings(self):
+        return self.levels[self.level]
+
+    @property
+    def mean_ms(self):
+        return sum(self._samples) / len(self._samples) if self._samples else 0.0
+
+    def observe(self, inference_ms):
+        """Records one frame; returns the new (complexity, scale) when the level changes, else None."""
+        self._samples.append(inference_ms)
+        if len(self._samples) < self._samples.maxlen:
+            return None
+        now = time.monotonic()
+        if now - self._last_switch < self.cooldown_seconds:
+            return None
+
+        mean = self.mean_ms
+        self._level_ms[self.settings] = (mean, now)
+        if mean > self.budget_ms and self.level < len(self.levels) - 1:
+            return self._switch(self.level + 1, now)
+        if mean < self.budget_ms * self.upgrade_ratio and self.level > 0:
+            better_ms, measured_at = self._level_ms.get(self.levels[self.level - 1], (0.0, 0.0))
+            if better_ms <= self.budget_ms or now - measured_at > self.retry_seconds:
+                return self._switch(self.level - 1, now)
+        return None
+
+    def set_levels(self, levels):
+        """Replaces the available levels; the current one is kept if it is still among them."""
+        current = self.settings
+        self.levels = list(levels)
+        self.level = self.levels.index(current) if current in self.levels else 0
+
+    def _switch(self, level, now):
+        self.level = level
+        self._samples.clear()
+        self._last_switch = now
+        self.switches += 1
+        return self.settings
+
+    def describe(self):
+        complexity, scale = self.settings
+        return f"model {complexity} @ {scale:.0%} input"
+
+    def stats(self):
+        complexity, scale = self.settings
+        return {
+            "model_complexity": complexity,
+            "input_scale": scale,
+            "inference_ms": round(self.mean_ms, 1),
+            "target_fps": self.target_fps,
+            "switches": self.switches,
+        }
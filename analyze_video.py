@@ -0,0 +1,222 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import json
+import time
+import cv2
+import numpy as np
+from backend.pose_detection.mediapipe_model import PoseDetector
+from backend.feedback_engine.workout_rep_counter import WorkoutRepCounter
+from backend.feedback_engine.angle_engine import compute_angles
+from backend.feedback_engine.pose_comparator import check_enough_landmarks
+from backend.feedback_engine.motion_tools import load_motion_reference, StreamingMotionMatcher
+from backend.feedback_engine.reference_store import load_reference_index
+from backend.feedback_engine.pose_classifier_runtime import load_classifier
+
+# Headless scoring of recorded sessions: no Streamlit, no rendering, no sleeps.
+#   python analyze_video.py squat.mp4 --exercise squat --stride 2 --out squat_metrics.parquet
+#   python analyze_video.py tadasana.mp4 --pose-reference pose_references/tadasana.npz --classifier yoga_pose_model_fast.npz
+
+# Same rep-tracking joints and thresholds as the live workout entry points
+WORKOUT_CONFIGS = {
+    "squat": {"joints": (23, 25, 27), "down": 90, "up": 170},
+    "pushup": {"joints": (11, 13, 15), "down": 70, "up": 160},
+    "plank": {"joints": (11, 23, 25), "down": 160, "up": 170},
+    "pullup": {"joints": (13, 11, 23), "down": 80, "up": 150},
+}
+
+
+def iter_video_frames(video_path, stride=1):
+    """
+    Yields (frame_index, timestamp_seconds, frame) for every `stride`-th frame.
+    Skipped frames are only grabbed, not decoded into images.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open video: {video_path}")
+
+    frame_index = 0
+    try:
+        while True:
+            if frame_index % stride:
+                if not cap.grab():
+                    break
+            else:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield frame_index, cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0, frame
+            frame_index += 1
+    finally:
+        cap.release()
+
+
+def analyze_video(video_path, exercise=None, pose_reference=None, motion_reference=None,
+                  stride=1, detector=None, classifier=None):
+    """
+    Scores a recorded session as fast as decoding and inference allow.
+
+    exercise:         key of WORKOUT_CONFIGS to count reps (optional)
+    pose_reference:   yoga pose .npz to compute per-frame pose accuracy (optional)
+    motion_reference: *_motion.npz to compute motion similarity and rep phase
+                      (defaults to motion_references/<exercise>_motion.npz if present)
+    classifier:       exported fast pose classifier .npz; all frames are labelled in one batch
+
+    Returns:
+        (frame_metrics, summary): a list of per-frame dicts and a session summary dict.
+    """
+    detector = detector or PoseDetector()
+
+    rep_counter = None
+    angle_table = None
+    if exercise:
+        config = WORKOUT_CONFIGS[exercise]
+        rep_counter = WorkoutRepCounter(exercise, threshold_down=config["down"], threshold_up=config["up"])
+        angle_table = np.array([config["joints"]], dtype=np.intp)
+        if motion_reference is None:
+            default_motion = f"motion_references/{exercise}_motion.npz"
+            motion_reference = default_motion if os.path.exists(default_motion) else None
+
+    reference_index = load_reference_index(pose_reference) if pose_reference else None
+    matcher = None
+    if motion_reference:
+        reference_motion = load_motion_reference(motion_reference)
+        if reference_motion is not None:
+            matcher = StreamingMotionMatcher(reference_motion, band=30)
+
+    frame_metrics = []
+    classified_frames, classified_landmarks = [], []
+    reps = 0
+    started = time.perf_counter()
+
+    for frame_index, timestamp, frame in iter_video_frames(video_path, stride):
+        infer_start = time.perf_counter()
+        results = detector.detect_pose(frame)
+        landmarks = detector.get_landmark_array(results)
+
+        metrics = {
+            "frame": frame_index,
+            "time": round(timestamp, 3),
+            "detected": landmarks is not None,
+            "visible": False,
+            "inference_ms": round((time.perf_counter() - infer_start) * 1000.0, 2),
+        }
+
+        if landmarks is not None:
+            metrics["visible"] = check_enough_landmarks(landmarks)
+
+            if angle_table is not None:
+                angle = float(compute_angles(landmarks, angle_table)[0])
+                if rep_counter.update(angle):
+                    reps += 1
+                metrics["angle"] = round(angle, 2)
+                metrics["reps"] = reps
+
+            if reference_index is not None:
+                accuracy, best_index, _ = reference_index.match(landmarks)
+                metrics["pose_accuracy"] = round(float(accuracy), 2)
+                metrics["best_reference"] = best_index
+
+            if matcher is not None:
+                score, phase = matcher.update(landmarks)
+                metrics["motion_score"] = round(float(score), 2)
+                metrics["motion_phase"] = None if phase is None else round(phase, 3)
+
+            if classifier:
+                classified_frames.append(metrics)
+                classified_landmarks.append(landmarks.ravel().copy())
+
+        frame_metrics.append(metrics)
+
+    if classified_landmarks:
+        predicted = load_classifier(classifier).predict(np.stack(classified_landmarks))
+        for metrics, label in zip(classified_frames, predicted):
+            metrics["pose_label"] = str(label)
+
+    elapsed = time.perf_counter() - started
+    summary = summarize_metrics(frame_metrics, elapsed)
+    summary.update({"video": video_path, "exercise": exercise, "stride": stride})
+    if rep_counter is not None:
+        summary["reps"] = reps
+    return frame_metrics, summary
+
+
+def summarize_metrics(frame_metrics, elapsed_seconds):
+    analyzed = len(frame_metrics)
+    detected = sum(1 for m in frame_metrics if m["detected"])
+    video_seconds = frame_metrics[-1]["time"] if frame_metrics else 0.0
+
+    summary = {
+        "frames_analyzed": analyzed,
+        "detection_rate": round(detected / analyzed, 3) if analyzed else 0.0,
+        "visible_rate": round(sum(1 for m in frame_metrics if m["visible"]) / analyzed, 3) if analyzed else 0.0,
+        "video_seconds": video_seconds,
+        "processing_seconds": round(elapsed_seconds, 2),
+        "processing_fps": round(analyzed / elapsed_seconds, 1) if elapsed_seconds > 0 else 0.0,
+        "realtime_factor": round(video_seconds / elapsed_seconds, 2) if elapsed_seconds > 0 else 0.0,
+    }
+
+    labels = [m["pose_label"] for m in frame_metrics if "pose_label" in m]
+    if labels:
+        values, counts = np.unique(labels, return_counts=True)
+        summary["dominant_pose"] = str(values[np.argmax(counts)])
+
+    for key in ("pose_accuracy", "motion_score", "inference_ms"):
+        values = [m[key] for m in frame_metrics if m.get(key) is not None]
+        if values:
+            summary[f"mean_{key}"] = round(float(np.mean(values)), 2)
+            summary[f"max_{key}"] = round(float(np.max(values)), 2)
+    return summary
+
+
+def write_metrics(frame_metrics, path):
+    """Writes per-frame metrics as .parquet, .jsonl (one object per line) or .json."""
+    if path.endswith(".parquet"):
+        import pandas as pd
+
+        pd.DataFrame(frame_metrics).to_parquet(path, index=False)
+    elif path.endswith(".jsonl"):
+        with open(path, "w") as f:
+            for metrics in frame_metrics:
+                f.write(json.dumps(metrics) + "\n")
+    else:
+        with open(path, "w") as f:
+            json.dump(frame_metrics, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a recorded session without the Streamlit UI.")
+    parser.add_argument("video")
+    parser.add_argument("--exercise", choices=sorted(WORKOUT_CONFIGS), help="count reps for this workout")
+    parser.add_argument("--pose-reference", help="yoga pose .npz for per-frame pose accuracy")
+    parser.add_argument("--motion-reference", help="*_motion.npz for motion similarity")
+    parser.add_argument("--classifier", help="exported fast pose classifier .npz to label every frame")
+    parser.add_argument("--stride", type=int, default=1, help="analyze every N-th frame")
+    parser.add_argument("--out", help="per-frame metrics file (.parquet, .jsonl or .json)")
+    parser.add_argument("--summary", help="session summary .json (printed if omitted)")
+    args = parser.parse_args()
+
+    frame_metrics, summary = analyze_video(
+        args.video,
+        exercise=args.exercise,
+        pose_reference=args.pose_reference,
+        motion_reference=args.motion_reference,
+        stride=max(1, args.stride),
+        classifier=args.classifier,
+    )
+
+    if args.out:
+        write_metrics(frame_metrics, args.out)
+        print(f"✅ Saved {len(frame_metrics)} frame metrics to: {args.out}")
+    if args.summary:
+        with open(args.summary, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"✅ Saved session summary to: {args.summary}")
+    else:
+        print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
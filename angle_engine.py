@@ -0,0 +1,62 @@
+# backend/feedback_engine/angle_engine.py
+
+import numpy as np
+
+
+def compile_triplets(triplets):
+    """
+    Turns joint triplets into an index table for compute_angles.
+
+    Accepts either a list of (a, b, c) landmark indices or a
+    {label: (a, b, c)} dict, where b is the vertex of the angle.
+
+    Returns:
+        (labels, table) where table is a (K, 3) int array and labels is a
+        list of K names (None for a plain list).
+    """
+    if isinstance(triplets, dict):
+        labels = list(triplets.keys())
+        rows = list(triplets.values())
+    else:
+        labels = [None] * len(triplets)
+        rows = list(triplets)
+    table = np.asarray(rows, dtype=np.intp).reshape(-1, 3)
+    return labels, table
+
+
+def compute_angles(landmarks, table, dims=2):
+    """
+    Computes every joint angle in `table` for every frame in one call.
+
+    landmarks: (33, C) array for a single frame or (N, 33, C) for a sequence,
+               with C >= dims (x, y[, z, visibility]).
+    table:     (K, 3) int array of (a, b, c) indices, b being the vertex.
+    dims:      2 to measure in the image plane (x, y), 3 to include z.
+
+    Returns:
+        (K,) or (N, K) array of angles in degrees, in [0, 180].
+    """
+    points = np.asarray(landmarks, dtype=np.float64)[..., :dims]
+    table = np.asarray(table, dtype=np.intp)
+
+    a = points[..., table[:, 0], :]
+    b = points[..., table[:, 1], :]
+    c = points[..., table[:, 2], :]
+    ba = a - b
+    bc = c - b
+
+    dot = np.einsum("...i,...i->...", ba, bc)
+    if dims == 2:
+        cross = np.abs(ba[..., 0] * bc[..., 1] - ba[..., 1] * bc[..., 0])
+    else:
+        cross = np.linalg.norm(np.cross(ba, bc), axis=-1)
+
+    # atan2(|ba x bc|, ba . bc) is the unsigned angle, stable near 0 and 180 degrees.
+    return np.degrees(np.arctan2(cross, dot))
+
+
+def compute_named_angles(landmarks, triplets, dims=2):
+    """Convenience wrapper returning {label: angle} for a single frame."""
+    labels, table = compile_triplets(triplets)
+    angles = compute_angles(landmarks, table, dims=dims)
+    return dict(zip(labels, angles.tolist()))
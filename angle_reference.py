@@ -0,0 +1,107 @@
+# backend/feedback_engine/angle_reference.py
+
+import sys
+import os
+import glob
+import numpy as np
+
+from backend.feedback_engine.reference_store import get_reference_store
+
+# Angle references are stored as a flat .npy structured array:
+#   one float32 "frame_time" column (seconds from video start),
+#   then one float32 column per joint, named after the joint.
+# All fields are float32 and packed, so the file can be memory-mapped and
+# viewed as a (frames, 1 + joints) float32 matrix without copying.
+FRAME_TIME = "frame_time"
+LEGACY_SUFFIX = "_angles_reference.npy"
+SUFFIX = "_angles.npy"
+DEFAULT_LEGACY_FPS = 30.0
+
+
+class AngleReference:
+    """Read-only view over a columnar angle reference table."""
+
+    def __init__(self, table):
+        self.table = table
+        self.joints = [name for name in table.dtype.names if name != FRAME_TIME]
+        self._joint_index = {name: i for i, name in enumerate(self.joints)}
+        matrix = table.view(np.float32).reshape(len(table), len(table.dtype.names))
+        self.frame_time = matrix[:, 0]
+        self.matrix = matrix[:, 1:]
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def fps(self):
+        if len(self) < 2:
+            return DEFAULT_LEGACY_FPS
+        return float(1.0 / np.median(np.diff(self.frame_time)))
+
+    def joint_indices(self, joints):
+        """Column index for each joint name, -1 where the reference has no such joint."""
+        return np.array([self._joint_index.get(name, -1) for name in joints], dtype=np.intp)
+
+    def column(self, joint):
+        return self.matrix[:, self._joint_index[joint]]
+
+    def get(self, frame_index, joint, default=None):
+        col = self._joint_index.get(joint)
+        if col is None or frame_index >= len(self):
+            return default
+        return float(self.matrix[frame_index, col])
+
+
+def save_angle_reference(path, joints, angles, frame_times):
+    """
+    Writes an (N, K) angle matrix with its joint names and per-frame times.
+    """
+    angles = np.asarray(angles, dtype=np.float32).reshape(len(frame_times), len(joints))
+    dtype = np.dtype([(FRAME_TIME, "<f4")] + [(name, "<f4") for name in joints])
+    table = np.empty(len(frame_times), dtype=dtype)
+    table[FRAME_TIME] = frame_times
+    for i, name in enumerate(joints):
+        table[name] = angles[:, i]
+    np.save(path, table)
+
+
+def load_angle_reference(path):
+    """Memory-maps an angle reference through the shared reference store."""
+    return get_reference_store().get(
+        path,
+        "angle_reference",
+        lambda abs_path: AngleReference(np.load(abs_path, mmap_mode="r")),
+    )
+
+
+def convert_legacy_angle_reference(src_path, dst_path, fps=DEFAULT_LEGACY_FPS):
+    """
+    Converts a pickled list-of-dicts *_angles_reference.npy file.
+    Legacy files don't record timing, so frames are assumed to be 1/fps apart.
+    """
+    records = np.load(src_path, allow_pickle=True)
+    joints = []
+    for record in records:
+        for name in record:
+            if name not in joints:
+                joints.append(name)
+
+    angles = np.array(
+        [[record.get(name, np.nan) for name in joints] for record in records],
+        dtype=np.float32,
+    )
+    frame_times = np.arange(len(records), dtype=np.float32) / fps
+    save_angle_reference(dst_path, joints, angles, frame_times)
+    return len(records), joints
+
+
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else "pose_references"
+    legacy_files = sorted(glob.glob(os.path.join(folder, f"*{LEGACY_SUFFIX}")))
+    if not legacy_files:
+        print(f"❌ No *{LEGACY_SUFFIX} files found in {folder}")
+
+    for src in legacy_files:
+        dst = src[: -len(LEGACY_SUFFIX)] + SUFFIX
+        count, joints = convert_legacy_angle_reference(src, dst)
+        print(f"✅ {os.path.basename(src)} -> {os.path.basename(dst)} ({count} frames, joints: {', '.join(joints)})")
@@ -0,0 +1,336 @@
+# backend/voice/audio_service.py
+
+import os
+import glob
+import heapq
+import threading
+import time
+from backend.voice.speech_cache import SpeechCache
+
+VOICE_DIR = os.path.join("backend", "voice", "voice_feedback_clips")
+DEFAULT_CLIP_DIRS = [VOICE_DIR, "voice_feedback", "."]
+
+# Priorities: lower plays first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class AudioClip:
+    """A voice clip, decoded to PCM when a decoder is available, otherwise just its file."""
+
+    __slots__ = ("path", "pcm", "channels", "sample_width", "sample_rate")
+
+    def __init__(self, path, pcm=None, channels=1, sample_width=2, sample_rate=22050):
+        self.path = path
+        self.pcm = pcm
+        self.channels = channels
+        self.sample_width = sample_width
+        self.sample_rate = sample_rate
+
+
+def decode_clip(path):
+    """Decodes an audio file into memory with pydub, falling back to a file-backed clip."""
+    try:
+        from pydub import AudioSegment
+
+        segment = AudioSegment.from_file(path)
+        return AudioClip(path, segment.raw_data, segment.channels, segment.sample_width, segment.frame_rate)
+    except Exception:
+        return AudioClip(path)
+
+
+def play_clip(clip):
+    """Blocking playback; only ever called from the audio worker thread."""
+    if clip.pcm is not None:
+        try:
+            import simpleaudio
+
+            simpleaudio.play_buffer(clip.pcm, clip.channels, clip.sample_width, clip.sample_rate).wait_done()
+            return
+        except ImportError:
+            pass
+    from playsound import playsound
+
+    playsound(clip.path)
+
+
+# Synthesis backends turn text into an audio file. `name`, `voice` and
+# `language` identify the output in the speech cache, `extension` is the file
+# type written and `concurrency` how many syntheses may run at once.
+
+
+class NullSynthesisBackend:
+    """Offline backend that never synthesizes; unknown messages are skipped."""
+
+    name = "none"
+    voice = ""
+    language = "en"
+    extension = "wav"
+    concurrency = 1
+
+    def synthesize(self, text, out_path):
+        return None
+
+
+class Pyttsx3SynthesisBackend:
+    """Offline text-to-speech through the system voices (pyttsx3)."""
+
+    name = "pyttsx3"
+    language = "en"
+    extension = "wav"
+    concurrency = 1  # the driver isn't thread-safe
+
+    def __init__(self, rate=170, voice=None):
+        import pyttsx3
+
+        self.engine = pyttsx3.init()
+        self.engine.setProperty("rate", rate)
+        if voice:
+            self.engine.setProperty("voice", voice)
+        self.voice = f"{voice or 'default'}@{rate}"
+
+    def synthesize(self, text, out_path):
+        self.engine.save_to_file(text, out_path)
+        self.engine.runAndWait()
+        return out_path if os.path.exists(out_path) else None
+
+
+class GTTSSynthesisBackend:
+    """Google text-to-speech; needs the network, so only meant for pre-generation."""
+
+    name = "gtts"
+    voice = "default"
+    extension = "mp3"
+    concurrency = 8
+
+    def __init__(self, language="en"):
+        self.language = language
+
+    def synthesize(self, text, out_path):
+        from gtts import gTTS
+
+        gTTS(text=text, lang=self.language).save(out_path)
+        return out_path
+
+
+class ToneSynthesisBackend:
+    """
+    Local engine with no dependencies: writes a short tone sequence derived
+    from the text. Deterministic and offline, for tests and headless machines.
+    """
+
+    name = "tone"
+    voice = "sine"
+    language = "en"
+    extension = "wav"
+    concurrency = 8
+
+    def __init__(self, sample_rate=16000, seconds_per_word=0.12):
+        self.sample_rate = sample_rate
+        self.seconds_per_word = seconds_per_word
+
+    def synthesize(self, text, out_path):
+        import math
+        import struct
+        import wave
+
+        frames = bytearray()
+        samples_per_word = int(self.sample_rate * self.seconds_per_word)
+        for word in text.split() or [text]:
+            frequency = 300 + sum(map(ord, word)) % 500
+            for i in range(samples_per_word):
+                frames += struct.pack("<h", int(8000 * math.sin(2 * math.pi * frequency * i / self.sample_rate)))
+
+        with wave.open(out_path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            f.writeframes(bytes(frames))
+        return out_path
+
+
+SYNTHESIS_BACKENDS = {
+    "pyttsx3": Pyttsx3SynthesisBackend,
+    "gtts": GTTSSynthesisBackend,
+    "tone": ToneSynthesisBackend,
+    "none": NullSynthesisBackend,
+}
+
+
+def feedback_messages():
+    """{tag: sentence} for the tagged feedback lines pregenerate_speech.py renders."""
+    from backend.feedback_engine.yoga_feedback_engine import feedback_lines
+    from backend.voice.generate_clips import feedback_lines as clip_lines
+
+    messages = {tag: lines[0] for tag, lines in feedback_lines.items() if lines}
+    messages.update(clip_lines)
+    return messages
+
+
+def default_synthesis_backend():
+    try:
+        return Pyttsx3SynthesisBackend()
+    except Exception:
+        return NullSynthesisBackend()
+
+
+class AudioOutputService:
+    """
+    Plays voice feedback on its own worker thread.
+
+    speak() only pushes onto a priority queue and returns immediately. A
+    message already waiting under the same key is merged (replaced by the
+    newest text) instead of queued twice, and messages that waited longer
+    than their max_age are dropped rather than played late. Recorded clips
+    are decoded into memory when the worker starts, along with the speech
+    cache entries made by the active backend (same engine, voice and
+    language). A tag without a recorded clip is spoken as its sentence from
+    `messages` (the feedback lines by default), so it finds the pre-generated
+    clip; anything else is synthesized by the offline backend (never the
+    network) and added to the cache for the next session.
+    """
+
+    def __init__(self, clip_dirs=None, backend=None, speech_cache=None, max_age=3.0, max_pending=8,
+                 messages=None):
+        self.clip_dirs = DEFAULT_CLIP_DIRS if clip_dirs is None else clip_dirs
+        self.backend = backend
+        self.speech_cache = speech_cache
+        self.messages = feedback_messages() if messages is None else messages
+        self.max_age = max_age
+        self.max_pending = max_pending
+
+        self.clips = {}
+        self.speech_clips = {}
+        self._heap = []
+        self._pending = {}
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+
+        self.played = 0
+        self.dropped = 0
+        self.merged = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audio-output", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def preload(self):
+        for clip_dir in self.clip_dirs:
+            for path in glob.glob(os.path.join(clip_dir, "*.mp3")) + glob.glob(os.path.join(clip_dir, "*.wav")):
+                tag = os.path.splitext(os.path.basename(path))[0]
+                self.clips.setdefault(tag, decode_clip(path))
+
+        if self.speech_cache is None:
+            self.speech_cache = SpeechCache()
+        if self.backend is None:
+            self.backend = default_synthesis_backend()
+        # Only clips this backend would produce; other engines' entries keep their own keys
+        for text, path in self.speech_cache.entries():
+            if path == self.speech_cache.path_for(text, self.backend):
+                self.speech_clips[self.speech_cache.key_for(text, self.backend)] = decode_clip(path)
+
+    def speak(self, tag_or_message, text=None, priority=PRIORITY_NORMAL, max_age=None):
+        """
+        Queues a clip tag (e.g. "pose_correct") or a free-text message.
+        `text` is what to synthesize if `tag_or_message` has no clip.
+        """
+        now = time.monotonic()
+        with self._cond:
+            entry = self._pending.get(tag_or_message)
+            if entry is not None:
+                entry["text"] = text
+                entry["queued_at"] = now
+                self.merged += 1
+                return
+
+            if len(self._pending) >= self.max_pending:
+                # Full: drop whichever is less urgent, the new message or the
+                # least urgent queued one (the oldest of those on a tie)
+                worst = min(self._heap, key=lambda item: (-item[0], item[1]))
+                if priority > worst[0]:
+                    self.dropped += 1
+                    return
+                self._heap.remove(worst)
+                heapq.heapify(self._heap)
+                del self._pending[worst[2]]
+                self.dropped += 1
+
+            self._seq += 1
+            heapq.heappush(self._heap, (priority, self._seq, tag_or_message))
+            self._pending[tag_or_message] = {
+                "text": text,
+                "queued_at": now,
+                "max_age": self.max_age if max_age is None else max_age,
+            }
+            self._cond.notify()
+
+    def _next_message(self):
+        with self._cond:
+            while True:
+                self._cond.wait_for(lambda: self._heap or self._stopped)
+                if self._stopped:
+                    return None
+                _, _, key = heapq.heappop(self._heap)
+                entry = self._pending.pop(key)
+                if time.monotonic() - entry["queued_at"] > entry["max_age"]:
+                    self.dropped += 1
+                    continue
+                return key, entry["text"]
+
+    def _clip_for(self, key, text):
+        clip = self.clips.get(key)
+        if clip is not None:
+            return clip
+        text = text or self.messages.get(key) or key
+        clip = self.clips.get(text)
+        if clip is not None:
+            return clip
+
+        speech_key = self.speech_cache.key_for(text, self.backend)
+        clip = self.speech_clips.get(speech_key)
+        if clip is not None:
+            return clip
+        path = self.speech_cache.put(text, self.backend)
+        if path is None:
+            return None
+        clip = self.speech_clips[speech_key] = decode_clip(path)
+        return clip
+
+    def _run(self):
+        self.preload()
+        while True:
+            message = self._next_message()
+            if message is None:
+                return
+            try:
+                clip = self._clip_for(*message)
+                if clip is not None:
+                    play_clip(clip)
+                    self.played += 1
+            except Exception as e:
+                print(f"[Voice Error] Could not play '{message[0]}': {e}")
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_audio_service():
+    """The process-wide audio service, started on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = AudioOutputService().start()
+        return _service
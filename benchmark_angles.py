@@ -0,0 +1,78 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+import numpy as np
+from backend.feedback_engine.angles import calculate_angle, calculate_angle_from_landmarks
+from backend.feedback_engine import pose_comparator
+from backend.feedback_engine.angle_engine import compile_triplets, compute_angles
+
+# Compares the scalar angle helpers with the batched angle engine on a recorded
+# landmark sequence (defaults to the squat motion reference).
+
+WORKOUT_TRIPLETS = [(23, 25, 27), (11, 23, 24), (25, 27, 29), (11, 13, 15), (13, 11, 23)]
+
+
+def time_it(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scalar vs batched joint-angle computation.")
+    parser.add_argument("--sequence", default="motion_references/squat_motion.npz")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if os.path.exists(args.sequence):
+        sequence = np.load(args.sequence)["landmarks"].astype(np.float32)
+    else:
+        print(f"⚠️ {args.sequence} not found, using random landmarks.")
+        sequence = np.random.default_rng(0).random((400, 33, 4), dtype=np.float32)
+
+    n_frames = len(sequence)
+    _, workout_table = compile_triplets(WORKOUT_TRIPLETS)
+    print(f"📊 {n_frames} frames, {len(WORKOUT_TRIPLETS)} workout triplets, "
+          f"{len(pose_comparator.IMPORTANT_ANGLE_PAIRS)} comparator triplets\n")
+
+    rows = []
+
+    # 2D workout angles
+    t_scalar, scalar = time_it(lambda: np.array([
+        [calculate_angle_from_landmarks(frame, a, b, c) for a, b, c in WORKOUT_TRIPLETS]
+        for frame in sequence
+    ]), args.repeat)
+    t_cos, cos_based = time_it(lambda: np.array([
+        [calculate_angle(frame[a][:2], frame[b][:2], frame[c][:2]) for a, b, c in WORKOUT_TRIPLETS]
+        for frame in sequence
+    ]), args.repeat)
+    t_frame, _ = time_it(lambda: [compute_angles(frame, workout_table) for frame in sequence], args.repeat)
+    t_batch, batched = time_it(lambda: compute_angles(sequence, workout_table), args.repeat)
+    rows.append(("angles.calculate_angle_from_landmarks", t_scalar, np.abs(scalar - batched).max()))
+    rows.append(("angles.calculate_angle", t_cos, np.abs(cos_based - batched).max()))
+    rows.append(("angle_engine, one call per frame", t_frame, 0.0))
+    rows.append(("angle_engine, whole sequence", t_batch, 0.0))
+
+    # 3D comparator angles
+    t_old, old = time_it(lambda: np.array([
+        [pose_comparator.calculate_angle(frame[a][:3], frame[b][:3], frame[c][:3])
+         for a, b, c in pose_comparator.IMPORTANT_ANGLE_PAIRS]
+        for frame in sequence
+    ]), args.repeat)
+    t_new, new = time_it(lambda: pose_comparator.extract_important_angles_batch(sequence), args.repeat)
+    rows.append(("pose_comparator.calculate_angle", t_old, np.abs(old - new).max()))
+    rows.append(("extract_important_angles_batch", t_new, 0.0))
+
+    print(f"{'method':<42}{'total ms':>10}{'us/frame':>10}{'max diff°':>11}")
+    for name, seconds, diff in rows:
+        print(f"{name:<42}{seconds * 1000:>10.2f}{seconds / n_frames * 1e6:>10.1f}{diff:>11.4f}")
+
+
+if __name__ == "__main__":
+    main()
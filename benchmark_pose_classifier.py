@@ -0,0 +1,108 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import glob
+import argparse
+import pickle
+import time
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.linear_model import LogisticRegression
+from sklearn.neural_network import MLPClassifier
+from sklearn.neighbors import KNeighborsClassifier
+from pose_dataset import PoseDataset
+from backend.feedback_engine.pose_classifier_runtime import FastPoseClassifier, export_classifier
+
+# Compares the pickled RBF SVC with NumPy-exported fast classifiers on the same
+# held-out split train_pose_classifier.py uses, then saves the best fast model.
+# These models are trained on raw, un-normalized features, so they are saved
+# next to the live model rather than over it; train_pose_classifier.py is what
+# exports yoga_pose_model_fast.npz and its manifest.
+
+DATASET_PATH = "pose_dataset"
+SVC_MODEL_PATH = "yoga_pose_model.pkl"
+BENCHMARK_MODEL_PATH = "yoga_pose_model_benchmark.npz"
+
+
+def per_sample_latency_us(predict_one, samples, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for sample in samples:
+            predict_one(sample)
+        best = min(best, time.perf_counter() - start)
+    return best / len(samples) * 1e6
+
+
+def batch_latency_us(predict_batch, X, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict_batch(X)
+        best = min(best, time.perf_counter() - start)
+    return best / len(X) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fast pose classifiers against the SVC.")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--svc", default=SVC_MODEL_PATH)
+    parser.add_argument("--out", default=BENCHMARK_MODEL_PATH)
+    args = parser.parse_args()
+
+    dataset = PoseDataset(args.dataset)
+    X = np.asarray(dataset.features())
+    label_encoder = LabelEncoder()
+    y = label_encoder.fit_transform(dataset.labels())
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    labels = label_encoder.classes_
+
+    scaler = StandardScaler().fit(X_train)
+    X_train_std = scaler.transform(X_train)
+
+    rows = []
+    try:
+        with open(args.svc, "rb") as f:
+            svc = pickle.load(f)
+        svc_acc = float((svc.predict(X_test) == y_test).mean())
+        rows.append(("SVC (rbf, probability=True)", svc_acc,
+                     per_sample_latency_us(lambda s: svc.predict_proba(s.reshape(1, -1)), X_test),
+                     batch_latency_us(svc.predict_proba, X_test)))
+    except FileNotFoundError:
+        print(f"⚠️ {args.svc} not found, skipping the SVC baseline.")
+
+    candidates = {
+        "linear": LogisticRegression(max_iter=2000, class_weight="balanced"),
+        "mlp": MLPClassifier(hidden_layer_sizes=(64,), max_iter=2000, random_state=42),
+        "knn": KNeighborsClassifier(n_neighbors=3),
+    }
+
+    best_name, best_acc = None, -1.0
+    for name, model in candidates.items():
+        model.fit(X_train_std, y_train)
+        path = f"{args.out}.{name}.tmp.npz"
+        export_classifier(model, path, labels, scaler)
+        fast = FastPoseClassifier.load(path)
+
+        acc = float((fast.predict_codes(X_test) == y_test).mean())
+        rows.append((f"fast {name}", acc,
+                     per_sample_latency_us(fast.predict_proba, X_test),
+                     batch_latency_us(fast.predict_proba, X_test)))
+        if acc > best_acc:
+            best_name, best_acc = name, acc
+            export_classifier(model, args.out, labels, scaler)
+
+    print(f"\n📊 Held-out split: {len(X_test)} samples, {len(labels)} classes\n")
+    print(f"{'model':<30}{'accuracy':>10}{'us/frame':>12}{'us/sample batched':>20}")
+    for name, acc, single, batched in rows:
+        print(f"{name:<30}{acc:>10.3f}{single:>12.1f}{batched:>20.1f}")
+    print(f"\n✅ Saved best fast model ({best_name}, accuracy {best_acc:.3f}) to: {args.out}")
+
+    for tmp in glob.glob(f"{args.out}.*.tmp.npz"):
+        os.remove(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from backend.pose_detection.landmark_cache import extract_video_landmarks, CACHE_DIR
+from backend.feedback_engine.angle_engine import compile_triplets, compute_angles
+from backend.feedback_engine.angle_reference import save_angle_reference
+
+# Builds every reference from workout_videos/*_correct.mp4 in one pass:
+#   pose_references/<name>_reference.npy   mean pose (x, y, z of 33 landmarks)
+#   pose_references/<name>_angles.npy      per-frame joint angle table
+#   motion_references/<name>_motion.npz    motion sequence (every 5th frame)
+# Landmarks are extracted once per video into the landmark cache and every
+# reference is derived from that, so re-running only re-derives.
+
+angle_joints = {
+    "squat": {
+        "hip": (23, 25, 27),
+        "back": (11, 23, 24)
+    },
+    "pushup": {
+        "elbow": (11, 13, 15),
+        "back": (11, 23, 24)
+    },
+    "plank": {
+        "shoulder_hip_knee": (11, 23, 25),
+        "back": (11, 23, 24)
+    },
+    "pullup": {
+        "elbow_shoulder_hip": (13, 11, 23),
+        "back": (11, 23, 24)
+    }
+}
+
+MOTION_STRIDE = 5
+
+
+def build_video_references(video_path, name, output_dir, motion_dir, model_complexity, cache_dir):
+    data = extract_video_landmarks(video_path, model_complexity=model_complexity, cache_dir=cache_dir)
+    landmarks, valid, times = data["landmarks"], data["valid"], data["times"]
+    messages = [f"⏳ {name}: {len(valid)} frames, {int(valid.sum())} with a pose"]
+
+    if not valid.any():
+        messages.append(f"❌ No valid poses found for {name}")
+        return messages
+
+    posed = landmarks[valid]
+
+    # Mean pose
+    mean_path = os.path.join(output_dir, f"{name}_reference.npy")
+    np.save(mean_path, posed[:, :, :3].reshape(len(posed), -1).mean(axis=0, dtype=np.float64))
+    messages.append(f"✅ Saved: {mean_path}")
+
+    # Angle series
+    if name in angle_joints:
+        labels, table = compile_triplets(angle_joints[name])
+        angles_path = os.path.join(output_dir, f"{name}_angles.npy")
+        save_angle_reference(angles_path, labels, compute_angles(posed, table), times[valid])
+        messages.append(f"✅ Saved: {angles_path}")
+    else:
+        messages.append(f"🟡 No angle config for {name}, skipping angle reference")
+
+    # Motion sequence: every MOTION_STRIDE-th frame that has a pose
+    sampled = np.arange(MOTION_STRIDE - 1, len(valid), MOTION_STRIDE)
+    sampled = sampled[valid[sampled]]
+    if len(sampled):
+        motion_path = os.path.join(motion_dir, f"{name}_motion.npz")
+        np.savez_compressed(motion_path, landmarks=landmarks[sampled].astype(np.float64))
+        messages.append(f"✅ Saved: {motion_path}")
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build pose, angle and motion references from workout videos.")
+    parser.add_argument("--videos", default="workout_videos")
+    parser.add_argument("--output", default="pose_references")
+    parser.add_argument("--motion-output", default="motion_references")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--model-complexity", type=int, default=1, choices=[0, 1, 2])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    os.makedirs(args.motion_output, exist_ok=True)
+
+    jobs = {
+        file.replace("_correct.mp4", "").lower(): os.path.join(args.videos, file)
+        for file in sorted(os.listdir(args.videos))
+        if file.endswith("_correct.mp4")
+    }
+    if not jobs:
+        print(f"❌ No *_correct.mp4 videos found in {args.videos}")
+        return
+
+    # One MediaPipe instance per worker process; spawn avoids forking its native state.
+    workers = max(1, min(args.workers or 1, len(jobs)))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {
+            pool.submit(build_video_references, path, name, args.output, args.motion_output,
+                        args.model_complexity, args.cache_dir): name
+            for name, path in jobs.items()
+        }
+        for future in as_completed(futures):
+            try:
+                for message in future.result():
+                    print(message)
+            except Exception as e:
+                print(f"❌ Failed to build references for {futures[future]}: {e}")
+
+
+if __name__ == "__main__":
+    main()
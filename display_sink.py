@@ -0,0 +1,91 @@
+# backend/pose_detection/display_sink.py
+
+import time
+
+import cv2
+import numpy as np
+
+
+class DisplaySink:
+    """
+    Sends preview frames to a Streamlit image placeholder as in-memory JPEGs.
+
+    Frames are downscaled to at most `max_width` pixels wide (into a reused
+    buffer) and encoded at `quality`. At most `max_fps` frames per second are
+    sent; when encoding plus the push to the browser takes longer than the
+    frame interval, the interval stretches to match, so slow clients get
+    fewer frames instead of a growing backlog. Skipped frames cost nothing.
+    """
+
+    def __init__(self, placeholder, max_width=640, quality=70, max_fps=15.0, use_container_width=True):
+        self.placeholder = placeholder
+        self.max_width = max_width
+        self.quality = quality
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.use_container_width = use_container_width
+        self._params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        self._resized = None
+        self._next_show = 0.0
+
+        self.frames_shown = 0
+        self.frames_skipped = 0
+        self.encode_ms = 0.0
+        self.push_ms = 0.0
+        self.bytes_per_frame = 0.0
+        self.total_bytes = 0
+
+    def _downscale(self, frame):
+        height, width = frame.shape[:2]
+        if width <= self.max_width:
+            return frame
+        size = (self.max_width, int(round(height * self.max_width / width)))
+        if self._resized is None or self._resized.shape[:2] != size[::-1] or self._resized.dtype != frame.dtype:
+            self._resized = np.empty((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype)
+        return cv2.resize(frame, size, dst=self._resized, interpolation=cv2.INTER_AREA)
+
+    def show(self, frame, force=False):
+        """Sends a BGR frame unless the sink is rate limited. Returns True if it was sent."""
+        now = time.perf_counter()
+        if not force and now < self._next_show:
+            self.frames_skipped += 1
+            return False
+
+        ok, encoded = cv2.imencode(".jpg", self._downscale(frame), self._params)
+        encoded_at = time.perf_counter()
+        if not ok:
+            self.frames_skipped += 1
+            return False
+
+        self.placeholder.image(encoded.tobytes(), use_container_width=self.use_container_width)
+        done = time.perf_counter()
+
+        encode_ms = (encoded_at - now) * 1000.0
+        push_ms = (done - encoded_at) * 1000.0
+        if self.frames_shown == 0:
+            self.encode_ms, self.push_ms, self.bytes_per_frame = encode_ms, push_ms, float(encoded.size)
+        else:
+            self.encode_ms = 0.9 * self.encode_ms + 0.1 * encode_ms
+            self.push_ms = 0.9 * self.push_ms + 0.1 * push_ms
+            self.bytes_per_frame = 0.9 * self.bytes_per_frame + 0.1 * encoded.size
+        self.frames_shown += 1
+        self.total_bytes += encoded.size
+        self._next_show = now + max(self.min_interval, done - now)
+        return True
+
+    @property
+    def skip_ratio(self):
+        total = self.frames_shown + self.frames_skipped
+        return self.frames_skipped / total if total else 0.0
+
+    def caption(self):
+        return f"🖼️ {self.encode_ms:.1f} ms encode | {self.bytes_per_frame / 1024:.0f} KB/frame"
+
+    def stats(self):
+        return {
+            "frames_shown": self.frames_shown,
+            "frames_skipped": self.frames_skipped,
+            "encode_ms": round(self.encode_ms, 2),
+            "push_ms": round(self.push_ms, 2),
+            "bytes_per_frame": int(self.bytes_per_frame),
+            "total_bytes": self.total_bytes,
+        }
@@ -1,57 +1,127 @@
 import os
+import hashlib
+import argparse
+from multiprocessing import Pool
 import cv2
 import mediapipe as mp
-import pandas as pd
+from pose_dataset import PoseDataset, DATASET_DIR as OUTPUT_DIR
 
 # CONFIGURATION
 DATASET_DIR = "Dataset"   # Folder where your Yoga Pose folders exist
-OUTPUT_CSV = "pose_landmarks.csv"
 IMG_SIZE = (480, 640)  # Match with your cleaned dataset size
+CHUNK_SIZE = 256  # images buffered before appending to the dataset
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
 
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose(static_image_mode=True, model_complexity=2)
+# One MediaPipe Pose instance per worker process
+pose = None
 
-all_landmarks = []
 
-def extract_landmarks_from_folder(folder_path, label):
-    for filename in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, filename)
-        img = cv2.imread(file_path)
-        if img is None:
-            print(f"⚠️ Skipping unreadable file: {file_path}")
+def init_worker():
+    global pose
+    pose = mp.solutions.pose.Pose(static_image_mode=True, model_complexity=2)
+
+
+def hash_file(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def extract_landmarks_from_image(job):
+    file_path, label, content_hash = job
+    img = cv2.imread(file_path)
+    if img is None:
+        return file_path, label, content_hash, None, "unreadable"
+
+    img = cv2.resize(img, IMG_SIZE)
+    img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    result = pose.process(img_rgb)
+
+    if not result.pose_landmarks:
+        return file_path, label, content_hash, None, "no_pose"
+
+    landmarks = []
+    for lm in result.pose_landmarks.landmark:
+        landmarks.extend([lm.x, lm.y, lm.z, lm.visibility])
+    return file_path, label, content_hash, landmarks, "ok"
+
+
+def list_new_images(dataset_dir, known_hashes):
+    """Yields (path, label, hash) for images whose content hasn't been extracted yet."""
+    seen = set(known_hashes)
+    for pose_folder in sorted(os.listdir(dataset_dir)):
+        folder_path = os.path.join(dataset_dir, pose_folder)
+        if not os.path.isdir(folder_path):
             continue
+        for filename in sorted(os.listdir(folder_path)):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            file_path = os.path.join(folder_path, filename)
+            content_hash = hash_file(file_path)
+            if content_hash in seen:
+                continue
+            seen.add(content_hash)
+            yield file_path, pose_folder, content_hash
+
+
+def append_chunk(dataset, extracted, skipped):
+    if extracted:
+        features, labels, sources, hashes = zip(*extracted)
+        dataset.append(features, labels, sources, hashes)
+    if skipped:
+        dataset.mark_skipped(skipped)
+
+
+def replace_converted_rows(dataset):
+    # Rows converted from pose_landmarks.csv may come from these same images.
+    # A converted row is dropped only when an image-keyed row with the same
+    # label and landmarks exists, so each pose is in the dataset once and
+    # converted rows without a re-extracted image are kept.
+    superseded = dataset.superseded_rows()
+    if superseded.any():
+        dropped = dataset.drop_rows(superseded)
+        print(f"♻️ Replaced {dropped} rows converted from CSV with the re-extracted ones.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract pose landmarks from the Dataset/ images.")
+    parser.add_argument("--dataset", default=DATASET_DIR)
+    parser.add_argument("--output", default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    # Check the input before opening (or changing) the existing dataset
+    if not os.path.isdir(args.dataset):
+        print(f"❌ Image folder not found: {args.dataset}")
+        return
+
+    dataset = PoseDataset(args.output)
+    known_hashes = dataset.known_hashes()
+    jobs = list(list_new_images(args.dataset, known_hashes))
+    print(f"🔍 {len(known_hashes)} images already extracted, {len(jobs)} new.")
+    if not jobs:
+        return
+
+    extracted, skipped = [], []
+    saved = 0
+    with Pool(processes=args.workers, initializer=init_worker) as workers:
+        for file_path, label, content_hash, landmarks, status in workers.imap_unordered(
+                extract_landmarks_from_image, jobs, chunksize=8):
+            if status != "ok":
+                print(f"⚠️ {'Skipping unreadable file' if status == 'unreadable' else 'No pose detected'}: {file_path}")
+                skipped.append((content_hash, file_path, status))
+            else:
+                extracted.append((landmarks, label, file_path, content_hash))
+
+            if len(extracted) + len(skipped) >= CHUNK_SIZE:
+                append_chunk(dataset, extracted, skipped)
+                saved += len(extracted)
+                extracted, skipped = [], []
 
-        img = cv2.resize(img, IMG_SIZE)
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        result = pose.process(img_rgb)
+    append_chunk(dataset, extracted, skipped)
+    saved += len(extracted)
+    replace_converted_rows(dataset)
+    print(f"\n✅ Appended {saved} poses to: {args.output}/ ({len(dataset)} total)")
 
-        if result.pose_landmarks:
-            landmarks = []
-            for lm in result.pose_landmarks.landmark:
-                landmarks.extend([lm.x, lm.y, lm.z, lm.visibility])
-            landmarks.append(label)
-            all_landmarks.append(landmarks)
-        else:
-            print(f"⚠️ No pose detected: {file_path}")
 
 if __name__ == "__main__":
-    for pose_folder in os.listdir(DATASET_DIR):
-        folder_path = os.path.join(DATASET_DIR, pose_folder)
-        if os.path.isdir(folder_path):
-            print(f"\n🔍 Processing folder: {pose_folder}")
-            extract_landmarks_from_folder(folder_path, pose_folder)
-
-    if all_landmarks:
-        num_landmarks = len(all_landmarks[0]) - 1
-        columns = [f"x{i//4}_coord" if i % 4 == 0 else
-                   f"y{i//4}_coord" if i % 4 == 1 else
-                   f"z{i//4}_coord" if i % 4 == 2 else
-                   f"v{i//4}" for i in range(num_landmarks)]
-        columns.append("label")
-
-        df = pd.DataFrame(all_landmarks, columns=columns)
-        df.to_csv(OUTPUT_CSV, index=False)
-
-        print(f"\n✅ Saved {len(df)} poses to: {OUTPUT_CSV}")
-    else:
-        print("❌ No landmarks extracted!")
+    main()
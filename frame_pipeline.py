@@ -0,0 +1,180 @@
+# backend/pose_detection/frame_pipeline.py
+
+import threading
+import time
+from collections import deque
+
+import cv2
+
+
+class DropOldestQueue:
+    """
+    Bounded hand-off queue between two pipeline stages.
+    When full, a new item replaces the oldest one, so a slow consumer
+    always sees the freshest frame instead of an ever-growing backlog.
+    """
+
+    def __init__(self, maxsize=2):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Returns the oldest item, or None on timeout / when closed and empty."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self.closed, timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class FramePacket:
+    """One camera frame travelling through capture -> inference -> render."""
+
+    __slots__ = ("index", "frame", "captured_at", "results", "inferred_at")
+
+    def __init__(self, index, frame, captured_at):
+        self.index = index
+        self.frame = frame
+        self.captured_at = captured_at
+        self.results = None
+        self.inferred_at = None
+
+    @property
+    def inference_ms(self):
+        if self.inferred_at is None:
+            return 0.0
+        return (self.inferred_at - self.captured_at) * 1000.0
+
+    @property
+    def latency_ms(self):
+        """End-to-end latency from capture until now (i.e. while rendering)."""
+        return (time.perf_counter() - self.captured_at) * 1000.0
+
+
+class FramePipeline:
+    """
+    Runs camera capture and pose inference on background threads.
+
+    Iterating over the pipeline is the render stage: it yields FramePackets
+    whose `results` are already filled in by `detector.detect_pose`. The
+    iterating thread (the Streamlit script) only does feedback and drawing.
+    Queues between stages are bounded and drop the oldest frame, so the
+    loop runs at camera rate and never falls behind real time.
+    """
+
+    def __init__(self, detector, source=0, flip=False, queue_size=2):
+        self.detector = detector
+        self.source = source
+        self.flip = flip
+
+        self._frames = DropOldestQueue(queue_size)
+        self._results = DropOldestQueue(queue_size)
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._camera = None
+
+        self.source_failed = False
+        self.frames_captured = 0
+        self.frames_rendered = 0
+        self.fps = 0.0
+        self.latency_ms = 0.0
+        self._last_render = None
+
+    @property
+    def frames_dropped(self):
+        return self._frames.dropped + self._results.dropped
+
+    def start(self):
+        """Opens the source and starts the worker threads. Returns False if the source can't be opened."""
+        self._camera = cv2.VideoCapture(self.source)
+        if not self._camera.isOpened():
+            self._camera.release()
+            return False
+
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="frame-capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="pose-inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+        self._frames.close()
+        self._results.close()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+
+    def _capture_loop(self):
+        index = 0
+        try:
+            while not self._stop_event.is_set():
+                ret, frame = self._camera.read()
+                if not ret:
+                    self.source_failed = True
+                    break
+                if self.flip:
+                    frame = cv2.flip(frame, 1)
+                self._frames.put(FramePacket(index, frame, time.perf_counter()))
+                index += 1
+                self.frames_captured = index
+        finally:
+            self._camera.release()
+            self._frames.close()
+
+    def _inference_loop(self):
+        try:
+            while not self._stop_event.is_set():
+                packet = self._frames.get(timeout=0.1)
+                if packet is None:
+                    if self._frames.closed:
+                        break
+                    continue
+                packet.results = self.detector.detect_pose(packet.frame)
+                packet.inferred_at = time.perf_counter()
+                self._results.put(packet)
+        finally:
+            self._results.close()
+
+    def _record_render(self, packet):
+        now = time.perf_counter()
+        latency = (now - packet.captured_at) * 1000.0
+        self.latency_ms = latency if self.frames_rendered == 0 else 0.9 * self.latency_ms + 0.1 * latency
+        if self._last_render is not None:
+            instant_fps = 1.0 / max(now - self._last_render, 1e-6)
+            self.fps = instant_fps if self.fps == 0.0 else 0.9 * self.fps + 0.1 * instant_fps
+        self._last_render = now
+        self.frames_rendered += 1
+
+    def __iter__(self):
+        while not self._stop_event.is_set():
+            packet = self._results.get(timeout=0.5)
+            if packet is None:
+                if self._results.closed:
+                    break
+                continue
+            yield packet
+            # Control returns here once the consumer has finished with the frame.
+            self._record_render(packet)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
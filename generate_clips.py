@@ -1,7 +1,7 @@
 # backend/voice/generate_clips.py
 
-from gtts import gTTS
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 feedback_lines = {
     "pose_correct": "Perfect posture. Hold steady.",
@@ -21,14 +21,27 @@ feedback_lines = {
     "start_session": "Session started. Your form will now be monitored.",
 }
 
-output_dir = os.path.join("voice_feedback_clips")
-os.makedirs(output_dir, exist_ok=True)
 
-for tag, text in feedback_lines.items():
+
+def save_clip(tag, text, output_dir):
+    from gtts import gTTS
+
     path = os.path.join(output_dir, f"{tag}.mp3")
-    if not os.path.exists(path):
-        tts = gTTS(text=text, lang='en')
-        tts.save(path)
-        print(f"✅ Saved: {tag}.mp3")
-    else:
-        print(f"✔ Already exists: {tag}.mp3")
+    if os.path.exists(path):
+        return f"✔ Already exists: {tag}.mp3"
+    gTTS(text=text, lang='en').save(path)
+    return f"✅ Saved: {tag}.mp3"
+
+
+def main():
+    output_dir = os.path.join("voice_feedback_clips")
+    os.makedirs(output_dir, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(save_clip, tag, text, output_dir) for tag, text in feedback_lines.items()]
+        for future in futures:
+            print(future.result())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# backend/pose_detection/landmark_cache.py
+
+import os
+import hashlib
+import cv2
+import numpy as np
+
+from backend.pose_detection.mediapipe_model import PoseDetector, NUM_LANDMARKS
+
+CACHE_DIR = "landmark_cache"
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Content hash of a file, so renamed or copied videos share one cache entry."""
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def cache_path_for(video_path, model_complexity=1, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{file_hash(video_path)[:20]}_c{model_complexity}.npz")
+
+
+def extract_video_landmarks(video_path, model_complexity=1, cache_dir=CACHE_DIR):
+    """
+    Decodes a video and runs pose detection on every frame, once.
+
+    Results are cached under `cache_dir`, keyed by the video's content hash and
+    the model complexity. Returns a dict with:
+        landmarks: (frames, 33, 4) float32, NaN where no pose was found
+        valid:     (frames,) bool, True where a pose was found
+        times:     (frames,) float32 timestamps in seconds
+        fps:       float
+    """
+    cache_path = cache_path_for(video_path, model_complexity, cache_dir)
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as data:
+            return {key: data[key] for key in data.files}
+
+    detector = PoseDetector(model_complexity=model_complexity)
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    landmarks, valid, times = [], [], []
+
+    while cap.isOpened():
+        ret, frame = cap.read()
+        if not ret:
+            break
+        times.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+        frame_landmarks = detector.get_landmark_array(detector.detect_pose(frame))
+        if frame_landmarks is None:
+            landmarks.append(np.full((NUM_LANDMARKS, 4), np.nan, dtype=np.float32))
+            valid.append(False)
+        else:
+            landmarks.append(frame_landmarks.copy())
+            valid.append(True)
+    cap.release()
+
+    data = {
+        "landmarks": np.array(landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 4),
+        "valid": np.array(valid, dtype=bool),
+        "times": np.array(times, dtype=np.float32),
+        "fps": np.float32(fps),
+    }
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + ".tmp.npz"
+    np.savez(tmp_path, **data)
+    os.replace(tmp_path, cache_path)
+    return data
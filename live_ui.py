@@ -0,0 +1,86 @@
+# components/live_ui.py
+
+import time
+
+import numpy as np
+
+
+def _same(a, b):
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, np.ndarray):
+        return a.shape == b.shape and np.array_equal(a, b)
+    if isinstance(a, (tuple, list)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return a is b
+
+
+class WidgetState:
+    """
+    Stands in for a Streamlit placeholder inside the analysis loop.
+    Calls like `.markdown(...)`, `.metric(...)` or `.warning(...)` only record
+    the latest (method, args, kwargs); LiveView.render() pushes it later.
+    """
+
+    def __init__(self, placeholder):
+        self.placeholder = placeholder
+        self.pending = None
+        self.rendered = None
+
+    def __getattr__(self, method):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        def record(*args, **kwargs):
+            self.pending = (method, args, kwargs)
+        return record
+
+
+class LiveView:
+    """
+    UI state of a live session, rendered at a fixed rate.
+
+    The analysis loop writes into the widgets returned by add() as often as
+    it likes; render() is called once per loop iteration but only does work
+    every 1 / refresh_hz seconds, and then only for widgets whose state
+    changed since they were last pushed. The number of Streamlit messages
+    per second is bounded by refresh_hz x widgets, independent of the
+    loop's frame rate.
+    """
+
+    def __init__(self, refresh_hz=8.0):
+        self.interval = 1.0 / refresh_hz
+        self.widgets = {}
+        self._next_render = 0.0
+        self.renders = 0
+        self.pushes = 0
+
+    def add(self, name, placeholder):
+        widget = WidgetState(placeholder)
+        self.widgets[name] = widget
+        return widget
+
+    def render(self, force=False):
+        now = time.perf_counter()
+        if not force and now < self._next_render:
+            return False
+        self._next_render = now + self.interval
+        self.renders += 1
+
+        for widget in self.widgets.values():
+            state = widget.pending
+            if state is None or (widget.rendered is not None and _same(state, widget.rendered)):
+                continue
+            method, args, kwargs = state
+            getattr(widget.placeholder, method)(*args, **kwargs)
+            widget.rendered = state
+            self.pushes += 1
+        return True
+
+    def stats(self):
+        return {"renders": self.renders, "pushes": self.pushes, "widgets": len(self.widgets)}
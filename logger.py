@@ -1,60 +1,379 @@
 # database/logger.py
 
+import os
 import sqlite3
 import datetime
 import time
+import queue
+import atexit
+import threading
+from concurrent.futures import Future
 
 DB_PATH = "database/user_data.db"
 
-def init_db():
-    for _ in range(3):  # retry up to 3 times
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pose TEXT,
+        reps INTEGER,
+        feedback TEXT,
+        duration_seconds REAL,
+        date TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS session_metrics (
+        session_id INTEGER NOT NULL REFERENCES sessions(id),
+        metric TEXT NOT NULL,
+        t REAL NOT NULL,
+        value REAL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_session_metrics_session ON session_metrics (session_id, metric, t)',
+    '''
+    CREATE TABLE IF NOT EXISTS session_events (
+        session_id INTEGER NOT NULL REFERENCES sessions(id),
+        t REAL NOT NULL,
+        tag TEXT NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_session_events_session ON session_events (session_id, t)',
+    '''
+    CREATE TABLE IF NOT EXISTS session_feedback (
+        session_id INTEGER NOT NULL REFERENCES sessions(id),
+        pose TEXT,
+        date TEXT,
+        position INTEGER NOT NULL,
+        tag TEXT NOT NULL,
+        is_good INTEGER NOT NULL DEFAULT 0,
+        is_issue INTEGER NOT NULL DEFAULT 0,
+        is_tip INTEGER NOT NULL DEFAULT 0
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_session_feedback_session ON session_feedback (session_id, position)',
+    'CREATE INDEX IF NOT EXISTS idx_session_feedback_pose_date ON session_feedback (pose, date)',
+    'CREATE INDEX IF NOT EXISTS idx_session_feedback_tag ON session_feedback (tag)',
+    'CREATE INDEX IF NOT EXISTS idx_sessions_pose_date ON sessions (pose, date)',
+    'CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions (date)',
+    '''
+    CREATE TABLE IF NOT EXISTS daily_rollup (
+        day TEXT NOT NULL,
+        pose TEXT NOT NULL,
+        sessions INTEGER NOT NULL,
+        reps INTEGER NOT NULL,
+        duration_seconds REAL NOT NULL,
+        PRIMARY KEY (day, pose)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS pose_rollup (
+        pose TEXT PRIMARY KEY,
+        sessions INTEGER NOT NULL,
+        reps INTEGER NOT NULL,
+        duration_seconds REAL NOT NULL,
+        first_date TEXT,
+        last_date TEXT
+    ) WITHOUT ROWID
+    ''',
+    'CREATE TABLE IF NOT EXISTS rollup_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID',
+]
+
+# Feedback lines are classified once, when written, instead of on every page load
+GOOD_MARKERS = ("✅", "Good posture", "Soft breathing")
+ISSUE_MARKERS = ("❌", "Not breathing", "Go deeper", "Keep your head")
+TIP_MARKERS = ("Try", "Hold", "Slow")
+
+
+def split_feedback(feedback_str):
+    return [p.strip() for p in (feedback_str or "").split(";") if p.strip()]
+
+
+def insert_feedback_tags(cursor, session_id, pose, date, parts):
+    cursor.executemany('''
+        INSERT INTO session_feedback (session_id, pose, date, position, tag, is_good, is_issue, is_tip)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [
+        (session_id, pose, date, position, part,
+         any(m in part for m in GOOD_MARKERS),
+         any(m in part for m in ISSUE_MARKERS),
+         any(m in part for m in TIP_MARKERS))
+        for position, part in enumerate(parts)
+    ])
+
+
+def _migrate_feedback_tags(cursor):
+    # Sessions logged before session_feedback existed
+    rows = cursor.execute('SELECT id, pose, date, feedback FROM sessions').fetchall()
+    for session_id, pose, date, feedback_str in rows:
+        insert_feedback_tags(cursor, session_id, pose, date, split_feedback(feedback_str))
+
+
+def update_rollups(cursor, pose, date, reps, duration):
+    """Adds one session to the daily and per-pose rollups and bumps their version."""
+    reps = reps or 0
+    duration = duration or 0.0
+    cursor.execute('''
+        INSERT INTO daily_rollup (day, pose, sessions, reps, duration_seconds) VALUES (?, ?, 1, ?, ?)
+        ON CONFLICT (day, pose) DO UPDATE SET
+            sessions = sessions + 1,
+            reps = reps + excluded.reps,
+            duration_seconds = duration_seconds + excluded.duration_seconds
+    ''', (date[:10], pose, reps, duration))
+    cursor.execute('''
+        INSERT INTO pose_rollup (pose, sessions, reps, duration_seconds, first_date, last_date)
+        VALUES (?, 1, ?, ?, ?, ?)
+        ON CONFLICT (pose) DO UPDATE SET
+            sessions = sessions + 1,
+            reps = reps + excluded.reps,
+            duration_seconds = duration_seconds + excluded.duration_seconds,
+            first_date = MIN(first_date, excluded.first_date),
+            last_date = MAX(last_date, excluded.last_date)
+    ''', (pose, reps, duration, date, date))
+    cursor.execute('''
+        INSERT INTO rollup_meta (key, value) VALUES ('version', 1)
+        ON CONFLICT (key) DO UPDATE SET value = value + 1
+    ''')
+
+
+def _migrate_rollups(cursor):
+    rows = cursor.execute('SELECT pose, date, reps, duration_seconds FROM sessions').fetchall()
+    for pose, date, reps, duration in rows:
+        update_rollups(cursor, pose, date, reps, duration)
+
+
+# Applied in order; PRAGMA user_version records how many have run
+MIGRATIONS = [
+    _migrate_feedback_tags,
+    _migrate_rollups,
+]
+
+
+def apply_schema(conn):
+    with conn:
+        for statement in SCHEMA:
+            conn.execute(statement)
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        cursor = conn.cursor()
+        for migration in MIGRATIONS[version:]:
+            migration(cursor)
+        if version < len(MIGRATIONS):
+            conn.execute(f'PRAGMA user_version = {len(MIGRATIONS)}')
+
+
+def connect(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SessionLogWriter:
+    """
+    Write-behind logger: one SQLite connection (WAL) per process, owned by a
+    background thread.
+
+    submit() puts an operation on a queue and returns a Future right away.
+    The writer drains up to `batch_size` queued operations and commits them
+    in one transaction; lock contention is retried here, off the UI thread.
+    An operation is a callable taking the cursor; its return value (e.g. a
+    row id) resolves the Future once the batch is committed. Each operation
+    runs inside its own savepoint, so one that raises is rolled back and
+    fails only its own Future. If the database can't be opened, every
+    queued and later Future fails with that error.
+    """
+
+    def __init__(self, db_path=DB_PATH, batch_size=64, retry_seconds=0.2):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.retry_seconds = retry_seconds
+        self._queue = queue.Queue()
+        self._ready = threading.Event()
+        self._error = None
+        self._error_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="session-log-writer", daemon=True)
+        self._thread.start()
+        self.batches = 0
+        self.operations = 0
+
+    def wait_ready(self, timeout=None):
+        """Blocks until the connection is open and the schema exists."""
+        self._ready.wait(timeout)
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, operation):
+        future = Future()
+        with self._error_lock:
+            if self._error is None:
+                self._queue.put((operation, future))
+                return future
+        future.set_exception(self._error)
+        return future
+
+    def flush(self, timeout=None):
+        """Waits until everything submitted so far is committed."""
+        return self.submit(None).result(timeout)
+
+    def shutdown(self, timeout=5.0):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _commit(self, conn, batch):
+        """Returns one (ok, result or exception) pair per operation."""
+        for attempt in range(10):
+            try:
+                outcomes = []
+                with conn:
+                    cursor = conn.cursor()
+                    # Explicit, so releasing a savepoint doesn't commit
+                    cursor.execute('BEGIN')
+                    for operation, _ in batch:
+                        outcomes.append(self._apply(cursor, operation))
+                return outcomes
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e).lower() or attempt == 9:
+                    raise
+                time.sleep(self.retry_seconds * (attempt + 1))
+
+    @staticmethod
+    def _apply(cursor, operation):
+        if operation is None:
+            return True, None
+        cursor.execute('SAVEPOINT operation')
+        try:
+            result = operation(cursor)
+        except Exception as e:
+            if isinstance(e, sqlite3.OperationalError) and 'locked' in str(e).lower():
+                raise  # retried by _commit, for the whole batch
+            cursor.execute('ROLLBACK TO operation')
+            cursor.execute('RELEASE operation')
+            return False, e
+        cursor.execute('RELEASE operation')
+        return True, result
+
+    def _fail_pending(self):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                item[1].set_exception(self._error)
+
+    def _run(self):
         try:
-            conn = sqlite3.connect(DB_PATH, timeout=10)
-            cursor = conn.cursor()
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sessions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    pose TEXT,
-                    reps INTEGER,
-                    feedback TEXT,
-                    duration_seconds REAL,
-                    date TEXT
-                )
-            ''')
-            conn.commit()
-            conn.close()
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = connect(self.db_path)
+            apply_schema(conn)
+        except Exception as e:
+            with self._error_lock:
+                self._error = e
+            self._ready.set()
+            self._fail_pending()
             return
-        except sqlite3.OperationalError as e:
-            if 'locked' in str(e).lower():
-                time.sleep(1)
-            else:
-                raise e
+        self._ready.set()
+
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch = []
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            stopping = item is None
+
+            if not batch:
+                continue
+            try:
+                outcomes = self._commit(conn, batch)
+            except Exception as e:
+                print(f"❌ Session log write failed: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.operations += len(batch)
+            for (_, future), (ok, result) in zip(batch, outcomes):
+                if ok:
+                    future.set_result(result)
+                else:
+                    print(f"❌ Session log write failed: {result}")
+                    future.set_exception(result)
+        conn.close()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """The process-wide writer, started (and the schema created) on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = SessionLogWriter()
+            atexit.register(shutdown)
+    return _writer
+
+
+def init_db():
+    # Cheap after the first call in a process, so safe on every Streamlit rerun
+    get_writer().wait_ready()
 
-def log_session(pose, reps, feedback_list, duration):
+
+def flush(timeout=None):
+    if _writer is not None:
+        _writer.flush(timeout)
+
+
+def shutdown():
+    if _writer is not None:
+        _writer.shutdown()
+
+
+def log_session(pose, reps, feedback_list, duration, metrics=None):
+    """
+    Queues a session row, plus the time series of a SessionMetricsRecorder
+    if given; returns a Future resolving to the session id once committed.
+    """
     feedback_str = "; ".join(feedback_list)
     date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    for _ in range(3):  # retry up to 3 times
-        try:
-            conn = sqlite3.connect(DB_PATH, timeout=10)
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO sessions (pose, reps, feedback, duration_seconds, date)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (pose, reps, feedback_str, duration, date))
-            conn.commit()
-            conn.close()
-            return
-        except sqlite3.OperationalError as e:
-            if 'locked' in str(e).lower():
-                time.sleep(1)
-            else:
-                raise e
+    def insert(cursor):
+        cursor.execute('''
+            INSERT INTO sessions (pose, reps, feedback, duration_seconds, date)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (pose, reps, feedback_str, duration, date))
+        session_id = cursor.lastrowid
+        insert_feedback_tags(cursor, session_id, pose, date, split_feedback(feedback_str))
+        update_rollups(cursor, pose, date, reps, duration)
+        if metrics is not None:
+            metrics.write(cursor, session_id)
+        return session_id
+
+    return get_writer().submit(insert)
+
+
+_readers = threading.local()
+
+
+def get_read_connection():
+    """One reader connection per thread; WAL lets it read while the writer commits."""
+    conn = getattr(_readers, "conn", None)
+    if conn is None:
+        init_db()
+        conn = _readers.conn = connect(DB_PATH)
+    return conn
+
 
 def get_all_sessions():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    cursor = get_read_connection().cursor()
     cursor.execute('SELECT * FROM sessions ORDER BY date DESC')
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    return cursor.fetchall()
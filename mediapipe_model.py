@@ -1,20 +1,72 @@
 # mediapipe_model.py
 
+import time
+import logging
+import threading
 import cv2
+import numpy as np
 import mediapipe as mp
+from backend.pose_detection.adaptive_quality import AdaptiveQualityController, QUALITY_LEVELS
+from backend.pose_detection.motion_gate import MotionGate
+
+# MediaPipe Pose landmark order, so rows of the landmark array can be addressed by name.
+LANDMARK_NAMES = [
+    'NOSE', 'LEFT_EYE_INNER', 'LEFT_EYE', 'LEFT_EYE_OUTER', 'RIGHT_EYE_INNER', 'RIGHT_EYE',
+    'RIGHT_EYE_OUTER', 'LEFT_EAR', 'RIGHT_EAR', 'MOUTH_LEFT', 'MOUTH_RIGHT',
+    'LEFT_SHOULDER', 'RIGHT_SHOULDER', 'LEFT_ELBOW', 'RIGHT_ELBOW', 'LEFT_WRIST', 'RIGHT_WRIST',
+    'LEFT_PINKY', 'RIGHT_PINKY', 'LEFT_INDEX', 'RIGHT_INDEX', 'LEFT_THUMB', 'RIGHT_THUMB',
+    'LEFT_HIP', 'RIGHT_HIP', 'LEFT_KNEE', 'RIGHT_KNEE', 'LEFT_ANKLE', 'RIGHT_ANKLE',
+    'LEFT_HEEL', 'RIGHT_HEEL', 'LEFT_FOOT_INDEX', 'RIGHT_FOOT_INDEX',
+]
+LANDMARK_INDEX = {name: idx for idx, name in enumerate(LANDMARK_NAMES)}
+NUM_LANDMARKS = len(LANDMARK_NAMES)
 
 class PoseDetector:
-    def __init__(self):
+    def __init__(self, model_complexity=1, static_image_mode=False, adaptive=False, target_fps=15.0,
+                 motion_gate=False):
+        """
+        With `adaptive`, model complexity (0/1/2) and input downscale follow
+        an AdaptiveQualityController holding `target_fps` on this machine.
+        Only the starting complexity is loaded here; the others may need a
+        model download, so they are loaded on a background thread and offered
+        to the controller once they have run. A complexity whose model can't
+        be loaded (offline, read-only site-packages) is left out.
+
+        There is no crop-around-the-last-pose mode: MediaPipe's video mode
+        already tracks its own ROI, and an extra crop measured no faster
+        (0.98x on squat.mp4, 0.91x on tadasana.mp4) with landmark drift.
+
+        With `motion_gate` (True or a MotionGate), frames that barely differ
+        from the last processed one reuse its results instead of running
+        inference; `frame_skipped` tells whether the last call did.
+        """
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(
-            static_image_mode=False,
-            model_complexity=1,
-            enable_segmentation=False,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        self.static_image_mode = static_image_mode
+        self._poses = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.model_complexity = model_complexity
+        self.input_scale = 1.0
+        self.pose = self._pose_for(model_complexity)
+
+        # Complexities whose graph has loaded; written by the warm-up thread
+        self._ready = {model_complexity}
+        self._ready_changed = False
+        self._warm_thread = None
+        self.quality = None
+        if adaptive:
+            self.quality = AdaptiveQualityController(
+                target_fps, levels=self._levels_for(self._ready), start=(model_complexity, 1.0))
+            self.input_scale = self.quality.settings[1]
+            others = sorted({complexity for complexity, _ in QUALITY_LEVELS} - self._ready)
+            self._warm_thread = threading.Thread(target=self._warm_up, args=(others,), daemon=True)
+            self._warm_thread.start()
         self.mp_drawing = mp.solutions.drawing_utils
 
+        self.gate = MotionGate() if motion_gate is True else (motion_gate or None)
+        self.frame_skipped = False
+        self._last_results = None
+
         self.landmark_map = {
             11: 'LEFT_SHOULDER',
             12: 'RIGHT_SHOULDER',
@@ -26,9 +78,106 @@ class PoseDetector:
             28: 'RIGHT_ANKLE',
         }
 
+        # Reused (33, 4) buffer, refilled once per new results object
+        self._landmark_buffer = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        self._landmark_source = None
+
+    def _pose_for(self, model_complexity):
+        # One MediaPipe graph per complexity, created on first use and kept for switching back
+        if model_complexity not in self._poses:
+            self._poses[model_complexity] = self._new_pose(model_complexity)
+        return self._poses[model_complexity]
+
+    def _new_pose(self, model_complexity):
+        return self.mp_pose.Pose(
+            static_image_mode=self.static_image_mode,
+            model_complexity=model_complexity,
+            enable_segmentation=False,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+
+    @staticmethod
+    def _levels_for(complexities):
+        return [level for level in QUALITY_LEVELS if level[0] in complexities]
+
+    def _warm_up(self, complexities):
+        # MediaPipe downloads the lite/heavy models on first use; do it here
+        # rather than on the inference thread when the level changes
+        blank = np.zeros((64, 64, 3), dtype=np.uint8)
+        for complexity in complexities:
+            pose = None
+            try:
+                pose = self._new_pose(complexity)
+                pose.process(blank)
+            except Exception as e:
+                logging.warning(f"Pose model complexity {complexity} unavailable, adapting without it: {e}")
+                if pose is not None:
+                    pose.close()
+                continue
+            with self._lock:
+                if self._closed:
+                    pose.close()
+                    return
+                self._poses[complexity] = pose
+                self._ready.add(complexity)
+                self._ready_changed = True
+
+    def wait_for_models(self, timeout=None):
+        """Waits for the background model loading; returns the complexities that can be used."""
+        if self._warm_thread is not None:
+            self._warm_thread.join(timeout)
+        with self._lock:
+            return sorted(self._ready)
+
+    def set_quality(self, model_complexity, input_scale=1.0):
+        self.pose = self._pose_for(model_complexity)
+        self.model_complexity = model_complexity
+        self.input_scale = input_scale
+
+    def quality_label(self):
+        return f"model {self.model_complexity} @ {self.input_scale:.0%} input"
+
+    def _process(self, pose, image):
+        if self.input_scale < 1.0:
+            # Landmarks are normalized, so they still map onto the full image
+            image = cv2.resize(image, None, fx=self.input_scale, fy=self.input_scale, interpolation=cv2.INTER_AREA)
+        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        return pose.process(rgb_image)
+
+    def tracking_stats(self):
+        return self.gate.stats() if self.gate is not None else {}
+
     def detect_pose(self, frame):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        return self.pose.process(rgb_frame)
+        # The gate always processes the first frame it sees, so there are results to reuse
+        if self.gate is not None and not self.gate.should_process(frame) and self._last_results is not None:
+            self.frame_skipped = True
+            return self._last_results
+        self.frame_skipped = False
+
+        start = time.perf_counter()
+        results = self._process(self.pose, frame)
+
+        if self.quality is not None:
+            if self._ready_changed:
+                with self._lock:
+                    ready, self._ready_changed = set(self._ready), False
+                self.quality.set_levels(self._levels_for(ready))
+            change = self.quality.observe((time.perf_counter() - start) * 1000.0)
+            if change is not None:
+                self.set_quality(*change)
+                logging.info(f"Pose quality -> {self.quality_label()} "
+                             f"(target {self.quality.target_fps:.0f} FPS, budget {self.quality.budget_ms:.0f} ms)")
+        self._last_results = results
+        return results
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            poses = list(self._poses.values())
+            self._poses.clear()
+        for pose in poses:
+            pose.close()
 
     def draw_landmarks(self, frame, results):
         if results.pose_landmarks:
@@ -39,19 +188,48 @@ class PoseDetector:
             )
         return frame
 
-    def get_named_landmarks(self, results):
+    def get_landmark_array(self, results):
+        """
+        Returns all landmarks as a (33, 4) float32 array of (x, y, z, visibility),
+        or None if no pose was detected.
+
+        The array is a preallocated buffer that is overwritten by the next
+        results object, so call .copy() on it before keeping it across frames.
+        """
         if not results.pose_landmarks:
+            return None
+
+        if results is not self._landmark_source:
+            self._landmark_buffer[:] = [
+                (lm.x, lm.y, lm.z, lm.visibility) for lm in results.pose_landmarks.landmark
+            ]
+            self._landmark_source = results
+        return self._landmark_buffer
+
+    def landmark_view(self, results, name):
+        """
+        Returns the (x, y, z, visibility) row for one named landmark as a view
+        into the landmark array, or None if no pose was detected.
+        """
+        landmarks = self.get_landmark_array(results)
+        if landmarks is None:
+            return None
+        return landmarks[LANDMARK_INDEX[name]]
+
+    def get_named_landmarks(self, results):
+        landmarks = self.get_landmark_array(results)
+        if landmarks is None:
             return {}
 
-        named_landmarks = {}
-        for idx, lm in enumerate(results.pose_landmarks.landmark):
-            if idx in self.landmark_map:
-                named_landmarks[self.landmark_map[idx]] = (lm.x, lm.y)
-        return named_landmarks
+        return {
+            name: (float(landmarks[idx, 0]), float(landmarks[idx, 1]))
+            for idx, name in self.landmark_map.items()
+        }
 
     def get_landmarks(self, results):
         """
         Returns raw list of (x, y, z, visibility) for all landmarks.
+        Prefer get_landmark_array() in per-frame code.
         """
         if not results.pose_landmarks:
             return []
@@ -2,62 +2,57 @@
 import cv2
 import time
 import numpy as np
-import threading
 import streamlit as st
 import mediapipe as mp
 import uuid
 import json
-import os
 from scipy.signal import savgol_filter
 from scipy.spatial.distance import cosine
-from gtts import gTTS
-from playsound import playsound
 from backend.pose_detection.mediapipe_model import PoseDetector
+from backend.pose_detection.display_sink import DisplaySink
+from components.live_ui import LiveView
+from backend.feedback_engine.reference_store import load_reference_array
+from backend.voice.audio_service import get_audio_service
 from database.logger import log_session
+from database.session_metrics import SessionMetricsRecorder
 
 class VoiceFeedbackManager:
     def __init__(self, interval=6):
         self.interval = interval
         self.last_spoken = {}
-        self.audio_dir = "voice_feedback"
-        os.makedirs(self.audio_dir, exist_ok=True)
-        self.queue = threading.Lock()
 
     def speak(self, tag, message):
         now = time.time()
         if tag not in self.last_spoken or now - self.last_spoken[tag] > self.interval:
             self.last_spoken[tag] = now
-            threading.Thread(target=self._speak_thread, args=(tag, message), daemon=True).start()
-
-    def _speak_thread(self, tag, message):
-        with self.queue:
-            filename = os.path.join(self.audio_dir, f"{tag}.mp3")
-            if not os.path.exists(filename):
-                tts = gTTS(text=message)
-                tts.save(filename)
-            try:
-                playsound(filename)
-            except Exception as e:
-                print(f"Error playing sound: {e}")
+            # Plays the pre-decoded voice_feedback/<tag>.mp3 clip, or synthesizes the message offline
+            get_audio_service().speak(tag, text=message)
 
 voice_manager = VoiceFeedbackManager()
-try:
-    reference_pose = np.load("reference_meditation_pose.npz")['mean_pose']
-except:
-    reference_pose = None
-    print("❌ Reference meditation pose file not found. Run the extractor script first.")
 
+REFERENCE_POSE_PATH = "reference_meditation_pose.npz"
 SIMILARITY_THRESHOLD = 0.75
 
+
+def load_meditation_reference():
+    """Loads the mean meditation pose lazily (cached across sessions)."""
+    try:
+        return load_reference_array(REFERENCE_POSE_PATH, 'mean_pose')
+    except (FileNotFoundError, KeyError):
+        print("❌ Reference meditation pose file not found. Run the extractor script first.")
+        return None
+
 def run_meditation_session(duration_minutes):
     st.title("🧘 Meditation Session")
     st.markdown("Live feedback will be provided. Ensure good lighting.")
 
     stframe = st.empty()
-    chart_box = st.empty()
-    feedback_box = st.empty()
+    display = DisplaySink(stframe)
+    view = LiveView(refresh_hz=5)
+    chart_box = view.add("breathing_chart", st.empty())
+    feedback_box = view.add("feedback", st.empty())
     stop_button = st.button("⏹️ Stop Meditation")
-    metrics_placeholder = st.empty()
+    metrics_placeholder = view.add("metrics", st.empty())
 
     if "meditation_running" not in st.session_state:
         st.session_state.meditation_running = True
@@ -69,13 +64,16 @@ def run_meditation_session(duration_minutes):
 
     duration = duration_minutes * 60
     start_time = time.time()
+    reference_pose = load_meditation_reference()
 
     cap = cv2.VideoCapture(0)
     if not cap.isOpened():
         st.error("❌ Could not access webcam.")
         return
 
-    detector = PoseDetector()
+    # No motion gate: breathing is exactly the small, slow motion it treats
+    # as static, and reused landmarks would flatten the chest signal
+    detector = PoseDetector(adaptive=True)
     mp_draw = mp.solutions.drawing_utils
     face_mesh = mp.solutions.face_mesh.FaceMesh(refine_landmarks=True)
     mp_pose = mp.solutions.pose
@@ -85,9 +83,11 @@ def run_meditation_session(duration_minutes):
     usable_frames = head_issues = shoulder_issues = incorrect_posture = 0
     last_feedback = {"breathing": 0, "eyes": 0, "posture": 0, "head": 0, "shoulders": 0}
     breathing_scores = []
+    metrics = SessionMetricsRecorder()
 
     try:
         while time.time() - start_time < duration and st.session_state.meditation_running:
+            view.render()
             ret, frame = cap.read()
             if not ret:
                 st.error("Failed to read from camera")
@@ -98,7 +98,7 @@ def run_meditation_session(duration_minutes):
             results = detector.detect_pose(frame)
             face_results = face_mesh.process(rgb)
             mp_draw.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-            landmarks = detector.get_landmarks(results)
+            landmarks = detector.get_landmark_array(results)
             total_frames += 1
 
             eyes_closed = False
@@ -126,9 +126,10 @@ def run_meditation_session(duration_minutes):
                 else:
                     eyes_closed = True
 
-            if landmarks and reference_pose is not None:
-                flat = np.array(landmarks).flatten()
+            if landmarks is not None and reference_pose is not None:
+                flat = landmarks.ravel()
                 sim = 1 - cosine(flat, reference_pose)
+                metrics.frame("pose_similarity", sim)
                 if sim < SIMILARITY_THRESHOLD:
                     posture_correct = False
                 else:
@@ -165,7 +166,7 @@ def run_meditation_session(duration_minutes):
                 if not st.session_state.alert_shown:
                     feedback_box.markdown("### ⏳ Waiting for correct posture and eyes closed to begin.")
                     st.session_state.alert_shown = True
-                stframe.image(frame, channels="BGR", use_container_width=True)
+                display.show(frame)
                 time.sleep(0.05)
                 continue
 
@@ -173,7 +174,7 @@ def run_meditation_session(duration_minutes):
                 feedback_box.markdown("")
                 st.session_state.alert_shown = False
 
-            if landmarks and len(landmarks) > 24:
+            if landmarks is not None:
                 left_shoulder, right_shoulder = landmarks[11], landmarks[12]
                 chest_y = (left_shoulder[1] + right_shoulder[1]) / 2
                 chest_movements.append(chest_y)
@@ -200,6 +201,8 @@ def run_meditation_session(duration_minutes):
                         if now - last_feedback["breathing"] > 6:
                             voice_manager.speak("breathing_harsh", "You're breathing harshly. Try to breathe calmly.")
                             last_feedback["breathing"] = now
+                    metrics.frame("breathing", breathing_scores[-1])
+                    metrics.frame("chest_motion", motion_range)
 
                     if feedback:
                         feedback_box.markdown(f"### 💬 {feedback}")
@@ -217,14 +220,17 @@ def run_meditation_session(duration_minutes):
                 - 🧍 Head Alignment: {head_ratio:.1f}%
                 - 💪 Shoulder Balance: {shoulder_ratio:.1f}%
                 - 🫁 Breathing Score: {breath_score}
+                - ⚙️ Pose Model: {detector.quality_label()}
                 """)
 
-            stframe.image(frame, channels="BGR", use_container_width=True)
+            display.show(frame)
             time.sleep(0.05)
 
     finally:
+        view.render(force=True)
         cap.release()
         face_mesh.close()
+        detector.close()
 
         if usable_frames == 0:
             st.warning("⚠️ Posture was never valid, but summary will still be shown.")
@@ -273,7 +279,8 @@ def run_meditation_session(duration_minutes):
     st.session_state["meditation_summary"] = feedback_msgs + improvement_tips
     st.session_state["show_summary"] = True
     st.download_button("⬇️ Download Session Report", json.dumps(summary, indent=2), file_name="meditation_summary.json")
-    log_session(pose="meditation", reps=0, feedback_list=summary["feedback"], duration=summary["duration_seconds"])
+    log_session(pose="meditation", reps=0, feedback_list=summary["feedback"], duration=summary["duration_seconds"],
+                metrics=metrics)
     st.session_state["meditation_summary"] = feedback_msgs + improvement_tips
     st.session_state["show_summary"] = True
     st.markdown("## ✅ Meditation Session Complete")
@@ -0,0 +1,65 @@
+# backend/pose_detection/motion_gate.py
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Decides whether a frame is worth running pose estimation on.
+
+    Each frame is shrunk to a tiny grayscale thumbnail (into reused buffers)
+    and compared with the thumbnail of the last frame that was processed.
+    While the mean absolute difference stays below `threshold` (in gray
+    levels) the frame can be skipped and the previous landmarks reused, but
+    never more than `max_skip` frames in a row, so slow drift is bounded.
+    Comparing against the last processed frame, not the previous one, means
+    slow movement still adds up and triggers inference.
+    """
+
+    def __init__(self, threshold=2.5, max_skip=8, thumb_size=(32, 24)):
+        self.threshold = threshold
+        self.max_skip = max_skip
+        self.thumb_size = thumb_size
+        self._small = np.empty((thumb_size[1], thumb_size[0], 3), dtype=np.uint8)
+        self._gray = np.empty((thumb_size[1], thumb_size[0]), dtype=np.uint8)
+        self._reference = None
+        self._skipped_in_row = 0
+        self.frames_processed = 0
+        self.frames_skipped = 0
+        self.last_motion = 0.0
+
+    def reset(self):
+        self._reference = None
+        self._skipped_in_row = 0
+
+    def should_process(self, frame):
+        cv2.resize(frame, self.thumb_size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+        if self._reference is not None and self._skipped_in_row < self.max_skip:
+            self.last_motion = float(cv2.absdiff(self._gray, self._reference).mean())
+            if self.last_motion < self.threshold:
+                self._skipped_in_row += 1
+                self.frames_skipped += 1
+                return False
+
+        if self._reference is None:
+            self._reference = self._gray.copy()
+        else:
+            self._reference[:] = self._gray
+        self._skipped_in_row = 0
+        self.frames_processed += 1
+        return True
+
+    @property
+    def skip_ratio(self):
+        total = self.frames_processed + self.frames_skipped
+        return self.frames_skipped / total if total else 0.0
+
+    def stats(self):
+        return {
+            "frames_processed": self.frames_processed,
+            "frames_skipped": self.frames_skipped,
+            "skip_ratio": round(self.skip_ratio, 3),
+        }
@@ -1,14 +1,15 @@
 import numpy as np
 import os
 
+from backend.feedback_engine.reference_store import load_reference_array
+
 def load_motion_reference(path):
     """
-    Load saved motion sequence from .npz file.
+    Load saved motion sequence from .npz file (cached, read-only).
     """
     if not os.path.exists(path):
         return None
-    data = np.load(path)
-    return data['landmarks']
+    return load_reference_array(path, 'landmarks')
 
 def compute_motion_similarity(live_seq, ref_seq):
     """
@@ -39,3 +40,100 @@ def compute_motion_similarity(live_seq, ref_seq):
     avg_diff = np.mean(diffs)
     normalized = max(0, 100 - avg_diff * 2)
     return normalized
+
+
+# Body joints used for motion matching (shoulders, elbows, wrists, hips, knees, ankles)
+MOTION_JOINTS = [11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28]
+
+
+def normalize_motion_frames(landmarks):
+    """
+    Hip-centred, torso-length-scaled (x, y) positions of MOTION_JOINTS.
+    Accepts (33, C) or (N, 33, C) landmarks; returns (..., len(MOTION_JOINTS), 2).
+    """
+    points = np.asarray(landmarks, dtype=np.float32)[..., :2]
+    hip = points[..., [23, 24], :].mean(axis=-2, keepdims=True)
+    shoulder = points[..., [11, 12], :].mean(axis=-2, keepdims=True)
+    torso = np.linalg.norm(shoulder - hip, axis=-1, keepdims=True)
+    return (points[..., MOTION_JOINTS, :] - hip) / np.maximum(torso, 1e-6)
+
+
+class StreamingMotionMatcher:
+    """
+    Online subsequence DTW of the live motion against a reference motion.
+
+    Each live frame advances the alignment by 0, 1 or 2 reference frames, so
+    the user may move at half to double the reference speed, and a match may
+    start anywhere in the reference. Path costs are exponentially decayed, so
+    the score reflects roughly the last `window` live frames. With `band` set,
+    only reference frames within `band` of the current alignment are updated,
+    which keeps each update O(band) instead of O(len(reference)).
+    """
+
+    def __init__(self, reference, window=30, band=None, max_cost=0.5):
+        self.reference = normalize_motion_frames(reference)
+        self.decay = 1.0 - 1.0 / window
+        self.band = band
+        self.max_cost = max_cost
+        self.reset()
+
+    def reset(self):
+        n = len(self.reference)
+        self._cost = np.full(n, np.inf, dtype=np.float32)
+        self._length = np.zeros(n, dtype=np.float32)
+        self.position = None
+
+    def _active_range(self):
+        n = len(self.reference)
+        if self.band is None or self.position is None:
+            return 0, n
+        return max(0, self.position - self.band), min(n, self.position + self.band + 1)
+
+    def update(self, live_landmarks):
+        """
+        Adds one live frame.
+
+        Returns:
+            (score, phase) where score is 0-100 and phase is the aligned
+            position within the reference motion in [0, 1] (None when lost).
+        """
+        n = len(self.reference)
+        lo, hi = self._active_range()
+        frame = normalize_motion_frames(live_landmarks)
+        dist = np.linalg.norm(self.reference[lo:hi] - frame, axis=-1).mean(axis=-1)
+
+        # Predecessors of reference frame j: j (hold), j-1 (advance), j-2 (skip)
+        padded_cost = np.concatenate(([np.inf, np.inf], self._cost))
+        padded_length = np.concatenate(([0.0, 0.0], self._length))
+        steps = [slice(lo + 2, hi + 2), slice(lo + 1, hi + 1), slice(lo, hi)]
+        cand_cost = np.stack([padded_cost[s] for s in steps]) * self.decay + dist
+        cand_length = np.stack([padded_length[s] for s in steps]) * self.decay + 1.0
+
+        # A path may (re)start at the first reference frame or wherever nothing reaches
+        fresh = np.isinf(cand_cost).all(axis=0)
+        if lo == 0:
+            fresh[0] = True
+        cand_cost = np.vstack([cand_cost, np.where(fresh, dist, np.inf)])
+        cand_length = np.vstack([cand_length, np.ones_like(dist)])
+
+        best = np.argmin(cand_cost / cand_length, axis=0)
+        cols = np.arange(hi - lo)
+        self._cost.fill(np.inf)
+        self._length.fill(0.0)
+        self._cost[lo:hi] = cand_cost[best, cols]
+        self._length[lo:hi] = cand_length[best, cols]
+
+        average = self._cost[lo:hi] / self._length[lo:hi]
+        j = int(np.argmin(average))
+        avg_cost = float(average[j])
+
+        if avg_cost > self.max_cost:
+            self.reset()
+            return 0.0, None
+
+        self.position = lo + j
+        if self.position >= n - 2:
+            # End of the reference reached: search everywhere again for the next rep
+            self.position = None
+        score = 100.0 * (1.0 - avg_cost / self.max_cost)
+        return score, (lo + j) / max(n - 1, 1)
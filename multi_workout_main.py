@@ -1,181 +1,208 @@
-import sys
-import os
-import logging
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-import cv2
-import numpy as np
-import streamlit as st
-import time
-from backend.pose_detection.mediapipe_model import PoseDetector
-from backend.feedback_engine.workout_feedback import WorkoutFeedback
-from backend.feedback_engine.workout_rep_counter import WorkoutRepCounter
-from backend.feedback_engine.pose_similarity_checker import compare_pose
-from backend.feedback_engine.angles import calculate_angle_from_landmarks
-
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-
-def run_workout(exercise_name, joint_indices, thresholds):
-    stframe = st.empty()
-    rep_placeholder = st.empty()
-    similarity_placeholder = st.empty()
-    message_placeholder = st.empty()
-
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        st.error("Unable to access the camera.")
-        return
-
-    stop_button = st.button("🛑 Stop Workout")
-
-    model = PoseDetector()
-    feedback = WorkoutFeedback()
-    rep_counter = WorkoutRepCounter(exercise_name, threshold_down=thresholds['down'], threshold_up=thresholds['up'])
-
-    reference_pose_path = f"pose_references/{exercise_name}_reference.npy"
-    angle_reference_path = f"pose_references/{exercise_name}_angles_reference.npy"
-
-    try:
-        reference_pose = np.load(reference_pose_path)
-        angle_reference_data = np.load(angle_reference_path, allow_pickle=True)
-    except FileNotFoundError as e:
-        st.error(f"Missing reference file: {e}")
-        return
-
-    reps = 0
-    similarity = 0.0
-    smooth_similarity = []
-    similarity_scores = []
-    last_feedback_time = 0
-    cooldown = 3.0
-    visibility_threshold = 0.5
-    frame_index = 0
-
-    feedback_rules = {
-        "pushup": {
-            "elbow": (11, 13, 15),
-            "back": (11, 23, 24)
-        },
-        "plank": {
-            "shoulder_hip_knee": (11, 23, 25),
-            "back": (11, 23, 24)
-        },
-        "pullup": {
-            "elbow_shoulder_hip": (13, 11, 23),
-            "back": (11, 23, 24)
-        }
-    }
-
-    def check_angles(landmarks, ref_angles):
-        for label, (a, b, c) in feedback_rules.get(exercise_name, {}).items():
-            current_angle = calculate_angle_from_landmarks(landmarks, a, b, c)
-            reference_angle = ref_angles.get(label, None)
-            if reference_angle is not None and abs(current_angle - reference_angle) > 15:
-                logging.debug(f"Angle deviation detected: {label}, Current: {current_angle}, Reference: {reference_angle}")
-                feedback.give_feedback(f"Adjust your {label.replace('_', ' ')}")
-
-    while cap.isOpened():
-        if stop_button:
-            break
-
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        results = model.detect_pose(frame)
-        landmarks_full = model.get_landmarks(results)
-
-        if not landmarks_full or any(lm[3] < visibility_threshold for lm in landmarks_full):
-            similarity = 0.0
-            if time.time() - last_feedback_time > cooldown:
-                feedback.give_feedback("pose not fully visible")
-                last_feedback_time = time.time()
-            message_placeholder.markdown("<span style='color:red'><b>⚠️ Pose not fully visible</b></span>", unsafe_allow_html=True)
-            stframe.image(frame, channels="BGR")
-            rep_placeholder.markdown(f"### 🏋️ Repetitions: **{reps}**")
-            similarity_placeholder.progress(0, text=f"🎯 Accuracy: --")
-            time.sleep(0.02)
-            continue
-
-        landmarks = [lm[:3] for lm in landmarks_full]
-        flat_landmarks = np.array(landmarks).flatten()
-
-        avg_z = np.mean([lm[2] for lm in landmarks_full])
-        if exercise_name in ["pushup", "plank"] and avg_z > -0.2:
-            similarity = 0.0
-            if time.time() - last_feedback_time > cooldown:
-                feedback.give_feedback(f"get into {exercise_name} position")
-                last_feedback_time = time.time()
-            message_placeholder.markdown(f"<span style='color:red'><b>⚠️ Get into {exercise_name} position</b></span>", unsafe_allow_html=True)
-            stframe.image(frame, channels="BGR")
-            rep_placeholder.markdown(f"### 🏋️ Repetitions: **{reps}**")
-            similarity_placeholder.progress(0, text=f"🎯 Accuracy: --")
-            time.sleep(0.02)
-            continue
-
-        angle = calculate_angle_from_landmarks(landmarks_full, *joint_indices)
-        deep_position = angle < thresholds['down']
-
-        if deep_position:
-            similarity_now, is_correct = compare_pose(flat_landmarks, reference_pose, threshold=0.92)
-            smooth_similarity.append(similarity_now)
-            if len(smooth_similarity) > 5:
-                smooth_similarity.pop(0)
-            similarity = np.mean(smooth_similarity)
-
-            if time.time() - last_feedback_time > cooldown and frame_index < len(angle_reference_data):
-                ref_angles = angle_reference_data[frame_index]
-                check_angles(landmarks_full, ref_angles)
-                last_feedback_time = time.time()
-        else:
-            similarity = 0.0
-            smooth_similarity.clear()
-
-        if rep_counter.update(angle):
-            reps += 1
-            if smooth_similarity:
-                similarity_scores.append(np.mean(smooth_similarity))
-                avg_angle_accuracy = similarity_scores[-1]
-                if avg_angle_accuracy < 0.85:
-                    feedback.give_feedback("Try to improve your form")
-            smooth_similarity.clear()
-
-        frame = model.draw_landmarks(frame, results)
-        stframe.image(frame, channels="BGR")
-        rep_placeholder.markdown(f"### 🏋️ Repetitions: **{reps}**")
-        similarity_placeholder.progress(int(similarity * 100), text=f"🎯 Accuracy: {similarity * 100:.1f}%")
-        frame_index += 1
-        time.sleep(0.02)
-
-    cap.release()
-    st.success("Workout session ended.")
-    st.markdown("---")
-    st.markdown(f"## 🧾 {exercise_name.capitalize()} Session Summary")
-    st.markdown(f"**Total Repetitions:** {reps}")
-    if similarity_scores:
-        st.markdown(f"**Best Accuracy:** {max(similarity_scores) * 100:.1f}%")
-        st.markdown(f"**Average Accuracy:** {np.mean(similarity_scores) * 100:.1f}%")
-    else:
-        st.markdown("**Accuracy Data:** No valid reps captured")
-
-def start_pushup_workout():
-    run_workout(
-        exercise_name="pushup",
-        joint_indices=(11, 13, 15),
-        thresholds={"down": 70, "up": 160, "back": (160, 195, (11, 23, 24))}
-    )
-
-def start_plank_workout():
-    run_workout(
-        exercise_name="plank",
-        joint_indices=(11, 23, 25),
-        thresholds={"down": 160, "up": 170, "back": (160, 195, (11, 23, 24))}
-    )
-
-def start_pullup_workout():
-    run_workout(
-        exercise_name="pullup",
-        joint_indices=(13, 11, 23),
-        thresholds={"down": 80, "up": 150, "back": (160, 195, (11, 23, 24))}
-    )
+import sys
+import os
+import logging
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import streamlit as st
+import time
+from backend.pose_detection.mediapipe_model import PoseDetector
+from backend.pose_detection.frame_pipeline import FramePipeline
+from backend.pose_detection.display_sink import DisplaySink
+from components.live_ui import LiveView
+from backend.feedback_engine.workout_feedback import WorkoutFeedback
+from backend.feedback_engine.workout_rep_counter import WorkoutRepCounter
+from backend.feedback_engine.pose_similarity_checker import compare_pose
+from backend.feedback_engine.angle_engine import compile_triplets, compute_angles
+from backend.feedback_engine.reference_store import load_reference_array
+from backend.feedback_engine.angle_reference import load_angle_reference
+from database.logger import log_session
+from database.session_metrics import SessionMetricsRecorder
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+
+def run_workout(exercise_name, joint_indices, thresholds):
+    stframe = st.empty()
+    display = DisplaySink(stframe, use_container_width=False)
+    view = LiveView(refresh_hz=8)
+    rep_placeholder = view.add("reps", st.empty())
+    similarity_placeholder = view.add("similarity", st.empty())
+    message_placeholder = view.add("message", st.empty())
+    latency_placeholder = view.add("latency", st.empty())
+
+    feedback = WorkoutFeedback()
+    rep_counter = WorkoutRepCounter(exercise_name, threshold_down=thresholds['down'], threshold_up=thresholds['up'])
+
+    reference_pose_path = f"pose_references/{exercise_name}_reference.npy"
+    angle_reference_path = f"pose_references/{exercise_name}_angles.npy"
+
+    try:
+        reference_pose = load_reference_array(reference_pose_path)
+        angle_reference = load_angle_reference(angle_reference_path)
+    except FileNotFoundError as e:
+        st.error(f"Missing reference file: {e}")
+        return
+
+    model = PoseDetector(adaptive=True, motion_gate=True)
+    pipeline = FramePipeline(model, source=0)
+
+    # Pressing Stop reruns the script, which interrupts the loop below
+    st.button("🛑 Stop Workout")
+
+    reps = 0
+    similarity = 0.0
+    smooth_similarity = []
+    similarity_scores = []
+    last_feedback_time = 0
+    cooldown = 3.0
+    visibility_threshold = 0.5
+    frame_index = 0
+    metrics = SessionMetricsRecorder()
+
+    feedback_rules = {
+        "pushup": {
+            "elbow": (11, 13, 15),
+            "back": (11, 23, 24)
+        },
+        "plank": {
+            "shoulder_hip_knee": (11, 23, 25),
+            "back": (11, 23, 24)
+        },
+        "pullup": {
+            "elbow_shoulder_hip": (13, 11, 23),
+            "back": (11, 23, 24)
+        }
+    }
+
+    # Rep-tracking angle first, then the feedback rule angles, all in one table
+    rule_labels, rule_table = compile_triplets(feedback_rules.get(exercise_name, {}))
+    angle_table = np.vstack([np.asarray(joint_indices, dtype=np.intp).reshape(1, 3), rule_table])
+    # Reference columns matching the rule angles (-1 where the reference lacks a joint)
+    rule_columns = angle_reference.joint_indices(rule_labels)
+    has_reference = rule_columns >= 0
+
+    def check_angles(current_angles, frame_index):
+        reference_angles = angle_reference.matrix[frame_index, rule_columns]
+        off = has_reference & (np.abs(current_angles - reference_angles) > 15)
+        for i in np.flatnonzero(off):
+            label = rule_labels[i]
+            logging.debug(f"Angle deviation detected: {label}, Current: {current_angles[i]}, Reference: {reference_angles[i]}")
+            metrics.event(label)
+            feedback.give_feedback(f"Adjust your {label.replace('_', ' ')}")
+
+    if not pipeline.start():
+        model.close()
+        st.error("Unable to access the camera.")
+        return
+
+    try:
+        for packet in pipeline:
+            view.render()
+
+            frame = packet.frame
+            results = packet.results
+            landmarks_full = model.get_landmark_array(results)
+
+            if landmarks_full is None or (landmarks_full[:, 3] < visibility_threshold).any():
+                similarity = 0.0
+                if time.time() - last_feedback_time > cooldown:
+                    feedback.give_feedback("pose not fully visible")
+                    last_feedback_time = time.time()
+                message_placeholder.markdown("<span style='color:red'><b>⚠️ Pose not fully visible</b></span>", unsafe_allow_html=True)
+                display.show(frame)
+                rep_placeholder.markdown(f"### 🏋️ Repetitions: **{reps}**")
+                similarity_placeholder.progress(0, text=f"🎯 Accuracy: --")
+                continue
+
+            flat_landmarks = landmarks_full[:, :3].flatten()
+
+            avg_z = landmarks_full[:, 2].mean()
+            if exercise_name in ["pushup", "plank"] and avg_z > -0.2:
+                similarity = 0.0
+                if time.time() - last_feedback_time > cooldown:
+                    feedback.give_feedback(f"get into {exercise_name} position")
+                    last_feedback_time = time.time()
+                message_placeholder.markdown(f"<span style='color:red'><b>⚠️ Get into {exercise_name} position</b></span>", unsafe_allow_html=True)
+                display.show(frame)
+                rep_placeholder.markdown(f"### 🏋️ Repetitions: **{reps}**")
+                similarity_placeholder.progress(0, text=f"🎯 Accuracy: --")
+                continue
+
+            frame_angles = compute_angles(landmarks_full, angle_table)
+            angle = frame_angles[0]
+            deep_position = angle < thresholds['down']
+
+            if deep_position:
+                similarity_now, is_correct = compare_pose(flat_landmarks, reference_pose, threshold=0.92)
+                smooth_similarity.append(similarity_now)
+                if len(smooth_similarity) > 5:
+                    smooth_similarity.pop(0)
+                similarity = np.mean(smooth_similarity)
+
+                if time.time() - last_feedback_time > cooldown and frame_index < len(angle_reference):
+                    check_angles(frame_angles[1:], frame_index)
+                    last_feedback_time = time.time()
+            else:
+                similarity = 0.0
+                smooth_similarity.clear()
+
+            if rep_counter.update(angle):
+                reps += 1
+                if smooth_similarity:
+                    similarity_scores.append(np.mean(smooth_similarity))
+                    avg_angle_accuracy = similarity_scores[-1]
+                    metrics.rep("rep_similarity", avg_angle_accuracy)
+                    if avg_angle_accuracy < 0.85:
+                        feedback.give_feedback("Try to improve your form")
+                smooth_similarity.clear()
+
+            metrics.frame("similarity", similarity)
+            metrics.frame("angle", angle)
+
+            frame = model.draw_landmarks(frame, results)
+            display.show(frame)
+            rep_placeholder.markdown(f"### 🏋️ Repetitions: **{reps}**")
+            similarity_placeholder.progress(int(similarity * 100), text=f"🎯 Accuracy: {similarity * 100:.1f}%")
+            latency_placeholder.caption(f"⏱️ {pipeline.fps:.1f} FPS | {packet.latency_ms:.0f} ms latency | {model.quality_label()} | 💤 {model.gate.skip_ratio:.0%} skipped")
+            frame_index += 1
+    finally:
+        pipeline.stop()
+        model.close()
+        logging.info(f"Frame pipeline: {pipeline.frames_rendered} rendered, {pipeline.frames_dropped} dropped, "
+                     f"avg latency {pipeline.latency_ms:.0f} ms")
+        logging.info(f"Display: {display.stats()} | UI: {view.stats()} | Pose quality: {model.quality.stats()} | Tracking: {model.tracking_stats()}")
+        log_session(pose=exercise_name, reps=reps, feedback_list=metrics.tags(),
+                    duration=round(metrics.elapsed(), 2), metrics=metrics)
+
+    view.render(force=True)
+    st.success("Workout session ended.")
+    st.markdown("---")
+    st.markdown(f"## 🧾 {exercise_name.capitalize()} Session Summary")
+    st.markdown(f"**Total Repetitions:** {reps}")
+    if similarity_scores:
+        st.markdown(f"**Best Accuracy:** {max(similarity_scores) * 100:.1f}%")
+        st.markdown(f"**Average Accuracy:** {np.mean(similarity_scores) * 100:.1f}%")
+    else:
+        st.markdown("**Accuracy Data:** No valid reps captured")
+
+def start_pushup_workout():
+    run_workout(
+        exercise_name="pushup",
+        joint_indices=(11, 13, 15),
+        thresholds={"down": 70, "up": 160, "back": (160, 195, (11, 23, 24))}
+    )
+
+def start_plank_workout():
+    run_workout(
+        exercise_name="plank",
+        joint_indices=(11, 23, 25),
+        thresholds={"down": 160, "up": 170, "back": (160, 195, (11, 23, 24))}
+    )
+
+def start_pullup_workout():
+    run_workout(
+        exercise_name="pullup",
+        joint_indices=(13, 11, 23),
+        thresholds={"down": 80, "up": 150, "back": (160, 195, (11, 23, 24))}
+    )
@@ -0,0 +1,198 @@
+# backend/feedback_engine/pose_classifier_runtime.py
+
+import functools
+import numpy as np
+
+# Low-latency pose classifier runtime.
+#
+# Models are exported from scikit-learn into a plain .npz of NumPy arrays, so
+# prediction is a couple of small matrix products with no sklearn overhead
+# and no pickle. Supported kinds:
+#   linear  softmax / logistic regression:  W (F, C), b (C,)
+#   mlp     ReLU multi-layer perceptron:    W0, b0, W1, b1, ...
+#   knn     k-nearest neighbours:           X (N, F), y (N,), k
+# Every model stores `labels` and the feature standardization `mean` / `scale`,
+# and `normalize` = 1 if it was trained on normalize_pose_features() output.
+
+
+def normalize_pose_features(features):
+    """
+    Makes raw (N, 132) landmark rows position- and scale-invariant: x, y, z are
+    centred on the hip midpoint and divided by the torso length; visibility is kept.
+    """
+    pts = np.asarray(features, dtype=np.float32).reshape(-1, 33, 4).copy()
+    hip = pts[:, [23, 24], :3].mean(axis=1, keepdims=True)
+    shoulder = pts[:, [11, 12], :3].mean(axis=1, keepdims=True)
+    torso = np.linalg.norm((shoulder - hip)[..., :2], axis=-1, keepdims=True)
+    pts[..., :3] = (pts[..., :3] - hip) / np.maximum(torso, 1e-6)
+    return pts.reshape(len(pts), -1)
+
+
+def _softmax(z):
+    z = z - z.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class FastPoseClassifier:
+    def __init__(self, arrays):
+        self.kind = str(arrays["kind"])
+        self.labels = np.asarray(arrays["labels"]).astype(str)
+        self.mean = np.asarray(arrays["mean"], dtype=np.float32)
+        self.scale = np.asarray(arrays["scale"], dtype=np.float32)
+        self.num_features = len(self.mean)
+        self.normalize = bool(arrays.get("normalize", 0))
+
+        if self.kind == "linear":
+            self.W = np.asarray(arrays["W"], dtype=np.float32)
+            self.b = np.asarray(arrays["b"], dtype=np.float32)
+        elif self.kind == "mlp":
+            n_layers = int(arrays["n_layers"])
+            self.layers = [
+                (np.asarray(arrays[f"W{i}"], dtype=np.float32), np.asarray(arrays[f"b{i}"], dtype=np.float32))
+                for i in range(n_layers)
+            ]
+        elif self.kind == "knn":
+            self.X = np.asarray(arrays["X"], dtype=np.float32)
+            self.y = np.asarray(arrays["y"], dtype=np.intp)
+            self.k = int(arrays["k"])
+            self._x_sq = np.einsum("ij,ij->i", self.X, self.X)
+        else:
+            raise ValueError(f"Unknown classifier kind: {self.kind}")
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def _prepare(self, features):
+        x = np.asarray(features, dtype=np.float32).reshape(-1, self.num_features)
+        if self.normalize:
+            x = normalize_pose_features(x)
+        return (x - self.mean) / self.scale
+
+    def predict_proba(self, features):
+        """Class probabilities for a (N, F) batch (or one sample), shape (N, C)."""
+        x = self._prepare(features)
+
+        if self.kind == "linear":
+            logits = x @ self.W + self.b
+            if logits.shape[1] == 1:  # binary logistic regression
+                p = 1.0 / (1.0 + np.exp(-logits))
+                return np.hstack([1.0 - p, p])
+            return _softmax(logits)
+
+        if self.kind == "mlp":
+            h = x
+            for W, b in self.layers[:-1]:
+                h = np.maximum(h @ W + b, 0.0)
+            W, b = self.layers[-1]
+            logits = h @ W + b
+            if logits.shape[1] == 1:  # binary: one logistic output unit
+                p = 1.0 / (1.0 + np.exp(-logits))
+                return np.hstack([1.0 - p, p])
+            return _softmax(logits)
+
+        # knn: squared distances via |x|^2 - 2 x.X + |X|^2, then vote among the k closest
+        d = np.einsum("ij,ij->i", x, x)[:, None] - 2.0 * (x @ self.X.T) + self._x_sq
+        k = min(self.k, len(self.X))
+        nearest = np.argpartition(d, k - 1, axis=1)[:, :k]
+        votes = np.zeros((len(x), len(self.labels)), dtype=np.float32)
+        np.add.at(votes, (np.arange(len(x))[:, None], self.y[nearest]), 1.0)
+        return votes / k
+
+    def predict_codes(self, features):
+        return self.predict_proba(features).argmax(axis=1)
+
+    def predict(self, features):
+        """Label strings for a (N, F) batch."""
+        return self.labels[self.predict_codes(features)]
+
+    def predict_one(self, landmarks):
+        """Label for a single frame of (33, 4) landmarks or 132 flat features."""
+        return self.labels[int(self.predict_codes(landmarks)[0])]
+
+
+class SklearnPoseClassifier:
+    """
+    Pickleable wrapper for models the runtime can't export: `pipeline` takes
+    raw landmark rows and predicts label codes, this maps them back to
+    `labels`, with the same predict methods as FastPoseClassifier.
+    """
+
+    def __init__(self, pipeline, labels, num_features=33 * 4):
+        self.pipeline = pipeline
+        self.labels = np.asarray(labels).astype(str)
+        self.num_features = num_features
+
+    def _rows(self, features):
+        return np.asarray(features, dtype=np.float32).reshape(-1, self.num_features)
+
+    def predict_proba(self, features):
+        return self.pipeline.predict_proba(self._rows(features))
+
+    def predict_codes(self, features):
+        return np.asarray(self.pipeline.predict(self._rows(features)), dtype=np.intp)
+
+    def predict(self, features):
+        """Label strings for a (N, F) batch."""
+        return self.labels[self.predict_codes(features)]
+
+    def predict_one(self, landmarks):
+        return self.labels[int(self.predict_codes(landmarks)[0])]
+
+
+@functools.lru_cache(maxsize=8)
+def load_classifier(path):
+    """Loads an exported classifier once per process."""
+    return FastPoseClassifier.load(path)
+
+
+def is_exportable(model):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.neighbors import KNeighborsClassifier
+
+    if isinstance(model, MLPClassifier):
+        return model.activation == "relu"
+    return isinstance(model, (LogisticRegression, KNeighborsClassifier))
+
+
+def export_classifier(model, path, labels, scaler=None, normalize=False):
+    """
+    Exports a fitted scikit-learn LogisticRegression, MLPClassifier or
+    KNeighborsClassifier (trained on `scaler`-standardized features) to .npz.
+    `labels` are the class names, in the order of the model's class codes.
+    Set `normalize` if the model was trained on normalize_pose_features() output.
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.neighbors import KNeighborsClassifier
+
+    n_features = model.n_features_in_
+    arrays = {
+        "labels": np.asarray(labels, dtype=str),
+        "normalize": np.int8(bool(normalize)),
+        "mean": np.zeros(n_features, dtype=np.float32) if scaler is None else scaler.mean_.astype(np.float32),
+        "scale": np.ones(n_features, dtype=np.float32) if scaler is None else scaler.scale_.astype(np.float32),
+    }
+    classes = np.asarray(model.classes_)
+    if not np.array_equal(classes, np.arange(len(classes))):
+        raise ValueError("Export expects a model trained on integer label codes 0..C-1")
+
+    if isinstance(model, LogisticRegression):
+        arrays.update(kind="linear", W=model.coef_.T.astype(np.float32), b=model.intercept_.astype(np.float32))
+    elif isinstance(model, MLPClassifier):
+        if model.activation != "relu":
+            raise ValueError("Only ReLU MLPs can be exported")
+        arrays.update(kind="mlp", n_layers=len(model.coefs_))
+        for i, (W, b) in enumerate(zip(model.coefs_, model.intercepts_)):
+            arrays[f"W{i}"] = W.astype(np.float32)
+            arrays[f"b{i}"] = b.astype(np.float32)
+    elif isinstance(model, KNeighborsClassifier):
+        X = np.asarray(model._fit_X, dtype=np.float32)
+        arrays.update(kind="knn", X=X, y=np.asarray(model._y, dtype=np.int32), k=model.n_neighbors)
+    else:
+        raise ValueError(f"Can't export {type(model).__name__}")
+
+    np.savez(path, **arrays)
@@ -2,6 +2,9 @@ import numpy as np
 import os
 import math
 
+from backend.feedback_engine.angle_engine import compute_angles
+from backend.feedback_engine.reference_store import load_reference_array
+
 # Important points for angle calculation
 IMPORTANT_ANGLE_PAIRS = [
     (11, 13, 15),  # Right Shoulder-Elbow-Wrist
@@ -13,6 +16,7 @@ IMPORTANT_ANGLE_PAIRS = [
     (23, 11, 13),  # Hip-Shoulder-Elbow Right
     (24, 12, 14)   # Hip-Shoulder-Elbow Left
 ]
+IMPORTANT_ANGLE_TABLE = np.array(IMPORTANT_ANGLE_PAIRS, dtype=np.intp)
 
 def calculate_angle(a, b, c):
     """Calculate angle (in degrees) between three points."""
@@ -29,66 +33,92 @@ def calculate_angle(a, b, c):
 
 def extract_important_angles_safe(landmarks_list):
     """Extract joint angles for important body parts."""
-    angles = []
-    for (a, b, c) in IMPORTANT_ANGLE_PAIRS:
-        if a < len(landmarks_list) and b < len(landmarks_list) and c < len(landmarks_list):
-            a_point = landmarks_list[a][:3]  # Take only (x, y, z)
-            b_point = landmarks_list[b][:3]
-            c_point = landmarks_list[c][:3]
-            angle = calculate_angle(a_point, b_point, c_point)
-            angles.append(angle)
-        else:
-            angles.append(0)  # fallback dummy
-    return np.array(angles)
-
+    landmarks = np.asarray(landmarks_list)
+    if len(landmarks) > IMPORTANT_ANGLE_TABLE.max():
+        return compute_angles(landmarks, IMPORTANT_ANGLE_TABLE, dims=3)
 
-def load_single_reference_landmarks(filepath):
-    """Load only a single .npz pose file."""
-    data = np.load(filepath)
-    return data['landmarks']
+    # Partial landmark list: only angles whose joints are all present
+    angles = np.zeros(len(IMPORTANT_ANGLE_TABLE))  # fallback dummy
+    valid = (IMPORTANT_ANGLE_TABLE < len(landmarks)).all(axis=1)
+    if valid.any():
+        angles[valid] = compute_angles(landmarks, IMPORTANT_ANGLE_TABLE[valid], dims=3)
+    return angles
 
-def flip_left_right_angles(angles_array):
-    """Swap left and right body parts in angle array for mirror comparison."""
-    flip_indices = [1, 0, 3, 2, 5, 4, 7, 6]  # swap right and left angles
-    flipped = angles_array.copy()
-    for i, j in enumerate(flip_indices):
-        flipped[i] = angles_array[j]
-    return flipped
-
-def compute_pose_accuracy(live_landmarks, reference_landmarks_list):
-    """Compare joint angles, allowing mirror flip matching."""
-    live_angles = extract_important_angles_safe(live_landmarks)
-    live_flipped = flip_left_right_angles(live_angles)
-    best_score = 0
 
-    for ref_landmarks in reference_landmarks_list:
-        ref_angles = extract_important_angles_safe(ref_landmarks)
+def extract_important_angles_batch(landmarks_sequence):
+    """Extract important joint angles for a whole (N, 33, C) sequence at once. Returns (N, 8)."""
+    return compute_angles(landmarks_sequence, IMPORTANT_ANGLE_TABLE, dims=3)
 
-        if live_angles.shape != ref_angles.shape:
-            continue  # skip mismatch
 
-        # Normal comparison
-        diff_normal = np.abs(live_angles - ref_angles)
-        accuracy_normal = max(0, 100 - np.mean(diff_normal))
-
-        # Flipped comparison
-        diff_flipped = np.abs(live_flipped - ref_angles)
-        accuracy_flipped = max(0, 100 - np.mean(diff_flipped))
-
-        # Take better
-        accuracy = max(accuracy_normal, accuracy_flipped)
+def load_single_reference_landmarks(filepath):
+    """Load only a single .npz pose file (cached, read-only)."""
+    return load_reference_array(filepath, 'landmarks')
 
-        if accuracy > best_score:
-            best_score = accuracy
+FLIP_INDICES = np.array([1, 0, 3, 2, 5, 4, 7, 6])  # swap right and left angles
 
-    return best_score
+def flip_left_right_angles(angles_array):
+    """Swap left and right body parts in angle array for mirror comparison."""
+    return np.asarray(angles_array)[..., FLIP_INDICES]
+
+
+class ReferenceAngleIndex:
+    """
+    Joint angles of every stored reference frame, computed once at load time.
+
+    Keeps a (2, M, 8) matrix holding the reference angles and their
+    left/right mirrored version, so a live frame is scored against all
+    M references (both orientations) with a single broadcast.
+    """
+
+    def __init__(self, reference_landmarks_list):
+        references = np.asarray(reference_landmarks_list, dtype=np.float32)
+        if references.ndim == 2:  # a single averaged pose
+            references = references[np.newaxis]
+
+        self.angles = extract_important_angles_batch(references)
+        self.mirrored_angles = flip_left_right_angles(self.angles)
+        self._stacked = np.stack([self.angles, self.mirrored_angles])
+
+    def __len__(self):
+        return len(self.angles)
+
+    def match(self, live_landmarks):
+        """
+        Returns:
+            (accuracy, best_index, deviations) where deviations are the signed
+            per-joint differences (live - reference) against the best match,
+            in degrees and in IMPORTANT_ANGLE_PAIRS order.
+        """
+        if len(self) == 0:
+            return 0, -1, np.zeros(len(IMPORTANT_ANGLE_PAIRS))
+
+        live_angles = extract_important_angles_safe(live_landmarks)
+        deviations = live_angles - self._stacked
+        mean_errors = np.abs(deviations).mean(axis=2)
+
+        mirrored, best_index = np.unravel_index(np.argmin(mean_errors), mean_errors.shape)
+        accuracy = max(0, 100 - mean_errors[mirrored, best_index])
+        return accuracy, int(best_index), deviations[mirrored, best_index]
+
+
+def compute_pose_match(live_landmarks, reference):
+    """
+    Compare joint angles against every reference, allowing mirror flip matching.
+    `reference` is a ReferenceAngleIndex or a raw list of reference landmarks.
+    Returns (accuracy, best_index, per-joint deviations).
+    """
+    if not isinstance(reference, ReferenceAngleIndex):
+        reference = ReferenceAngleIndex(reference)
+    return reference.match(live_landmarks)
+
+def compute_pose_accuracy(live_landmarks, reference):
+    """Compare joint angles, allowing mirror flip matching."""
+    accuracy, _, _ = compute_pose_match(live_landmarks, reference)
+    return accuracy
 
 def check_enough_landmarks(landmarks_list, required_ids=[11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28, 31, 32]):
     """Check if enough important joints have high visibility."""
-    visible_count = 0
-    for idx in required_ids:
-        if idx < len(landmarks_list):
-            visibility = landmarks_list[idx][3]
-            if visibility > 0.5:
-                visible_count += 1
+    landmarks = np.asarray(landmarks_list)
+    ids = [idx for idx in required_ids if idx < len(landmarks)]
+    visible_count = int((landmarks[ids, 3] > 0.5).sum()) if ids else 0
     return visible_count >= int(0.75 * len(required_ids))
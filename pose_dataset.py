@@ -0,0 +1,199 @@
+# pose_dataset.py
+
+import os
+import re
+import csv
+import json
+import hashlib
+import numpy as np
+
+# Binary, appendable training dataset for the pose classifier.
+#
+#   pose_dataset/
+#     features.f32   raw float32 rows of 33 x (x, y, z, visibility) = 132 values
+#     labels.i32     raw int32 label code per row
+#     labels.json    label names, code = position in the list
+#     rows.csv       per-row source and content hash
+#     skipped.csv    images that were processed but gave no pose (hash, source, status)
+#
+# Appending only writes the new rows; reading memory-maps the binary files.
+#
+# Rows converted from the old pose_landmarks.csv don't know their image, so
+# their source is "<csv name>:<row>" and their hash is the row's own. They
+# can't be matched against image hashes; a converted row is only replaced
+# once the extractor has stored a row with the same label and landmarks.
+
+DATASET_DIR = "pose_dataset"
+NUM_FEATURES = 33 * 4
+CONVERTED_SOURCE = re.compile(r"\.csv:\d+$")
+
+
+class PoseDataset:
+    def __init__(self, path=DATASET_DIR, num_features=NUM_FEATURES):
+        self.path = path
+        self.num_features = num_features
+        self._features_path = os.path.join(path, "features.f32")
+        self._labels_path = os.path.join(path, "labels.i32")
+        self._label_names_path = os.path.join(path, "labels.json")
+        self._rows_path = os.path.join(path, "rows.csv")
+        self._skipped_path = os.path.join(path, "skipped.csv")
+        os.makedirs(path, exist_ok=True)
+
+        self.label_names = []
+        if os.path.exists(self._label_names_path):
+            with open(self._label_names_path) as f:
+                self.label_names = json.load(f)
+
+    def __len__(self):
+        # An interrupted append may leave one file longer than the other
+        n_features = self._file_size(self._features_path) // (4 * self.num_features)
+        n_labels = self._file_size(self._labels_path) // 4
+        return min(n_features, n_labels)
+
+    @staticmethod
+    def _file_size(path):
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def features(self):
+        """(rows, 132) float32, memory-mapped read-only."""
+        if len(self) == 0:
+            return np.empty((0, self.num_features), dtype=np.float32)
+        return np.memmap(self._features_path, dtype=np.float32, mode="r", shape=(len(self), self.num_features))
+
+    def label_codes(self):
+        """(rows,) int32 codes into label_names, memory-mapped read-only."""
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int32)
+        return np.memmap(self._labels_path, dtype=np.int32, mode="r", shape=(len(self),))
+
+    def labels(self):
+        """(rows,) array of label strings."""
+        return np.asarray(self.label_names, dtype=object)[self.label_codes()]
+
+    def rows(self):
+        """Per-row metadata as a list of {"source", "hash"} dicts."""
+        if not os.path.exists(self._rows_path):
+            return []
+        with open(self._rows_path, newline="") as f:
+            return list(csv.DictReader(f))[:len(self)]
+
+    def known_hashes(self):
+        """Content hashes of every image already stored or skipped."""
+        hashes = {row["hash"] for row in self.rows()}
+        if os.path.exists(self._skipped_path):
+            with open(self._skipped_path, newline="") as f:
+                hashes.update(row["hash"] for row in csv.DictReader(f))
+        return hashes
+
+    def converted_rows(self):
+        """(rows,) bool mask of rows converted from a CSV rather than extracted from an image."""
+        return np.array([bool(CONVERTED_SOURCE.search(row["source"])) for row in self.rows()], dtype=bool)
+
+    def superseded_rows(self, tolerance=1e-4):
+        """
+        (rows,) bool mask of converted rows that an extracted row duplicates:
+        same label and every value within `tolerance`. Converted rows with
+        no extracted counterpart are never marked.
+        """
+        converted = self.converted_rows()
+        superseded = np.zeros(len(converted), dtype=bool)
+        if not converted.any() or converted.all():
+            return superseded
+        features, codes = self.features(), self.label_codes()
+        for code in np.unique(codes[converted]):
+            old = np.flatnonzero(converted & (codes == code))
+            new = np.asarray(features[~converted & (codes == code)])
+            if not len(new):
+                continue
+            for start in range(0, len(old), 256):
+                chunk = old[start:start + 256]
+                diff = np.abs(np.asarray(features[chunk])[:, None, :] - new[None, :, :]).max(axis=2)
+                superseded[chunk] = (diff <= tolerance).any(axis=1)
+        return superseded
+
+    def drop_rows(self, mask):
+        """Rewrites the dataset without the rows where `mask` is True."""
+        keep = ~np.asarray(mask, dtype=bool)
+        rows = self.rows()
+        features = np.array(self.features()[keep])
+        codes = np.array(self.label_codes()[keep])
+        kept_rows = [(row["source"], row["hash"]) for row, k in zip(rows, keep) if k]
+
+        # Written next to the originals, then swapped in
+        for path, data in ((self._features_path, features.tobytes()), (self._labels_path, codes.tobytes())):
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+        with open(self._rows_path + ".tmp", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["source", "hash"])
+            writer.writerows(kept_rows)
+        for path in (self._features_path, self._labels_path, self._rows_path):
+            os.replace(path + ".tmp", path)
+        return int((~keep).sum())
+
+    def _code_for(self, label):
+        if label not in self.label_names:
+            self.label_names.append(label)
+            with open(self._label_names_path, "w") as f:
+                json.dump(self.label_names, f, indent=2)
+        return self.label_names.index(label)
+
+    def append(self, features, labels, sources, hashes):
+        """Appends rows without touching the existing ones."""
+        features = np.ascontiguousarray(features, dtype=np.float32).reshape(-1, self.num_features)
+        if not len(features):
+            return
+        codes = np.array([self._code_for(label) for label in labels], dtype=np.int32)
+
+        self._append_csv(self._rows_path, ["source", "hash"], zip(sources, hashes))
+        with open(self._features_path, "ab") as f:
+            f.write(features.tobytes())
+        with open(self._labels_path, "ab") as f:
+            f.write(codes.tobytes())
+
+    def mark_skipped(self, entries):
+        """Records (hash, source, status) of images that produced no row."""
+        self._append_csv(self._skipped_path, ["hash", "source", "status"], entries)
+
+    @staticmethod
+    def _append_csv(path, header, rows):
+        write_header = not os.path.exists(path)
+        with open(path, "a", newline="") as f:
+            writer = csv.writer(f)
+            if write_header:
+                writer.writerow(header)
+            writer.writerows(rows)
+
+
+def convert_csv(csv_path="pose_landmarks.csv", dataset_path=DATASET_DIR):
+    """One-time conversion of the old pose_landmarks.csv into a PoseDataset."""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    features = df.drop(columns=["label"]).to_numpy(dtype=np.float32)
+    # The CSV doesn't know which image a row came from, so hash the row itself.
+    # That only keeps reconversion idempotent: these hashes never match an
+    # image, so the extractor drops a converted row only when it has stored
+    # the same landmarks again from an image (see superseded_rows).
+    hashes = [hashlib.sha1(row.tobytes()).hexdigest() for row in features]
+    sources = [f"{os.path.basename(csv_path)}:{i}" for i in range(len(df))]
+
+    dataset = PoseDataset(dataset_path, num_features=features.shape[1])
+    known = dataset.known_hashes()
+    keep = [i for i, h in enumerate(hashes) if h not in known]
+    dataset.append(
+        features[keep],
+        df["label"].iloc[keep].tolist(),
+        [sources[i] for i in keep],
+        [hashes[i] for i in keep],
+    )
+    return len(keep)
+
+
+if __name__ == "__main__":
+    import sys
+
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "pose_landmarks.csv"
+    dataset_path = sys.argv[2] if len(sys.argv) > 2 else DATASET_DIR
+    added = convert_csv(csv_path, dataset_path)
+    print(f"✅ Converted {added} rows from {csv_path} into {dataset_path}/")
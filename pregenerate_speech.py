@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import time
+from backend.voice.audio_service import SYNTHESIS_BACKENDS
+from backend.voice.speech_cache import SpeechCache, SPEECH_CACHE_DIR
+
+# Fills the speech cache with every feedback message the app can speak, so
+# sessions start with zero synthesis. Already cached messages are skipped;
+# editing a message changes its key and only that message is regenerated.
+# Clips are keyed by engine, voice and language, so the app only plays the
+# ones made by the engine it speaks with (pyttsx3 by default); --engine tone
+# is an offline stand-in for testing without any TTS installed.
+
+
+def collect_feedback_messages():
+    from backend.feedback_engine.yoga_feedback_engine import feedback_lines
+    from backend.voice.generate_clips import feedback_lines as clip_lines
+    from backend.feedback_engine.workout_feedback import WorkoutFeedback
+    from backend.feedback_engine.rules import POSTURE_RULES
+
+    messages = []
+    for lines in feedback_lines.values():
+        messages.extend(lines)
+    messages.extend(clip_lines.values())
+    messages.extend(WorkoutFeedback.message_map.values())
+    for joints in POSTURE_RULES.values():
+        messages.extend(rule["message"] for rule in joints.values())
+    return list(dict.fromkeys(messages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate synthesized speech for all feedback messages.")
+    parser.add_argument("--engine", default="pyttsx3", choices=sorted(SYNTHESIS_BACKENDS))
+    parser.add_argument("--cache-dir", default=SPEECH_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    backend = SYNTHESIS_BACKENDS[args.engine]()
+    cache = SpeechCache(args.cache_dir)
+    messages = collect_feedback_messages()
+
+    start = time.perf_counter()
+    generated, cached, failed = cache.fill(messages, backend, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"📊 {len(messages)} messages ({args.engine}): {generated} generated, {cached} already cached, "
+          f"{failed} failed in {elapsed:.1f}s")
+    if failed:
+        print("⚠️ Some messages could not be synthesized; they will be synthesized on first use.")
+    else:
+        print(f"✅ Speech cache ready: {args.cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
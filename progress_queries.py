@@ -0,0 +1,159 @@
+# database/progress_queries.py
+
+import datetime
+from database.logger import get_read_connection
+
+# Queries behind the Progress page. Session rows are read only for the
+# selected range, through the (pose, date) / date indexes. Totals, counts,
+# streaks and the calendar read the daily_rollup / pose_rollup tables the
+# session writer keeps up to date, so they cost the same however long the
+# history is. Dates are stored as "YYYY-MM-DD HH:MM:SS" text, so range
+# filters are plain string comparisons; rollups filter on the day part.
+
+def since_days(days, today=None):
+    """Start of the day `days` days ago, as a date filter ("YYYY-MM-DD")."""
+    today = today or datetime.date.today()
+    return (today - datetime.timedelta(days=days)).isoformat()
+
+
+def _where(pose=None, since=None):
+    clauses, params = [], []
+    if pose is not None:
+        clauses.append("pose = ?")
+        params.append(pose)
+    if since is not None:
+        clauses.append("date >= ?")
+        params.append(since)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def _day_where(pose=None, since=None):
+    clauses, params = [], []
+    if pose is not None:
+        clauses.append("pose = ?")
+        params.append(pose)
+    if since is not None:
+        clauses.append("day >= ?")
+        params.append(since[:10])
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def get_rollup_version():
+    """Changes whenever a session is added; use it to key cached charts."""
+    row = get_read_connection().execute("SELECT value FROM rollup_meta WHERE key = 'version'").fetchone()
+    return row[0] if row else 0
+
+
+def list_poses():
+    rows = get_read_connection().execute('SELECT pose FROM pose_rollup ORDER BY pose').fetchall()
+    return [row[0] for row in rows]
+
+
+def get_sessions(pose=None, since=None):
+    """(id, pose, reps, feedback, duration_seconds, date) rows, newest first."""
+    where, params = _where(pose, since)
+    return get_read_connection().execute(
+        f'SELECT id, pose, reps, feedback, duration_seconds, date FROM sessions{where} ORDER BY date DESC',
+        params).fetchall()
+
+
+def summarize_feedback_tags(tags):
+    """tags: (tag, is_good, is_issue, is_tip) rows of one session, in order."""
+    if not tags:
+        return "❔ No feedback available."
+    good = [tag for tag, is_good, _, _ in tags if is_good]
+    issues = [tag for tag, _, is_issue, _ in tags if is_issue]
+    tips = [tag for tag, _, _, is_tip in tags if is_tip]
+    summary = ""
+    if good:
+        summary += f"✅ Good: {', '.join(good[:2])}. "
+    if issues:
+        summary += f"⚠️ Needs work: {', '.join(issues[:2])}. "
+    if tips:
+        summary += f"🔁 Tip: {', '.join(tips[:1])}."
+    return summary or "😐 Neutral session."
+
+
+def get_feedback_summaries(session_ids, chunk_size=500):
+    """{session_id: summary text} from the feedback tag table."""
+    session_ids = list(session_ids)
+    tags = {session_id: [] for session_id in session_ids}
+    conn = get_read_connection()
+    for start in range(0, len(session_ids), chunk_size):
+        chunk = session_ids[start:start + chunk_size]
+        rows = conn.execute(
+            f'SELECT session_id, tag, is_good, is_issue, is_tip FROM session_feedback '
+            f'WHERE session_id IN ({",".join("?" * len(chunk))}) ORDER BY session_id, position',
+            chunk).fetchall()
+        for session_id, *tag in rows:
+            tags[session_id].append(tag)
+    return {session_id: summarize_feedback_tags(rows) for session_id, rows in tags.items()}
+
+
+def get_session_summary(pose=None, since=None):
+    """(session count, total seconds, most frequent pose or None)."""
+    where, params = _day_where(pose, since)
+    conn = get_read_connection()
+    count, total = conn.execute(
+        f'SELECT COALESCE(SUM(sessions), 0), COALESCE(SUM(duration_seconds), 0) FROM daily_rollup{where}',
+        params).fetchone()
+    top = conn.execute(
+        f'SELECT pose FROM daily_rollup{where} GROUP BY pose ORDER BY SUM(sessions) DESC, pose LIMIT 1',
+        params).fetchone()
+    return count, total, top[0] if top else None
+
+
+def count_sessions(pose=None, since=None):
+    where, params = _day_where(pose, since)
+    return get_read_connection().execute(
+        f'SELECT COALESCE(SUM(sessions), 0) FROM daily_rollup{where}', params).fetchone()[0]
+
+
+def get_daily_counts(pose=None, since=None):
+    """(day, sessions) rows, oldest first."""
+    where, params = _day_where(pose, since)
+    return get_read_connection().execute(
+        f'SELECT day, SUM(sessions) FROM daily_rollup{where} GROUP BY day ORDER BY day', params).fetchall()
+
+
+def get_pose_counts(pose=None, since=None):
+    where, params = _day_where(pose, since)
+    return get_read_connection().execute(
+        f'SELECT pose, SUM(sessions) AS total FROM daily_rollup{where} GROUP BY pose ORDER BY total DESC',
+        params).fetchall()
+
+
+def get_pose_totals():
+    """All-time (pose, sessions, reps, duration_seconds, first_date, last_date) rows."""
+    return get_read_connection().execute(
+        'SELECT pose, sessions, reps, duration_seconds, first_date, last_date FROM pose_rollup ORDER BY sessions DESC'
+    ).fetchall()
+
+
+def get_tag_counts(pose=None, since=None):
+    where, params = _where(pose, since)
+    return get_read_connection().execute(
+        f'SELECT tag, COUNT(*) AS sessions FROM session_feedback{where} GROUP BY tag ORDER BY sessions DESC',
+        params).fetchall()
+
+
+def get_streaks(pose=None, since=None, today=None):
+    """
+    (current, longest) runs of consecutive active days. Runs are found in SQL
+    (day minus its row number is constant within a run); the current streak
+    is the run ending today or yesterday.
+    """
+    where, params = _day_where(pose, since)
+    runs = get_read_connection().execute(f'''
+        WITH days AS (SELECT DISTINCT day FROM daily_rollup{where}),
+             runs AS (SELECT day, julianday(day) - ROW_NUMBER() OVER (ORDER BY day) AS run FROM days)
+        SELECT MAX(day), COUNT(*) FROM runs GROUP BY run
+    ''', params).fetchall()
+    if not runs:
+        return 0, 0
+
+    today = today or datetime.date.today()
+    recent = {today.isoformat(), (today - datetime.timedelta(days=1)).isoformat()}
+    current = max((length for last_day, length in runs if last_day in recent), default=0)
+    longest = max(length for _, length in runs)
+    return current, longest
@@ -0,0 +1,97 @@
+# backend/feedback_engine/reference_store.py
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ReferenceStore:
+    """
+    Process-wide LRU cache for pose / motion / angle reference files.
+
+    Entries are keyed on (absolute path, mtime, kind), so a rebuilt reference
+    file is picked up on the next request while unchanged ones are served from
+    memory across Streamlit reruns and sessions. Arrays are handed out
+    read-only; plain .npy files are memory-mapped instead of read.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, kind, loader):
+        abs_path = os.path.abspath(path)
+        key = (abs_path, os.stat(abs_path).st_mtime_ns, kind)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = loader(abs_path)
+
+        with self._lock:
+            self.misses += 1
+            # Drop stale versions of the same file before inserting the new one
+            for stale in [k for k in self._entries if k[0] == abs_path and k[2] == kind]:
+                del self._entries[stale]
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _read_only(array):
+    array.setflags(write=False)
+    return array
+
+
+def _load_npy(path):
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        # Object arrays (pickled) can't be memory-mapped
+        return _read_only(np.load(path, allow_pickle=True))
+
+
+_store = ReferenceStore()
+
+
+def get_reference_store():
+    return _store
+
+
+def load_reference_array(path, key=None):
+    """
+    Returns a read-only array from a .npy file, or the `key` member of an .npz file.
+    Raises FileNotFoundError if the file does not exist and KeyError if `key` is missing.
+    """
+    if key is None:
+        return _store.get(path, "npy", _load_npy)
+
+    def load_member(abs_path):
+        with np.load(abs_path) as data:
+            return _read_only(np.asarray(data[key]))
+
+    return _store.get(path, f"npz:{key}", load_member)
+
+
+def load_reference_index(path):
+    """Returns the cached ReferenceAngleIndex for a yoga pose .npz file."""
+    from backend.feedback_engine.pose_comparator import ReferenceAngleIndex
+
+    return _store.get(
+        path,
+        "angle_index",
+        lambda abs_path: ReferenceAngleIndex(load_reference_array(abs_path, "landmarks")),
+    )
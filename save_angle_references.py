@@ -5,7 +5,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import cv2
 import numpy as np
 from backend.pose_detection.mediapipe_model import PoseDetector
-from backend.feedback_engine.angles import calculate_angle_from_landmarks
+from backend.feedback_engine.angle_engine import compile_triplets, compute_angles
+from backend.feedback_engine.angle_reference import save_angle_reference
 
 # Define joints of interest for each workout
 angle_joints = {
@@ -36,7 +37,8 @@ for file in os.listdir(input_dir):
 
         print(f"Processing angles for: {name}")
         cap = cv2.VideoCapture(os.path.join(input_dir, file))
-        angle_records = []
+        frames = []
+        frame_times = []
 
         while cap.isOpened():
             ret, frame = cap.read()
@@ -44,22 +46,21 @@ for file in os.listdir(input_dir):
                 break
 
             results = model.detect_pose(frame)
-            landmarks = model.get_landmarks(results)
-            if not landmarks:
+            landmarks = model.get_landmark_array(results)
+            if landmarks is None:
                 continue
 
-            angles = {}
-            for label, (a, b, c) in angle_joints[name].items():
-                angle = calculate_angle_from_landmarks(landmarks, a, b, c)
-                angles[label] = angle
-
-            angle_records.append(angles)
+            frames.append(landmarks.copy())
+            frame_times.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
 
         cap.release()
 
-        if angle_records:
-            output_path = os.path.join(output_dir, f"{name}_angles_reference.npy")
-            np.save(output_path, angle_records)
+        if frames:
+            # Every angle for every frame of the video in one vectorized call
+            labels, table = compile_triplets(angle_joints[name])
+            all_angles = compute_angles(np.stack(frames), table)
+            output_path = os.path.join(output_dir, f"{name}_angles.npy")
+            save_angle_reference(output_path, labels, all_angles, frame_times)
             print(f"✅ Saved: {output_path}")
         else:
             print(f"❌ No valid angles found for {name}")
@@ -0,0 +1,89 @@
+# database/session_metrics.py
+
+import time
+import numpy as np
+from database.logger import get_read_connection
+
+# Per-session time series, stored next to the sessions table:
+#   session_metrics(session_id, metric, t, value)  frame metrics downsampled to
+#                                                   one mean per interval, and
+#                                                   per-rep values as recorded
+#   session_events(session_id, t, tag)              feedback tags as they fired
+# t is seconds since the session started. Rows are collected in memory while
+# the session runs and written by the session log writer in the same
+# transaction as the session row (see log_session(..., metrics=recorder)).
+
+
+class SessionMetricsRecorder:
+    def __init__(self, frame_interval=0.25):
+        self.frame_interval = frame_interval
+        self.started_at = time.monotonic()
+        self._samples = []
+        self._events = []
+        self._buckets = {}
+
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    def frame(self, metric, value, t=None):
+        """Per-frame value, averaged down to one sample per `frame_interval`."""
+        t = self.elapsed() if t is None else t
+        bucket = int(t / self.frame_interval)
+        current = self._buckets.get(metric)
+        if current is not None and current[0] == bucket:
+            current[1] += value
+            current[2] += 1
+            return
+        if current is not None:
+            self._emit_bucket(metric, current)
+        self._buckets[metric] = [bucket, float(value), 1]
+
+    def rep(self, metric, value, t=None):
+        """Per-rep (or any sparse) value, kept as is."""
+        self._samples.append((metric, self.elapsed() if t is None else t, float(value)))
+
+    def event(self, tag, t=None):
+        self._events.append((self.elapsed() if t is None else t, tag))
+
+    def tags(self):
+        """Distinct event tags, in the order they first fired."""
+        return list(dict.fromkeys(tag for _, tag in self._events))
+
+    def _emit_bucket(self, metric, bucket):
+        index, total, count = bucket
+        self._samples.append((metric, index * self.frame_interval, total / count))
+
+    def close(self):
+        for metric, bucket in self._buckets.items():
+            self._emit_bucket(metric, bucket)
+        self._buckets.clear()
+
+    def write(self, cursor, session_id):
+        """Inserts everything recorded for `session_id`; runs on the writer thread."""
+        self.close()
+        cursor.executemany(
+            'INSERT INTO session_metrics (session_id, metric, t, value) VALUES (?, ?, ?, ?)',
+            [(session_id, metric, t, value) for metric, t, value in self._samples])
+        cursor.executemany(
+            'INSERT INTO session_events (session_id, t, tag) VALUES (?, ?, ?)',
+            [(session_id, t, tag) for t, tag in self._events])
+
+
+def get_session_metric(session_id, metric):
+    """(t, values) arrays for one metric of one session, ordered by time."""
+    rows = get_read_connection().execute(
+        'SELECT t, value FROM session_metrics WHERE session_id = ? AND metric = ? ORDER BY t',
+        (session_id, metric)).fetchall()
+    data = np.asarray(rows, dtype=np.float64).reshape(-1, 2)
+    return data[:, 0], data[:, 1]
+
+
+def get_session_metric_names(session_id):
+    rows = get_read_connection().execute(
+        'SELECT DISTINCT metric FROM session_metrics WHERE session_id = ?', (session_id,)).fetchall()
+    return [row[0] for row in rows]
+
+
+def get_session_events(session_id):
+    return get_read_connection().execute(
+        'SELECT t, tag FROM session_events WHERE session_id = ? ORDER BY t', (session_id,)).fetchall()
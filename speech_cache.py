@@ -0,0 +1,98 @@
+# backend/voice/speech_cache.py
+
+import os
+import json
+import glob
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+SPEECH_CACHE_DIR = "speech_cache"
+
+
+def speech_key(text, voice, language, engine):
+    """Content address of a synthesized message."""
+    payload = json.dumps([engine, voice, language, text], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]
+
+
+class SpeechCache:
+    """
+    Synthesized speech on disk, addressed by hash(text, voice, language, engine).
+
+    Every clip <key>.<ext> has a <key>.json sidecar recording what it says, so
+    a changed message gets a new key instead of replaying a stale clip, and
+    the cache can be preloaded without knowing which engine filled it.
+    Files are written to a temporary name and renamed into place, so
+    concurrent fills never expose a half-written clip.
+    """
+
+    def __init__(self, cache_dir=SPEECH_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key_for(self, text, backend):
+        return speech_key(text, backend.voice, backend.language, backend.name)
+
+    def path_for(self, text, backend):
+        return os.path.join(self.cache_dir, f"{self.key_for(text, backend)}.{backend.extension}")
+
+    def get(self, text, backend):
+        path = self.path_for(text, backend)
+        return path if os.path.exists(path) else None
+
+    def put(self, text, backend):
+        """Synthesizes `text` into the cache (if missing) and returns its path, or None."""
+        path = self.path_for(text, backend)
+        if os.path.exists(path):
+            return path
+
+        key = self.key_for(text, backend)
+        tmp_path = os.path.join(self.cache_dir, f"{key}.{os.getpid()}-{threading.get_ident()}.tmp.{backend.extension}")
+        try:
+            if backend.synthesize(text, tmp_path) is None:
+                return None
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        meta = {"text": text, "voice": backend.voice, "language": backend.language,
+                "engine": backend.name, "file": os.path.basename(path)}
+        with open(os.path.join(self.cache_dir, f"{key}.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        return path
+
+    def entries(self):
+        """Yields (text, path) for every cached clip."""
+        for meta_path in sorted(glob.glob(os.path.join(self.cache_dir, "*.json"))):
+            try:
+                with open(meta_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            path = os.path.join(self.cache_dir, meta["file"])
+            if os.path.exists(path):
+                yield meta["text"], path
+
+    def fill(self, texts, backend, workers=None):
+        """
+        Synthesizes every missing message concurrently.
+        Returns (generated, already_cached, failed) counts.
+        """
+        texts = list(dict.fromkeys(texts))
+        missing = [text for text in texts if self.get(text, backend) is None]
+        workers = max(1, min(workers or backend.concurrency, len(missing) or 1))
+
+        def synthesize(text):
+            try:
+                return self.put(text, backend) is not None
+            except Exception as e:
+                print(f"[Voice Error] Could not synthesize '{text}': {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(synthesize, missing))
+
+        generated = sum(results)
+        return generated, len(texts) - len(missing), len(missing) - generated
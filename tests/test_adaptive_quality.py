@@ -0,0 +1,85 @@
+import pytest
+
+from backend.pose_detection import adaptive_quality
+from backend.pose_detection.adaptive_quality import AdaptiveQualityController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(adaptive_quality.time, "monotonic", clock)
+    return clock
+
+
+def _feed(controller, ms, frames):
+    """Observes `frames` samples of `ms`; returns the switches reported."""
+    return [switch for switch in (controller.observe(ms) for _ in range(frames)) if switch is not None]
+
+
+def test_steps_down_only_after_a_full_window(clock):
+    controller = AdaptiveQualityController(target_fps=10.0, window=5, cooldown_seconds=0)
+    assert controller.settings == (1, 1.0)
+    assert _feed(controller, 150.0, 4) == []
+    assert controller.observe(150.0) == (1, 0.75)
+    # The window restarts at the new level
+    assert _feed(controller, 150.0, 4) == []
+    assert controller.observe(150.0) == (0, 0.75)
+    assert controller.switches == 2
+
+
+def test_stays_put_inside_the_budget(clock):
+    controller = AdaptiveQualityController(target_fps=10.0, window=5, cooldown_seconds=0)
+    # Between upgrade_ratio x budget (60 ms) and the budget (100 ms)
+    assert _feed(controller, 80.0, 50) == []
+    assert controller.settings == (1, 1.0)
+
+
+def test_cooldown_delays_the_next_switch(clock):
+    controller = AdaptiveQualityController(target_fps=10.0, window=5, cooldown_seconds=3.0)
+    clock.now += 3.0
+    assert _feed(controller, 150.0, 5) == [(1, 0.75)]
+    assert _feed(controller, 150.0, 20) == []
+    clock.now += 3.0
+    assert _feed(controller, 150.0, 1) == [(0, 0.75)]
+
+
+def test_does_not_retry_a_level_that_was_over_budget(clock):
+    controller = AdaptiveQualityController(target_fps=10.0, window=5, cooldown_seconds=0, retry_seconds=30.0)
+    assert _feed(controller, 150.0, 5) == [(1, 0.75)]
+    # Fast at the cheaper level, but (1, 1.0) was just measured over budget
+    assert _feed(controller, 20.0, 20) == []
+    clock.now += 31.0
+    assert _feed(controller, 20.0, 5) == [(1, 1.0)]
+
+
+def test_steps_up_to_a_level_that_was_fast_enough(clock):
+    controller = AdaptiveQualityController(target_fps=10.0, window=5, cooldown_seconds=0)
+    assert _feed(controller, 90.0, 5) == []
+    controller.level = 2  # e.g. after a load spike
+    assert _feed(controller, 20.0, 5) == [(1, 1.0)]
+
+
+def test_never_leaves_the_level_range(clock):
+    controller = AdaptiveQualityController(target_fps=10.0, window=2, cooldown_seconds=0, start=(0, 0.5))
+    assert _feed(controller, 500.0, 10) == []
+    assert controller.stats() == {"model_complexity": 0, "input_scale": 0.5, "inference_ms": 500.0,
+                                  "target_fps": 10.0, "switches": 0}
+    assert controller.describe() == "model 0 @ 50% input"
+
+
+def test_set_levels_keeps_the_current_level(clock):
+    controller = AdaptiveQualityController(target_fps=10.0, levels=[(1, 1.0), (1, 0.75)], window=5,
+                                           cooldown_seconds=0)
+    assert _feed(controller, 150.0, 5) == [(1, 0.75)]
+    controller.set_levels(adaptive_quality.QUALITY_LEVELS)
+    assert controller.settings == (1, 0.75)
+    # The wider range now lets it step further down
+    assert _feed(controller, 150.0, 5) == [(0, 0.75)]
@@ -0,0 +1,105 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from analyze_video import analyze_video, iter_video_frames, summarize_metrics, write_metrics
+
+
+@pytest.fixture
+def video_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # no motion_references/ default to pick up
+    path = str(tmp_path / "session.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(20):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def squat_landmarks(knee_angle):
+    """Visible landmarks with the hip-knee-ankle angle at `knee_angle` degrees."""
+    landmarks = np.zeros((33, 4))
+    landmarks[:, 3] = 1.0
+    theta = np.radians(knee_angle)
+    landmarks[25, :2] = (0.5, 0.5)
+    landmarks[23, :2] = (0.5, 0.3)  # hip straight above the knee
+    landmarks[27, :2] = (0.5 + 0.2 * np.sin(theta), 0.5 - 0.2 * np.cos(theta))
+    return landmarks
+
+
+class ScriptedDetector:
+    """Returns the next scripted knee angle per frame; None means no person found."""
+
+    def __init__(self, angles):
+        self.angles = list(angles)
+        self.calls = 0
+
+    def detect_pose(self, frame):
+        self.calls += 1
+        return self.angles.pop(0)
+
+    def get_landmark_array(self, results):
+        return None if results is None else squat_landmarks(results)
+
+
+def test_stride_decodes_every_nth_frame(video_path):
+    frames = list(iter_video_frames(video_path, stride=3))
+    assert [index for index, _, _ in frames] == [0, 3, 6, 9, 12, 15, 18]
+    assert all(frame.shape == (48, 64, 3) for _, _, frame in frames)
+    times = [t for _, t, _ in frames]
+    assert times == sorted(times)
+
+
+def test_missing_video_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        list(iter_video_frames(str(tmp_path / "missing.avi")))
+
+
+def test_counts_squat_reps_and_skips_undetected_frames(video_path):
+    rep = [170, 130, 80, 130, 175]
+    angles = rep + [None, None] + rep + rep + [170, 170, 170]
+    detector = ScriptedDetector(angles)
+
+    frame_metrics, summary = analyze_video(video_path, exercise="squat", detector=detector)
+
+    assert detector.calls == 20
+    assert summary["reps"] == frame_metrics[-1]["reps"] == 3
+    assert summary["frames_analyzed"] == 20
+    assert summary["detection_rate"] == 0.9
+    assert not frame_metrics[5]["detected"] and "angle" not in frame_metrics[5]
+    assert frame_metrics[2]["angle"] == pytest.approx(80, abs=0.01)
+    assert "motion_score" not in frame_metrics[0]  # no reference found, no matcher
+
+
+def test_summary_of_empty_session():
+    summary = summarize_metrics([], 0.0)
+    assert summary["frames_analyzed"] == 0
+    assert summary["detection_rate"] == 0.0 and summary["processing_fps"] == 0.0
+
+
+def test_summary_reports_dominant_pose_and_means():
+    frame_metrics = [
+        {"time": 0.0, "detected": True, "visible": True, "pose_label": "tree", "pose_accuracy": 80.0},
+        {"time": 0.5, "detected": True, "visible": False, "pose_label": "tree", "pose_accuracy": 90.0},
+        {"time": 1.0, "detected": False, "visible": False, "pose_label": "warrior"},
+    ]
+    summary = summarize_metrics(frame_metrics, 0.5)
+    assert summary["dominant_pose"] == "tree"
+    assert summary["mean_pose_accuracy"] == 85.0 and summary["max_pose_accuracy"] == 90.0
+    assert summary["visible_rate"] == pytest.approx(0.333)
+    assert summary["realtime_factor"] == 2.0
+
+
+@pytest.mark.parametrize("name", ["metrics.json", "metrics.jsonl"])
+def test_write_metrics_round_trips(tmp_path, name):
+    frame_metrics = [{"frame": 0, "detected": True}, {"frame": 2, "detected": False}]
+    path = str(tmp_path / name)
+    write_metrics(frame_metrics, path)
+    with open(path) as f:
+        if name.endswith(".jsonl"):
+            loaded = [json.loads(line) for line in f]
+        else:
+            loaded = json.load(f)
+    assert loaded == frame_metrics
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from backend.feedback_engine.angle_engine import compile_triplets, compute_angles, compute_named_angles
+from backend.feedback_engine.angles import calculate_angle
+
+
+def _landmarks(n=None, seed=0):
+    shape = (33, 4) if n is None else (n, 33, 4)
+    return np.random.default_rng(seed).random(shape)
+
+
+def test_compile_triplets_from_list_and_dict():
+    labels, table = compile_triplets([(11, 13, 15), (23, 25, 27)])
+    assert labels == [None, None]
+    assert table.shape == (2, 3) and table.dtype == np.intp
+
+    labels, table = compile_triplets({"elbow": (11, 13, 15)})
+    assert labels == ["elbow"]
+    assert table.tolist() == [[11, 13, 15]]
+
+
+def test_matches_scalar_angle_for_every_triplet():
+    landmarks = _landmarks()
+    triplets = [(11, 13, 15), (12, 14, 16), (23, 25, 27), (11, 23, 25)]
+    _, table = compile_triplets(triplets)
+    expected = [calculate_angle(landmarks[a, :2], landmarks[b, :2], landmarks[c, :2]) for a, b, c in triplets]
+    np.testing.assert_allclose(compute_angles(landmarks, table), expected, atol=1e-6)
+
+
+def test_batch_matches_frame_by_frame():
+    sequence = _landmarks(10)
+    _, table = compile_triplets([(11, 13, 15), (23, 25, 27)])
+    batch = compute_angles(sequence, table, dims=3)
+    assert batch.shape == (10, 2)
+    np.testing.assert_allclose(batch, [compute_angles(frame, table, dims=3) for frame in sequence])
+
+
+@pytest.mark.parametrize("c, expected", [((1.0, 0.0), 0.0), ((0.0, 1.0), 90.0), ((-1.0, 0.0), 180.0)])
+def test_stable_at_extremes(c, expected):
+    landmarks = np.zeros((3, 2))
+    landmarks[0] = (2.0, 0.0)
+    landmarks[2] = c
+    assert compute_angles(landmarks, np.array([[0, 1, 2]]))[0] == pytest.approx(expected, abs=1e-9)
+
+
+def test_named_angles():
+    landmarks = np.zeros((3, 2))
+    landmarks[0], landmarks[2] = (1.0, 0.0), (0.0, 1.0)
+    assert compute_named_angles(landmarks, {"corner": (0, 1, 2)}) == {"corner": pytest.approx(90.0)}
@@ -0,0 +1,95 @@
+from backend.voice import audio_service
+from backend.voice.audio_service import (
+    AudioOutputService, NullSynthesisBackend, ToneSynthesisBackend,
+    PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW,
+)
+from backend.voice.speech_cache import SpeechCache
+from backend.voice.voice_feedback_clips import tts_engine
+
+
+def _queued(service):
+    """Pending keys in playback order (the worker isn't started, so nothing is consumed)."""
+    return [key for _, _, key in sorted(service._heap)]
+
+
+def test_same_key_is_merged():
+    service = AudioOutputService(clip_dirs=[])
+    service.speak("adjust_form", "Adjust your form")
+    service.speak("adjust_form", "Adjust your form now")
+    assert _queued(service) == ["adjust_form"]
+    assert service._pending["adjust_form"]["text"] == "Adjust your form now"
+    assert service.merged == 1
+
+
+def test_less_urgent_incoming_message_is_dropped_when_full():
+    service = AudioOutputService(clip_dirs=[], max_pending=2)
+    service.speak("a", priority=PRIORITY_HIGH)
+    service.speak("b", priority=PRIORITY_HIGH)
+    service.speak("c", priority=PRIORITY_LOW)
+    assert _queued(service) == ["a", "b"]
+    assert service.dropped == 1
+
+
+def test_more_urgent_message_evicts_oldest_least_urgent():
+    service = AudioOutputService(clip_dirs=[], max_pending=3)
+    service.speak("low_old", priority=PRIORITY_LOW)
+    service.speak("normal", priority=PRIORITY_NORMAL)
+    service.speak("low_new", priority=PRIORITY_LOW)
+    service.speak("urgent", priority=PRIORITY_HIGH)
+    assert _queued(service) == ["urgent", "normal", "low_new"]
+    assert service.dropped == 1
+
+
+def test_equal_priority_evicts_oldest():
+    service = AudioOutputService(clip_dirs=[], max_pending=2)
+    for key in ("first", "second", "third"):
+        service.speak(key)
+    assert _queued(service) == ["second", "third"]
+
+
+class SquareToneBackend(ToneSynthesisBackend):
+    voice = "square"
+
+
+def test_preload_only_loads_clips_of_the_active_backend(tmp_path):
+    cache = SpeechCache(str(tmp_path))
+    sine, square = ToneSynthesisBackend(), SquareToneBackend()
+    cache.fill(["Hold the pose", "Breathe out"], sine)
+    cache.put("Hold the pose", square)
+
+    service = AudioOutputService(clip_dirs=[], backend=square, speech_cache=cache)
+    service.preload()
+    assert set(service.speech_clips) == {cache.key_for("Hold the pose", square)}
+    assert service._clip_for("hold", "Hold the pose").path == cache.get("Hold the pose", square)
+
+    # Cached by another voice only: synthesized for this one, not replayed
+    clip = service._clip_for("breathe", "Breathe out")
+    assert clip.path == cache.get("Breathe out", square) != cache.get("Breathe out", sine)
+
+
+def test_null_backend_never_plays_other_engines_clips(tmp_path):
+    cache = SpeechCache(str(tmp_path))
+    cache.put("Hold the pose", ToneSynthesisBackend())
+
+    service = AudioOutputService(clip_dirs=[], backend=NullSynthesisBackend(), speech_cache=cache)
+    service.preload()
+    assert service.speech_clips == {}
+    assert service._clip_for("hold", "Hold the pose") is None
+
+
+def test_spoken_tags_play_the_pregenerated_sentence(tmp_path, monkeypatch):
+    cache = SpeechCache(str(tmp_path))
+    backend = ToneSynthesisBackend()
+    # What pregenerate_speech.py renders for the tagged feedback lines
+    cache.fill(audio_service.feedback_messages().values(), backend)
+    cached = len(list(cache.entries()))
+
+    service = AudioOutputService(clip_dirs=[], backend=backend, speech_cache=cache)
+    service.preload()
+    monkeypatch.setattr(audio_service, "_service", service)
+    for tag in ("pose_correct", "minor_correction"):
+        tts_engine.speak(tag)
+        clip = service._clip_for(*service._next_message())
+        assert clip is service.speech_clips[cache.key_for(service.messages[tag], backend)]
+    # Nothing new was synthesized, e.g. the tag name itself
+    assert len(list(cache.entries())) == cached
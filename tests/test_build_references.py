@@ -0,0 +1,97 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from backend.pose_detection import landmark_cache
+from backend.pose_detection.landmark_cache import cache_path_for, extract_video_landmarks
+from backend.feedback_engine.angle_reference import load_angle_reference
+from build_references import build_video_references
+
+MISSED_FRAMES = {0, 1, 9}
+
+
+class BrightnessDetector:
+    """Reads the frame index back from the frame's brightness; MISSED_FRAMES find no pose."""
+    instances = 0
+
+    def __init__(self, model_complexity=1):
+        BrightnessDetector.instances += 1
+
+    def detect_pose(self, frame):
+        return int(round(frame.mean() / 10.0))
+
+    def get_landmark_array(self, index):
+        if index in MISSED_FRAMES:
+            return None
+        landmarks = np.full((33, 4), index / 100.0, dtype=np.float32)
+        landmarks[:, 3] = 1.0
+        return landmarks
+
+
+@pytest.fixture
+def video_path(tmp_path, monkeypatch):
+    BrightnessDetector.instances = 0
+    monkeypatch.setattr(landmark_cache, "PoseDetector", BrightnessDetector)
+    path = str(tmp_path / "squat_correct.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(20):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_extraction_marks_missed_frames_and_caches(video_path, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    data = extract_video_landmarks(video_path, cache_dir=cache_dir)
+
+    assert data["landmarks"].shape == (20, 33, 4)
+    assert set(np.flatnonzero(~data["valid"])) == MISSED_FRAMES
+    assert np.isnan(data["landmarks"][~data["valid"]]).all()
+    assert data["landmarks"][5, 0, 0] == pytest.approx(0.05)
+    assert os.path.exists(cache_path_for(video_path, cache_dir=cache_dir))
+
+    again = extract_video_landmarks(video_path, cache_dir=cache_dir)
+    assert BrightnessDetector.instances == 1  # served from the cache, no second detector
+    np.testing.assert_array_equal(again["valid"], data["valid"])
+    np.testing.assert_array_equal(again["times"], data["times"])
+
+
+def test_cache_is_keyed_by_model_complexity(video_path, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    extract_video_landmarks(video_path, model_complexity=1, cache_dir=cache_dir)
+    extract_video_landmarks(video_path, model_complexity=2, cache_dir=cache_dir)
+    assert BrightnessDetector.instances == 2
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_builds_mean_pose_angles_and_motion_from_valid_frames(video_path, tmp_path):
+    output_dir, motion_dir = tmp_path / "poses", tmp_path / "motion"
+    output_dir.mkdir()
+    motion_dir.mkdir()
+
+    messages = build_video_references(video_path, "squat", str(output_dir), str(motion_dir),
+                                      1, str(tmp_path / "cache"))
+    assert messages[0].endswith("20 frames, 17 with a pose")
+
+    valid = [i for i in range(20) if i not in MISSED_FRAMES]
+    mean_pose = np.load(output_dir / "squat_reference.npy")
+    assert mean_pose.shape == (99,)
+    assert mean_pose[0] == pytest.approx(np.mean(valid) / 100.0, abs=1e-5)
+
+    angles = load_angle_reference(str(output_dir / "squat_angles.npy"))
+    assert angles.joints == ["hip", "back"] and len(angles) == len(valid)
+
+    with np.load(motion_dir / "squat_motion.npz") as data:
+        motion = data["landmarks"]
+    # every 5th frame (4, 9, 14, 19) that has a pose; frame 9 was missed
+    np.testing.assert_allclose(motion[:, 0, 0], [0.04, 0.14, 0.19], atol=1e-6)
+
+
+def test_video_without_poses_writes_nothing(video_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(BrightnessDetector, "get_landmark_array", lambda self, index: None)
+    messages = build_video_references(video_path, "squat", str(tmp_path), str(tmp_path),
+                                      1, str(tmp_path / "cache"))
+    assert messages[-1] == "❌ No valid poses found for squat"
+    assert not list(tmp_path.glob("squat_*.np*"))
@@ -0,0 +1,45 @@
+import cv2
+import numpy as np
+
+from backend.pose_detection.display_sink import DisplaySink
+
+
+class FakePlaceholder:
+    def __init__(self):
+        self.images = []
+
+    def image(self, data, **kwargs):
+        self.images.append(data)
+
+
+def _frame(width=1280, height=720):
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    cv2.rectangle(frame, (width // 4, height // 4), (width // 2, height // 2), (0, 255, 0), -1)
+    return frame
+
+
+def test_frames_are_sent_as_downscaled_jpeg():
+    placeholder = FakePlaceholder()
+    sink = DisplaySink(placeholder, max_width=640)
+    assert sink.show(_frame())
+
+    decoded = cv2.imdecode(np.frombuffer(placeholder.images[0], np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (360, 640, 3)
+    assert sink.stats()["total_bytes"] == len(placeholder.images[0])
+
+
+def test_small_frames_keep_their_size():
+    placeholder = FakePlaceholder()
+    DisplaySink(placeholder, max_width=640).show(_frame(320, 240))
+    decoded = cv2.imdecode(np.frombuffer(placeholder.images[0], np.uint8), cv2.IMREAD_COLOR)
+    assert decoded.shape == (240, 320, 3)
+
+
+def test_rate_limit_skips_frames_unless_forced():
+    placeholder = FakePlaceholder()
+    sink = DisplaySink(placeholder, max_fps=1.0)
+    assert sink.show(_frame())
+    assert not sink.show(_frame())
+    assert sink.show(_frame(), force=True)
+    assert len(placeholder.images) == 2
+    assert sink.skip_ratio == 1 / 3
@@ -0,0 +1,85 @@
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from backend.pose_detection.frame_pipeline import DropOldestQueue, FramePipeline
+
+
+def test_queue_drops_oldest_when_full():
+    q = DropOldestQueue(maxsize=2)
+    for item in (1, 2, 3):
+        q.put(item)
+    assert q.dropped == 1
+    assert [q.get(timeout=0), q.get(timeout=0)] == [2, 3]
+
+
+def test_queue_get_times_out_and_close_wakes_waiters():
+    q = DropOldestQueue()
+    assert q.get(timeout=0.01) is None
+
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(q.get(timeout=5)))
+    waiter.start()
+    q.close()
+    waiter.join(1)
+    assert not waiter.is_alive() and got == [None]
+
+
+def test_queue_drains_items_after_close():
+    q = DropOldestQueue()
+    q.put("last")
+    q.close()
+    assert q.get(timeout=0) == "last"
+    assert q.get(timeout=0) is None
+
+
+class CountingDetector:
+    def __init__(self):
+        self.calls = 0
+
+    def detect_pose(self, frame):
+        self.calls += 1
+        return ("results", frame.shape)
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(20):
+        writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_pipeline_yields_inferred_packets_in_order(video_path):
+    detector = CountingDetector()
+    pipeline = FramePipeline(detector, source=video_path, queue_size=64)
+    assert pipeline.start()
+    with pipeline:
+        packets = list(pipeline)
+
+    assert len(packets) == detector.calls == 20  # nothing dropped with room for every frame
+    assert all(packet.results == ("results", (48, 64, 3)) for packet in packets)
+    assert [packet.index for packet in packets] == list(range(20))
+    assert pipeline.source_failed  # the file ran out
+
+
+def test_interrupted_loop_stops_worker_threads(video_path):
+    pipeline = FramePipeline(CountingDetector(), source=video_path)
+    assert pipeline.start()
+    threads = list(pipeline._threads)
+    try:
+        for _ in pipeline:
+            raise KeyboardInterrupt  # what a Streamlit stop looks like to the loop
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pipeline.stop()
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_start_fails_for_missing_source(tmp_path):
+    assert not FramePipeline(CountingDetector(), source=str(tmp_path / "missing.avi")).start()
@@ -0,0 +1,71 @@
+import numpy as np
+
+from components import live_ui
+from components.live_ui import LiveView
+
+
+class FakePlaceholder:
+    def __init__(self):
+        self.calls = []
+
+    def markdown(self, *args, **kwargs):
+        self.calls.append(("markdown", args, kwargs))
+
+    def image(self, *args, **kwargs):
+        self.calls.append(("image", args, kwargs))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_only_the_latest_state_is_pushed(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(live_ui.time, "perf_counter", clock)
+    view = LiveView(refresh_hz=10.0)
+    placeholder = FakePlaceholder()
+    widget = view.add("status", placeholder)
+
+    for reps in range(5):
+        widget.markdown(f"Reps: {reps}")
+        view.render()
+    # Only the first call falls on a render tick
+    assert placeholder.calls == [("markdown", ("Reps: 0",), {})]
+
+    clock.now += 0.1
+    assert view.render()
+    assert placeholder.calls[-1] == ("markdown", ("Reps: 4",), {})
+    assert view.stats() == {"renders": 2, "pushes": 2, "widgets": 1}
+
+
+def test_unchanged_state_is_not_pushed_again(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(live_ui.time, "perf_counter", clock)
+    view = LiveView()
+    placeholder = FakePlaceholder()
+    widget = view.add("frame", placeholder)
+
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    widget.image(frame, channels="BGR")
+    view.render()
+    widget.image(frame.copy(), channels="BGR")
+    view.render(force=True)
+    assert len(placeholder.calls) == 1
+
+    changed = frame.copy()
+    changed[0, 0] = 255
+    widget.image(changed, channels="BGR")
+    view.render(force=True)
+    assert len(placeholder.calls) == 2
+    assert view.pushes == 2
+
+
+def test_widgets_without_state_are_skipped():
+    view = LiveView()
+    view.add("empty", FakePlaceholder())
+    assert view.render(force=True)
+    assert view.pushes == 0
@@ -0,0 +1,80 @@
+import threading
+import types
+from urllib.error import URLError
+
+import numpy as np
+import pytest
+
+from backend.pose_detection import mediapipe_model
+from backend.pose_detection.mediapipe_model import PoseDetector
+
+
+class FakePose:
+    """Stands in for mp.solutions.pose.Pose; complexities in `missing` fail like an offline download."""
+    missing = set()
+    instances = []
+
+    def __init__(self, model_complexity=1, **kwargs):
+        if model_complexity in self.missing:
+            raise URLError("no network")
+        self.model_complexity = model_complexity
+        self.closed = False
+        self.instances.append(self)
+
+    def process(self, image):
+        return types.SimpleNamespace(pose_landmarks=None)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_pose(monkeypatch):
+    FakePose.missing = set()
+    FakePose.instances = []
+    solutions = types.SimpleNamespace(pose=types.SimpleNamespace(Pose=FakePose, POSE_CONNECTIONS=()),
+                                      drawing_utils=None)
+    monkeypatch.setattr(mediapipe_model, "mp", types.SimpleNamespace(solutions=solutions))
+    return FakePose
+
+
+def test_adaptive_detector_loads_other_models_in_the_background(fake_pose):
+    detector = PoseDetector(adaptive=True)
+    assert detector.quality.levels == [(1, 1.0), (1, 0.75)]
+    assert detector.wait_for_models(5) == [0, 1, 2]
+
+    detector.detect_pose(np.zeros((48, 64, 3), dtype=np.uint8))
+    assert detector.quality.levels == mediapipe_model.QUALITY_LEVELS
+    assert detector.quality.settings == (1, 1.0)
+    detector.close()
+    assert all(pose.closed for pose in fake_pose.instances)
+
+
+def test_models_that_fail_to_load_are_left_out(fake_pose):
+    fake_pose.missing = {0, 2}
+    detector = PoseDetector(adaptive=True)
+    assert detector.wait_for_models(5) == [1]
+
+    detector.detect_pose(np.zeros((48, 64, 3), dtype=np.uint8))
+    assert detector.quality.levels == [(1, 1.0), (1, 0.75)]
+    detector.close()
+
+
+def test_close_during_warm_up_closes_late_models(fake_pose, monkeypatch):
+    loading = threading.Event()
+    release = threading.Event()
+    process = FakePose.process
+
+    def slow_process(self, image):
+        if self.model_complexity == 0:
+            loading.set()
+            release.wait(5)
+        return process(self, image)
+
+    monkeypatch.setattr(FakePose, "process", slow_process)
+    detector = PoseDetector(adaptive=True)
+    assert loading.wait(5)
+    detector.close()
+    release.set()
+    assert detector.wait_for_models(5) == [1]
+    assert all(pose.closed for pose in fake_pose.instances)
@@ -0,0 +1,44 @@
+import numpy as np
+
+from backend.pose_detection.motion_gate import MotionGate
+
+
+def _frame(value=100, size=(480, 640)):
+    return np.full((*size, 3), value, dtype=np.uint8)
+
+
+def test_first_frame_is_always_processed():
+    gate = MotionGate()
+    assert gate.should_process(_frame())
+    assert gate.stats() == {"frames_processed": 1, "frames_skipped": 0, "skip_ratio": 0.0}
+
+
+def test_static_frames_are_skipped_up_to_max_skip():
+    gate = MotionGate(max_skip=3)
+    decisions = [gate.should_process(_frame()) for _ in range(9)]
+    assert decisions == [True, False, False, False, True, False, False, False, True]
+    assert gate.skip_ratio == 6 / 9
+
+
+def test_motion_triggers_processing():
+    gate = MotionGate(threshold=2.5)
+    gate.should_process(_frame())
+    moved = _frame()
+    moved[100:300, 200:400] = 255
+    assert gate.should_process(moved)
+    assert gate.last_motion > 2.5
+
+
+def test_slow_drift_adds_up_against_the_last_processed_frame():
+    gate = MotionGate(threshold=2.5, max_skip=100)
+    gate.should_process(_frame(100))
+    # Each step is below the threshold, but the drift since the last processed frame is not
+    assert [gate.should_process(_frame(100 + step)) for step in (1, 2, 3)] == [False, False, True]
+
+
+def test_reset_forces_the_next_frame():
+    gate = MotionGate()
+    gate.should_process(_frame())
+    assert not gate.should_process(_frame())
+    gate.reset()
+    assert gate.should_process(_frame())
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from backend.feedback_engine.motion_tools import StreamingMotionMatcher, normalize_motion_frames
+
+
+def _squat(n=60):
+    """A synthetic rep: hips and knees sink and come back up."""
+    depth = np.sin(np.linspace(0.0, np.pi, n))
+    frames = np.zeros((n, 33, 4), dtype=np.float32)
+    frames[:, :, 3] = 1.0
+    frames[:, [11, 12], 1] = 0.3 + 0.15 * depth[:, None]    # shoulders
+    frames[:, [23, 24], 1] = 0.55 + 0.2 * depth[:, None]    # hips
+    frames[:, [25, 26], 1] = 0.75 + 0.05 * depth[:, None]   # knees
+    frames[:, [27, 28], 1] = 0.95                           # ankles
+    frames[:, [13, 14], 1] = 0.45 + 0.1 * depth[:, None]    # elbows
+    frames[:, [15, 16], 1] = 0.55 + 0.1 * depth[:, None]    # wrists
+    frames[:, [11, 13, 15, 23, 25, 27], 0] = 0.45 - 0.1 * depth[:, None]
+    frames[:, [12, 14, 16, 24, 26, 28], 0] = 0.55 + 0.1 * depth[:, None]
+    return frames
+
+
+def test_normalization_is_position_and_scale_invariant():
+    frame = _squat()[10]
+    moved = frame.copy()
+    moved[:, :2] = moved[:, :2] * 0.5 + 0.2
+    np.testing.assert_allclose(normalize_motion_frames(frame), normalize_motion_frames(moved), atol=1e-5)
+
+
+@pytest.mark.parametrize("band", [None, 30])
+def test_tracks_the_reference_played_back(band):
+    reference = _squat()
+    matcher = StreamingMotionMatcher(reference, band=band)
+    results = [matcher.update(frame) for frame in reference[:50]]
+    scores = [score for score, _ in results[5:]]
+    phases = [phase for _, phase in results[5:]]
+    assert min(scores) > 90
+    assert phases == sorted(phases) and phases[-1] == pytest.approx(49 / 59, abs=0.05)
+
+
+def test_tracks_half_speed_motion():
+    reference = _squat()
+    slow = np.repeat(reference, 2, axis=0)
+    matcher = StreamingMotionMatcher(reference, band=30)
+    scores = [matcher.update(frame)[0] for frame in slow[:100]]
+    assert min(scores[10:]) > 90
+
+
+def test_unrelated_pose_is_lost():
+    reference = _squat()
+    matcher = StreamingMotionMatcher(reference)
+    lying = reference[0].copy()
+    lying[:, [0, 1]] = lying[:, [1, 0]]  # rotated by 90 degrees
+    assert matcher.update(lying) == (0.0, None)
+    assert matcher.position is None
+
+
+def test_band_only_updates_frames_near_the_alignment():
+    reference = _squat()
+    matcher = StreamingMotionMatcher(reference, band=5)
+    for frame in reference[:20]:
+        matcher.update(frame)
+    assert matcher.position == 19
+    # The last update covered 18 +- 5 (the previous position); paths outside it were dropped
+    assert np.isfinite(matcher._cost).nonzero()[0].tolist() == list(range(13, 24))
+
+
+def test_reacquires_mid_rep_after_losing_the_motion():
+    reference = _squat()
+    matcher = StreamingMotionMatcher(reference, band=10)
+    for frame in reference[:20]:
+        matcher.update(frame)
+
+    lying = reference[0].copy()
+    lying[:, [0, 1]] = lying[:, [1, 0]]
+    results = [matcher.update(lying) for _ in range(30)]
+    lost_at = results.index((0.0, None))
+    assert all(phase is not None for _, phase in results[:lost_at])  # decayed history holds on a while
+    assert matcher.position is None
+
+    # Lost: the next frame is searched over the whole reference, not only near frame 20
+    score, phase = matcher.update(reference[30])
+    assert score > 90 and phase == pytest.approx(30 / 59, abs=0.05)
+
+
+def test_next_rep_starts_from_the_beginning():
+    reference = _squat()
+    matcher = StreamingMotionMatcher(reference, band=10)
+    phases = [matcher.update(frame)[1] for frame in np.concatenate([reference, reference])]
+    # The end of the first rep frees the band; the second rep is matched from its start
+    assert max(phases[:60]) > 0.95
+    assert phases[62] < 0.1
+    assert phases[-5] > 0.9
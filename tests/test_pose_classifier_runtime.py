@@ -0,0 +1,82 @@
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.neural_network import MLPClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import FunctionTransformer, StandardScaler
+
+from backend.feedback_engine.pose_classifier_runtime import (
+    FastPoseClassifier, SklearnPoseClassifier, export_classifier, normalize_pose_features,
+)
+from backend.feedback_engine.workout_pose_classifier import WorkoutPoseClassifier
+
+
+def _poses(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, 3, n)
+    X = rng.normal(0.5, 0.05, (n, 33, 4)).astype(np.float32)
+    X[:, 15, 1] += 0.3 * y  # the classes differ by wrist height
+    X[:, :, 3] = 1.0
+    return X.reshape(n, -1), y
+
+
+@pytest.mark.parametrize("model", [
+    LogisticRegression(max_iter=2000),
+    MLPClassifier(hidden_layer_sizes=(16,), max_iter=2000, random_state=0),
+    KNeighborsClassifier(n_neighbors=3),
+])
+def test_exported_model_matches_sklearn(tmp_path, model):
+    raw, y = _poses()
+    X = normalize_pose_features(raw)
+    scaler = StandardScaler().fit(X)
+    model.fit(scaler.transform(X), y)
+
+    path = tmp_path / "model.npz"
+    export_classifier(model, path, ["a", "b", "c"], scaler, normalize=True)
+    fast = FastPoseClassifier.load(path)
+
+    # Raw landmarks in: the runtime normalizes and standardizes itself
+    np.testing.assert_array_equal(fast.predict_codes(raw), model.predict(scaler.transform(X)))
+    assert fast.predict_one(raw[0].reshape(33, 4)) == ["a", "b", "c"][model.predict(scaler.transform(X[:1]))[0]]
+    np.testing.assert_allclose(fast.predict_proba(raw).sum(axis=1), 1.0, rtol=1e-5)
+
+
+@pytest.mark.parametrize("model", [
+    LogisticRegression(max_iter=2000),
+    MLPClassifier(hidden_layer_sizes=(16,), max_iter=2000, random_state=0),
+])
+def test_binary_models_keep_both_classes(tmp_path, model):
+    raw, y = _poses()
+    keep = y < 2
+    raw, y = raw[keep], y[keep]
+    scaler = StandardScaler().fit(raw)
+    model.fit(scaler.transform(raw), y)
+
+    path = tmp_path / "model.npz"
+    export_classifier(model, path, ["a", "b"], scaler)
+    fast = FastPoseClassifier.load(path)
+
+    np.testing.assert_allclose(fast.predict_proba(raw), model.predict_proba(scaler.transform(raw)), atol=1e-4)
+    np.testing.assert_array_equal(fast.predict_codes(raw), y)
+
+
+def test_pickled_fallback_predicts_labels(tmp_path):
+    raw, y = _poses()
+    # Built the way train_pose_classifier.py builds it: scaler and model fitted on normalized features
+    X = normalize_pose_features(raw)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=20, random_state=0).fit(scaler.transform(X), y)
+    pipeline = make_pipeline(FunctionTransformer(normalize_pose_features), scaler, model)
+
+    path = tmp_path / "model.pkl"
+    with open(path, "wb") as f:
+        pickle.dump(SklearnPoseClassifier(pipeline, ["a", "b", "c"]), f)
+    classifier = WorkoutPoseClassifier(str(path), use_cache=False)
+
+    expected = np.array(["a", "b", "c"])[pipeline.predict(raw[:5])]
+    assert [classifier.predict_pose(row.reshape(33, 4)) for row in raw[:5]] == expected.tolist()
+    assert classifier.model.predict_one(raw[0]) == expected[0]
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from backend.feedback_engine.pose_comparator import (
+    ReferenceAngleIndex, IMPORTANT_ANGLE_TABLE, calculate_angle, compute_pose_accuracy,
+    extract_important_angles_safe, flip_left_right_angles,
+)
+
+
+def _pose(seed):
+    return np.random.default_rng(seed).random((33, 4)).astype(np.float32)
+
+
+def _slow_accuracy(live, references):
+    # The per-reference loop ReferenceAngleIndex replaces
+    def angles(landmarks):
+        return np.array([calculate_angle(landmarks[a, :3], landmarks[b, :3], landmarks[c, :3])
+                         for a, b, c in IMPORTANT_ANGLE_TABLE])
+    live_angles = angles(live)
+    errors = []
+    for reference in references:
+        reference_angles = angles(reference)
+        errors.append(np.abs(live_angles - reference_angles).mean())
+        errors.append(np.abs(live_angles - flip_left_right_angles(reference_angles)).mean())
+    return max(0, 100 - min(errors))
+
+
+def test_matches_per_reference_loop():
+    references = [_pose(seed) for seed in range(5)]
+    index = ReferenceAngleIndex(references)
+    for seed in range(10, 15):
+        live = _pose(seed)
+        assert index.match(live)[0] == pytest.approx(_slow_accuracy(live, references), abs=1e-2)
+
+
+def test_exact_and_mirrored_matches():
+    references = [_pose(seed) for seed in range(3)]
+    index = ReferenceAngleIndex(references)
+
+    accuracy, best, deviations = index.match(references[1])
+    assert best == 1 and accuracy == pytest.approx(100.0, abs=1e-3)
+    assert np.abs(deviations).max() < 1e-3
+
+    # A left/right swapped body matches the same reference through the mirrored angles
+    swapped = references[2].copy()
+    for a, b in [(11, 12), (13, 14), (15, 16), (23, 24), (25, 26), (27, 28)]:
+        swapped[[a, b]] = swapped[[b, a]]
+    accuracy, best, _ = index.match(swapped)
+    assert best == 2 and accuracy == pytest.approx(100.0, abs=1e-3)
+
+
+def test_single_pose_and_empty_reference():
+    pose = _pose(0)
+    assert compute_pose_accuracy(pose, pose) == pytest.approx(100.0, abs=1e-3)
+    assert ReferenceAngleIndex(np.empty((0, 33, 4))).match(pose) == (0, -1, pytest.approx(np.zeros(8)))
+
+
+def test_partial_landmarks_only_use_present_joints():
+    angles = extract_important_angles_safe(_pose(0)[:20])
+    assert angles.shape == (8,)
+    assert (angles[2:6] == 0).all()  # hip/knee/ankle angles need joints >= 20
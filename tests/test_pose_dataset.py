@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from extract_landmarks import replace_converted_rows
+from pose_dataset import PoseDataset, convert_csv, NUM_FEATURES
+
+
+def _write_csv(path, rows, labels):
+    columns = [f"f{i}" for i in range(NUM_FEATURES)]
+    df = pd.DataFrame(rows, columns=columns)
+    df["label"] = labels
+    df.to_csv(path, index=False)
+
+
+def _rows(n, seed=0):
+    return np.random.default_rng(seed).random((n, NUM_FEATURES), dtype=np.float32)
+
+
+def test_append_and_read_back(tmp_path):
+    dataset = PoseDataset(tmp_path / "ds")
+    features = _rows(3)
+    dataset.append(features, ["a", "b", "a"], ["x.jpg", "y.jpg", "z.jpg"], ["h1", "h2", "h3"])
+
+    reopened = PoseDataset(tmp_path / "ds")
+    assert len(reopened) == 3
+    np.testing.assert_array_equal(reopened.features(), features)
+    assert list(reopened.labels()) == ["a", "b", "a"]
+    assert reopened.known_hashes() == {"h1", "h2", "h3"}
+
+
+def test_convert_csv_is_idempotent(tmp_path):
+    csv_path = tmp_path / "pose_landmarks.csv"
+    _write_csv(csv_path, _rows(4), ["a", "b", "a", "b"])
+
+    assert convert_csv(str(csv_path), str(tmp_path / "ds")) == 4
+    assert convert_csv(str(csv_path), str(tmp_path / "ds")) == 0
+    assert len(PoseDataset(tmp_path / "ds")) == 4
+
+
+def test_converted_rows_are_replaced_not_duplicated(tmp_path):
+    csv_path = tmp_path / "pose_landmarks.csv"
+    features = _rows(3)
+    _write_csv(csv_path, features, ["a", "b", "a"])
+    convert_csv(str(csv_path), str(tmp_path / "ds"))
+
+    dataset = PoseDataset(tmp_path / "ds")
+    # Converted row hashes never match image hashes, so the extractor sees
+    # every image as new and appends them again
+    image_hashes = ["img1", "img2", "img3"]
+    assert not dataset.known_hashes() & set(image_hashes)
+    dataset.append(features, ["a", "b", "a"], ["a/1.jpg", "b/2.jpg", "a/3.jpg"], image_hashes)
+    assert dataset.converted_rows().tolist() == [True, True, True, False, False, False]
+
+    assert dataset.drop_rows(dataset.converted_rows()) == 3
+    reopened = PoseDataset(tmp_path / "ds")
+    assert len(reopened) == 3
+    assert [row["hash"] for row in reopened.rows()] == image_hashes
+    np.testing.assert_array_equal(reopened.features(), features)
+    assert list(reopened.labels()) == ["a", "b", "a"]
+    assert not reopened.converted_rows().any()
+
+
+def test_new_image_keeps_converted_rows(tmp_path):
+    csv_path = tmp_path / "pose_landmarks.csv"
+    _write_csv(csv_path, _rows(4), ["a", "b", "a", "b"])
+    convert_csv(str(csv_path), str(tmp_path / "ds"))
+
+    dataset = PoseDataset(tmp_path / "ds")
+    # One image of a new pose, nothing re-extracted
+    dataset.append(_rows(1, seed=1), ["c"], ["c/1.jpg"], ["img1"])
+    replace_converted_rows(dataset)
+
+    reopened = PoseDataset(tmp_path / "ds")
+    assert len(reopened) == 5
+    assert list(reopened.labels()) == ["a", "b", "a", "b", "c"]
+
+
+def test_only_re_extracted_converted_rows_are_dropped(tmp_path):
+    csv_path = tmp_path / "pose_landmarks.csv"
+    features = _rows(3)
+    _write_csv(csv_path, features, ["a", "b", "a"])
+    convert_csv(str(csv_path), str(tmp_path / "ds"))
+
+    dataset = PoseDataset(tmp_path / "ds")
+    # Row 0 extracted again from its image; row 2's landmarks under another label don't count
+    dataset.append(features[[0, 2]] + 1e-6, ["a", "b"], ["a/1.jpg", "b/3.jpg"], ["img1", "img3"])
+    assert dataset.superseded_rows().tolist() == [True, False, False, False, False]
+
+    replace_converted_rows(dataset)
+    reopened = PoseDataset(tmp_path / "ds")
+    assert [row["source"] for row in reopened.rows()] == \
+        ["pose_landmarks.csv:1", "pose_landmarks.csv:2", "a/1.jpg", "b/3.jpg"]
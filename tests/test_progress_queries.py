@@ -0,0 +1,133 @@
+import sqlite3
+import threading
+
+import pytest
+
+from database import logger
+from database import progress_queries as queries
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Points the module-level writer and reader connections at a fresh database."""
+    db_path = str(tmp_path / "user_data.db")
+    writer = logger.SessionLogWriter(db_path)
+    monkeypatch.setattr(logger, "DB_PATH", db_path)
+    monkeypatch.setattr(logger, "_writer", writer)
+    monkeypatch.setattr(logger, "_readers", threading.local())
+    yield db_path
+    writer.shutdown()
+
+
+def _log(pose, date, reps=0, duration=0.0, feedback=()):
+    """log_session with a fixed date."""
+    feedback_str = "; ".join(feedback)
+
+    def insert(cursor):
+        cursor.execute('INSERT INTO sessions (pose, reps, feedback, duration_seconds, date) VALUES (?, ?, ?, ?, ?)',
+                       (pose, reps, feedback_str, duration, date))
+        session_id = cursor.lastrowid
+        logger.insert_feedback_tags(cursor, session_id, pose, date, logger.split_feedback(feedback_str))
+        logger.update_rollups(cursor, pose, date, reps, duration)
+        return session_id
+
+    return logger.get_writer().submit(insert).result(5)
+
+
+def _legacy_db(path, sessions):
+    """A database from before the tag table: sessions only, user_version 0."""
+    with sqlite3.connect(path) as conn:
+        conn.execute(logger.SCHEMA[0])
+        conn.executemany('INSERT INTO sessions (pose, reps, feedback, duration_seconds, date) VALUES (?, ?, ?, ?, ?)',
+                         sessions)
+    conn.close()
+
+
+def test_summarize_feedback_tags():
+    assert queries.summarize_feedback_tags([]) == "❔ No feedback available."
+    assert queries.summarize_feedback_tags([("Steady", 0, 0, 0)]) == "😐 Neutral session."
+    tags = [("✅ Good depth", 1, 0, 0), ("❌ Go deeper", 0, 1, 0), ("Try a wider stance", 0, 0, 1)]
+    assert queries.summarize_feedback_tags(tags) == \
+        "✅ Good: ✅ Good depth. ⚠️ Needs work: ❌ Go deeper. 🔁 Tip: Try a wider stance."
+
+
+def test_feedback_summaries_from_logged_sessions(db):
+    first = _log("Squat", "2026-10-01 09:00:00", feedback=["✅ Good posture", "❌ Go deeper"])
+    second = _log("Tadasana", "2026-10-02 09:00:00")
+
+    summaries = queries.get_feedback_summaries([first, second], chunk_size=1)
+    assert summaries == {
+        first: "✅ Good: ✅ Good posture. ⚠️ Needs work: ❌ Go deeper. ",
+        second: "❔ No feedback available.",
+    }
+    assert set(queries.get_tag_counts(pose="Squat")) == {("✅ Good posture", 1), ("❌ Go deeper", 1)}
+    assert [row[1] for row in queries.get_sessions(since="2026-10-02")] == ["Tadasana"]
+
+
+def test_migration_backfills_feedback_tags_once(tmp_path):
+    db_path = str(tmp_path / "user_data.db")
+    _legacy_db(db_path, [("Squat", 5, "✅ Good posture; Try slower reps", 60.0, "2026-10-01 09:00:00")])
+
+    for _ in range(2):
+        conn = logger.connect(db_path)
+        logger.apply_schema(conn)
+        tags = conn.execute('SELECT session_id, position, tag, is_good, is_tip FROM session_feedback').fetchall()
+        assert tags == [(1, 0, "✅ Good posture", 1, 0), (1, 1, "Try slower reps", 0, 1)]
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == len(logger.MIGRATIONS)
+        conn.close()
+
+
+def test_rollups_answer_progress_aggregates(db):
+    _log("Squat", "2026-10-01 09:00:00", reps=10, duration=60.0)
+    _log("Squat", "2026-10-01 18:00:00", reps=5, duration=30.0)
+    _log("Tadasana", "2026-10-02 09:00:00", duration=45.0)
+    _log("Squat", "2026-10-03 09:00:00", reps=8, duration=50.0)
+    _log("Squat", "2026-10-06 09:00:00", reps=8, duration=50.0)
+    _log("Squat", "2026-10-07 09:00:00", reps=8, duration=50.0)
+
+    assert queries.get_rollup_version() == 6
+    assert queries.list_poses() == ["Squat", "Tadasana"]
+    assert queries.get_session_summary() == (6, 285.0, "Squat")
+    assert queries.get_session_summary(since="2026-10-02 12:00:00") == (4, 195.0, "Squat")
+    assert queries.count_sessions(pose="Tadasana") == 1
+    assert queries.get_daily_counts(since=queries.since_days(5, today=queries.datetime.date(2026, 10, 7))) == \
+        [("2026-10-02", 1), ("2026-10-03", 1), ("2026-10-06", 1), ("2026-10-07", 1)]
+    assert queries.get_pose_totals() == [
+        ("Squat", 5, 39, 240.0, "2026-10-01 09:00:00", "2026-10-07 09:00:00"),
+        ("Tadasana", 1, 0, 45.0, "2026-10-02 09:00:00", "2026-10-02 09:00:00"),
+    ]
+
+
+@pytest.mark.parametrize("today, expected", [
+    ((2026, 10, 7), (2, 3)),
+    ((2026, 10, 8), (2, 3)),
+    ((2026, 10, 9), (0, 3)),
+])
+def test_streaks(db, today, expected):
+    for day in ("01", "02", "03", "06", "07"):
+        _log("Squat", f"2026-10-{day} 09:00:00")
+    assert queries.get_streaks(today=queries.datetime.date(*today)) == expected
+
+
+def test_streaks_without_sessions(db):
+    assert queries.get_streaks() == (0, 0)
+    assert queries.get_session_summary() == (0, 0, None)
+
+
+def test_migration_builds_rollups_from_existing_sessions(tmp_path):
+    db_path = str(tmp_path / "user_data.db")
+    _legacy_db(db_path, [
+        ("Squat", 5, "", 60.0, "2026-10-01 09:00:00"),
+        ("Squat", 3, "", 30.0, "2026-10-01 18:00:00"),
+        ("Tadasana", None, "", None, "2026-10-02 09:00:00"),
+    ])
+
+    for _ in range(2):
+        conn = logger.connect(db_path)
+        logger.apply_schema(conn)
+        assert conn.execute('SELECT * FROM daily_rollup ORDER BY day').fetchall() == [
+            ("2026-10-01", "Squat", 2, 8, 90.0),
+            ("2026-10-02", "Tadasana", 1, 0, 0.0),
+        ]
+        assert conn.execute("SELECT value FROM rollup_meta WHERE key = 'version'").fetchone() == (3,)
+        conn.close()
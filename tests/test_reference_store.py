@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pytest
+
+from backend.feedback_engine import reference_store
+from backend.feedback_engine.reference_store import ReferenceStore, load_reference_array
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = ReferenceStore(max_entries=2)
+    monkeypatch.setattr(reference_store, "_store", store)
+    return store
+
+
+def test_npy_is_memory_mapped_read_only_and_cached(store, tmp_path):
+    path = str(tmp_path / "squat_reference.npy")
+    np.save(path, np.arange(6, dtype=np.float32))
+
+    first = load_reference_array(path)
+    assert isinstance(first, np.memmap) and not first.flags.writeable
+    assert load_reference_array(path) is first
+    assert (store.hits, store.misses) == (1, 1)
+
+
+def test_pickled_npy_falls_back_to_a_read_only_copy(store, tmp_path):
+    path = str(tmp_path / "legacy.npy")
+    np.save(path, np.array([{"knee": 90.0}], dtype=object), allow_pickle=True)
+    array = load_reference_array(path)
+    assert array[0] == {"knee": 90.0} and not array.flags.writeable
+
+
+def test_rewritten_file_is_reloaded_and_replaces_the_stale_entry(store, tmp_path):
+    path = str(tmp_path / "pose.npz")
+    np.savez(path, landmarks=np.zeros((2, 33, 4)))
+    assert load_reference_array(path, "landmarks").sum() == 0
+
+    np.savez(path, landmarks=np.ones((2, 33, 4)))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert load_reference_array(path, "landmarks").sum() == 2 * 33 * 4
+    assert store.misses == 2 and len(store._entries) == 1
+
+
+def test_missing_npz_key_raises(store, tmp_path):
+    path = str(tmp_path / "pose.npz")
+    np.savez(path, landmarks=np.zeros((1, 33, 4)))
+    with pytest.raises(KeyError):
+        load_reference_array(path, "angles")
+
+
+def test_least_recently_used_entry_is_evicted(store, tmp_path):
+    paths = []
+    for name in ("a", "b", "c"):
+        paths.append(str(tmp_path / f"{name}.npy"))
+        np.save(paths[-1], np.zeros(3))
+
+    load_reference_array(paths[0])
+    load_reference_array(paths[1])
+    load_reference_array(paths[0])  # a is now the most recently used
+    load_reference_array(paths[2])
+
+    cached = {key[0] for key in store._entries}
+    assert cached == {os.path.abspath(paths[0]), os.path.abspath(paths[2])}
@@ -0,0 +1,70 @@
+import sqlite3
+import threading
+
+import pytest
+
+from database.logger import SessionLogWriter
+
+
+def _insert(pose):
+    def operation(cursor):
+        cursor.execute("INSERT INTO sessions (pose, reps, feedback, duration_seconds, date) VALUES (?, 0, '', 0, '')",
+                       (pose,))
+        return cursor.lastrowid
+    return operation
+
+
+def _fail(cursor):
+    cursor.execute("INSERT INTO sessions (pose) VALUES ('half-written')")
+    return 1 / 0
+
+
+def _poses(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return [row[0] for row in conn.execute("SELECT pose FROM sessions ORDER BY id")]
+
+
+@pytest.fixture
+def writer(tmp_path):
+    writer = SessionLogWriter(str(tmp_path / "user_data.db"))
+    writer.wait_ready(5)
+    yield writer
+    writer.shutdown()
+
+
+def test_operations_resolve_with_their_results(writer):
+    futures = [writer.submit(_insert(f"pose{i}")) for i in range(5)]
+    writer.flush(5)
+    assert [future.result(5) for future in futures] == [1, 2, 3, 4, 5]
+    assert _poses(writer.db_path) == [f"pose{i}" for i in range(5)]
+
+
+def test_failing_operation_only_fails_itself(writer):
+    gate = threading.Event()
+    # Hold the writer so the next three operations land in one batch
+    blocker = writer.submit(lambda cursor: gate.wait(5))
+    before = writer.submit(_insert("before"))
+    failing = writer.submit(_fail)
+    after = writer.submit(_insert("after"))
+    gate.set()
+    writer.flush(5)
+
+    assert blocker.result(5) is True
+    assert before.result(5) and after.result(5)
+    with pytest.raises(ZeroDivisionError):
+        failing.result(5)
+    # The failing operation's own insert was rolled back with it
+    assert _poses(writer.db_path) == ["before", "after"]
+
+
+def test_open_failure_fails_pending_and_new_futures(tmp_path):
+    not_a_dir = tmp_path / "file"
+    not_a_dir.write_text("")
+    writer = SessionLogWriter(str(not_a_dir / "user_data.db"))
+
+    with pytest.raises(FileExistsError):
+        writer.wait_ready(5)
+    with pytest.raises(FileExistsError):
+        writer.submit(_insert("late")).result(5)
+    with pytest.raises(FileExistsError):
+        writer.flush(5)
@@ -0,0 +1,80 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pytest
+
+from database import logger
+from database.session_metrics import (
+    SessionMetricsRecorder,
+    get_session_events,
+    get_session_metric,
+    get_session_metric_names,
+)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Points the module-level writer and reader connections at a fresh database."""
+    db_path = str(tmp_path / "user_data.db")
+    writer = logger.SessionLogWriter(db_path)
+    monkeypatch.setattr(logger, "DB_PATH", db_path)
+    monkeypatch.setattr(logger, "_writer", writer)
+    monkeypatch.setattr(logger, "_readers", threading.local())
+    yield db_path
+    writer.shutdown()
+
+
+def _recorded_session():
+    recorder = SessionMetricsRecorder(frame_interval=0.5)
+    for t, value in [(0.0, 1.0), (0.2, 3.0), (0.4, 5.0), (0.6, 10.0), (1.7, 7.0)]:
+        recorder.frame("accuracy", value, t=t)
+    recorder.rep("rep_depth", 92.5, t=1.1)
+    recorder.event("Go deeper", t=0.3)
+    recorder.event("Good depth", t=1.2)
+    recorder.event("Go deeper", t=1.5)
+    return recorder
+
+
+def test_frame_values_are_averaged_per_interval():
+    recorder = _recorded_session()
+    recorder.close()
+    accuracy = [(t, value) for metric, t, value in recorder._samples if metric == "accuracy"]
+    assert accuracy == [(0.0, 3.0), (0.5, 10.0), (1.5, 7.0)]
+    assert ("rep_depth", 1.1, 92.5) in recorder._samples
+
+
+def test_tags_are_distinct_in_firing_order():
+    assert _recorded_session().tags() == ["Go deeper", "Good depth"]
+
+
+def test_logged_session_stores_metrics_and_events(db):
+    session_id = logger.log_session("Squat", 1, ["Go deeper"], 2.0, metrics=_recorded_session()).result(5)
+
+    t, values = get_session_metric(session_id, "accuracy")
+    np.testing.assert_allclose(t, [0.0, 0.5, 1.5])
+    np.testing.assert_allclose(values, [3.0, 10.0, 7.0])
+    assert sorted(get_session_metric_names(session_id)) == ["accuracy", "rep_depth"]
+    assert get_session_events(session_id) == [(0.3, "Go deeper"), (1.2, "Good depth"), (1.5, "Go deeper")]
+
+
+def test_unknown_metric_is_empty(db):
+    session_id = logger.log_session("Squat", 0, [], 1.0).result(5)
+    t, values = get_session_metric(session_id, "accuracy")
+    assert t.shape == values.shape == (0,)
+    assert get_session_metric_names(session_id) == []
+    assert get_session_events(session_id) == []
+
+
+def test_schema_adds_time_series_tables_to_legacy_database(tmp_path):
+    db_path = str(tmp_path / "user_data.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(logger.SCHEMA[0])
+    conn.close()
+
+    conn = logger.connect(db_path)
+    logger.apply_schema(conn)
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {"sessions", "session_metrics", "session_events"} <= tables
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == len(logger.MIGRATIONS)
+    conn.close()
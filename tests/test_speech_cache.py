@@ -0,0 +1,52 @@
+import os
+import wave
+
+from backend.voice.audio_service import ToneSynthesisBackend
+from backend.voice.speech_cache import SpeechCache, speech_key
+
+
+class CountingToneBackend(ToneSynthesisBackend):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def synthesize(self, text, out_path):
+        self.calls += 1
+        return super().synthesize(text, out_path)
+
+
+def test_key_depends_on_text_voice_language_and_engine():
+    base = speech_key("Hold the pose", "sine", "en", "tone")
+    assert base == speech_key("Hold the pose", "sine", "en", "tone")
+    assert len({
+        base,
+        speech_key("Hold the pose.", "sine", "en", "tone"),
+        speech_key("Hold the pose", "square", "en", "tone"),
+        speech_key("Hold the pose", "sine", "fr", "tone"),
+        speech_key("Hold the pose", "sine", "en", "pyttsx3"),
+    }) == 5
+
+
+def test_put_synthesizes_once(tmp_path):
+    cache = SpeechCache(str(tmp_path))
+    backend = CountingToneBackend()
+
+    path = cache.put("Keep your back straight", backend)
+    assert cache.put("Keep your back straight", backend) == path
+    assert cache.get("Keep your back straight", backend) == path
+    assert backend.calls == 1
+    with wave.open(path) as f:
+        assert f.getnframes() > 0
+    assert list(cache.entries()) == [("Keep your back straight", path)]
+
+
+def test_fill_generates_only_missing_messages(tmp_path):
+    cache = SpeechCache(str(tmp_path))
+    backend = CountingToneBackend()
+    cache.put("one", backend)
+
+    assert cache.fill(["one", "two", "three", "two"], backend, workers=4) == (2, 1, 0)
+    assert backend.calls == 3
+    assert cache.fill(["one", "two", "three"], backend) == (0, 3, 0)
+    # Nothing half-written is left behind by concurrent fills
+    assert not [name for name in os.listdir(tmp_path) if ".tmp." in name]
@@ -0,0 +1,56 @@
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from backend.feedback_engine.pose_classifier_runtime import export_classifier
+from backend.feedback_engine.workout_pose_classifier import PosePredictionCache, WorkoutPoseClassifier
+
+
+def _pose(arm_raise=0.0, jitter=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    landmarks = np.full((33, 4), 0.5, dtype=np.float32)
+    landmarks[[11, 12], 1] = 0.3   # shoulders
+    landmarks[[23, 24], 1] = 0.6   # hips
+    landmarks[[11, 23], 0] = 0.45
+    landmarks[[12, 24], 0] = 0.55
+    landmarks[[15, 16], 1] = 0.6 - arm_raise  # wrists
+    landmarks[:, :2] += rng.normal(0.0, jitter, (33, 2))
+    landmarks[:, 3] = 1.0
+    return landmarks
+
+
+def _classifier(tmp_path):
+    X = np.stack([_pose(raise_, 0.01, seed) for seed, raise_ in enumerate([0.0, 0.5] * 20)]).reshape(40, -1)
+    y = np.array([0, 1] * 20)
+    model = LogisticRegression(max_iter=2000).fit(X, y)
+    path = tmp_path / "model.npz"
+    export_classifier(model, path, ["arms_down", "arms_up"])
+    return WorkoutPoseClassifier(str(path))
+
+
+def test_cache_reuses_label_while_pose_is_held():
+    cache = PosePredictionCache(drift_threshold=0.05, max_age_seconds=2.0)
+    anchor = np.zeros((12, 2), dtype=np.float32)
+    cache.store(anchor, "plank", now=0.0, elapsed=0.001)
+
+    assert cache.lookup(anchor + 0.01, now=1.0) == "plank"
+    assert cache.lookup(anchor + 0.2, now=1.0) is None   # moved
+    assert cache.lookup(anchor, now=2.5) is None         # too old
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_hold_heavy_session_mostly_hits_the_cache(tmp_path):
+    classifier = _classifier(tmp_path)
+    held = [classifier.predict_pose(_pose(0.0, 0.001, seed)) for seed in range(50)]
+    assert set(held) == {"arms_down"}
+    assert classifier.predict_pose(_pose(0.5)) == "arms_up"
+
+    stats = classifier.cache_stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 49
+
+
+def test_cache_can_be_disabled(tmp_path):
+    classifier = _classifier(tmp_path)
+    classifier.cache = None
+    assert classifier.predict_pose(_pose(0.5)) == "arms_up"
+    assert classifier.cache_stats() == {}
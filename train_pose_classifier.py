@@ -1,45 +1,202 @@
-import pandas as pd
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import time
 import pickle
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
+import hashlib
+import argparse
+import datetime
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.model_selection import train_test_split, StratifiedKFold, cross_val_score
+from sklearn.preprocessing import LabelEncoder, StandardScaler, FunctionTransformer
+from sklearn.pipeline import make_pipeline
 from sklearn.svm import SVC
+from sklearn.linear_model import LogisticRegression
+from sklearn.neural_network import MLPClassifier
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report
+from pose_dataset import PoseDataset
+from backend.feedback_engine.pose_classifier_runtime import (
+    FastPoseClassifier, SklearnPoseClassifier, normalize_pose_features, is_exportable, export_classifier,
+)
 
 # CONFIGURATION
-CSV_PATH = "pose_landmarks.csv"
-MODEL_SAVE_PATH = "yoga_pose_model.pkl"
-ENCODER_SAVE_PATH = "pose_label_encoder.pkl"
+DATASET_PATH = "pose_dataset"  # convert an old CSV once with: python pose_dataset.py pose_landmarks.csv
+FAST_MODEL_SAVE_PATH = "yoga_pose_model_fast.npz"  # NumPy-only runtime models
+MODEL_SAVE_PATH = "yoga_pose_model_sklearn.pkl"  # models the fast runtime can't export
+LABELS_SAVE_PATH = "pose_labels.json"  # replaces pose_label_encoder.pkl
+MANIFEST_SAVE_PATH = "yoga_pose_model.json"
+LATENCY_BUDGET_US = 100.0  # max single-frame prediction time
+
+
+def candidate_models():
+    return {
+        "svc_rbf": lambda: SVC(kernel="rbf", class_weight="balanced"),
+        "logistic": lambda: LogisticRegression(max_iter=2000, class_weight="balanced"),
+        "mlp": lambda: MLPClassifier(hidden_layer_sizes=(64,), max_iter=2000, random_state=42),
+        "knn": lambda: KNeighborsClassifier(n_neighbors=3),
+        "random_forest": lambda: RandomForestClassifier(n_estimators=100, class_weight="balanced", random_state=42),
+    }
+
+
+def load_normalized_features(dataset):
+    """Normalized features, cached next to the dataset and keyed by its content."""
+    raw = np.asarray(dataset.features())
+    digest = hashlib.sha1(raw.tobytes()).hexdigest()[:16]
+    cache_path = os.path.join(dataset.path, f"normalized_{digest}.npy")
+    if os.path.exists(cache_path):
+        return np.load(cache_path, mmap_mode="r")
+
+    features = normalize_pose_features(raw)
+    np.save(cache_path, features)
+    return features
+
+
+def cross_validate(name, make_model, X, y, folds):
+    model = make_pipeline(StandardScaler(), make_model())
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+    scores = cross_val_score(model, X, y, cv=cv, n_jobs=1)
+    return name, float(scores.mean()), float(scores.std())
+
+
+def measure_latency_us(predict, X, repeat=3):
+    """Best-of-`repeat` (single-sample, per-sample-in-batch) latency in microseconds."""
+    single = batched = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in X:
+            predict(row.reshape(1, -1))
+        single = min(single, (time.perf_counter() - start) / len(X))
+
+        start = time.perf_counter()
+        predict(X)
+        batched = min(batched, (time.perf_counter() - start) / len(X))
+    return single * 1e6, batched * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the yoga pose classifier under a latency budget.")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--latency-budget-us", type=float, default=LATENCY_BUDGET_US)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1)
+    args = parser.parse_args()
+
+    # 1. Load the dataset (memory-mapped) and build normalized features once
+    dataset = PoseDataset(args.dataset)
+    raw = np.asarray(dataset.features())
+    X = np.asarray(load_normalized_features(dataset))
+    y = dataset.labels()
+
+    # 2. Encode the labels
+    label_encoder = LabelEncoder()
+    y_encoded = label_encoder.fit_transform(y)
+    labels = label_encoder.classes_.tolist()
+
+    # 3. Train/test split
+    X_train, X_test, y_train, y_test, raw_train, raw_test = train_test_split(
+        X, y_encoded, raw, test_size=0.2, random_state=42, stratify=y_encoded)
+
+    # 4. Cross-validate every candidate family in parallel
+    candidates = candidate_models()
+    cv_results = Parallel(n_jobs=args.jobs)(
+        delayed(cross_validate)(name, make_model, X_train, y_train, args.folds)
+        for name, make_model in candidates.items()
+    )
+
+    # 5. Fit each candidate, then measure held-out accuracy and inference latency.
+    # Every model is timed on raw landmarks through what would be saved:
+    # exportable ones through the fast runtime, the others through a pickled
+    # pipeline that normalizes the features the same way and returns labels.
+    report = []
+    fitted = {}
+    for name, cv_mean, cv_std in cv_results:
+        scaler = StandardScaler().fit(X_train)
+        model = candidates[name]().fit(scaler.transform(X_train), y_train)
+
+        if is_exportable(model):
+            tmp_path = f"{FAST_MODEL_SAVE_PATH}.{name}.tmp.npz"
+            export_classifier(model, tmp_path, labels, scaler, normalize=True)
+            runtime = FastPoseClassifier.load(tmp_path)
+            os.remove(tmp_path)
+            predict = runtime.predict_codes
+        else:
+            runtime = SklearnPoseClassifier(
+                make_pipeline(FunctionTransformer(normalize_pose_features), scaler, model), labels)
+            predict = runtime.predict_codes
+        fitted[name] = (model, scaler, runtime)
+
+        test_accuracy = float((predict(raw_test) == y_test).mean())
+        single_us, batched_us = measure_latency_us(predict, raw_test)
+        report.append({
+            "name": name,
+            "cv_accuracy": round(cv_mean, 4),
+            "cv_std": round(cv_std, 4),
+            "test_accuracy": round(test_accuracy, 4),
+            "single_latency_us": round(single_us, 1),
+            "batched_latency_us": round(batched_us, 2),
+            "exportable": is_exportable(model),
+        })
 
-# 1. Load the dataset
-df = pd.read_csv(CSV_PATH)
+    print(f"\n📊 {len(X_train)} train / {len(X_test)} test samples, {len(labels)} classes\n")
+    print(f"{'model':<16}{'cv acc':>9}{'test acc':>10}{'us/frame':>10}{'us batched':>12}")
+    for row in report:
+        print(f"{row['name']:<16}{row['cv_accuracy']:>9.3f}{row['test_accuracy']:>10.3f}"
+              f"{row['single_latency_us']:>10.1f}{row['batched_latency_us']:>12.2f}")
 
-# 2. Split features and labels
-X = df.drop(columns=["label"])
-y = df["label"]
+    # 6. Pick the most accurate model within the latency budget
+    within_budget = [row for row in report if row["single_latency_us"] <= args.latency_budget_us]
+    if within_budget:
+        best = max(within_budget, key=lambda row: row["cv_accuracy"])
+    else:
+        best = min(report, key=lambda row: row["single_latency_us"])
+        print(f"\n⚠️ No model meets the {args.latency_budget_us:.0f} us budget, using the fastest one.")
 
-# 3. Encode the labels
-label_encoder = LabelEncoder()
-y_encoded = label_encoder.fit_transform(y)
+    model, scaler, runtime = fitted[best["name"]]
+    print(f"\n✅ Selected: {best['name']} (cv accuracy {best['cv_accuracy']:.3f}, "
+          f"{best['single_latency_us']:.1f} us/frame)")
+    print("\n📊 Classification Report:\n")
+    y_pred = model.predict(scaler.transform(X_test))
+    print(classification_report(y_test, y_pred, labels=range(len(labels)), target_names=labels, zero_division=0))
 
-# 4. Train/test split
-X_train, X_test, y_train, y_test = train_test_split(X, y_encoded, test_size=0.2, random_state=42, stratify=y_encoded)
+    # 7. Save the model, the labels and a manifest describing how it was chosen
+    if best["exportable"]:
+        model_path = FAST_MODEL_SAVE_PATH
+        export_classifier(model, model_path, labels, scaler, normalize=True)
+    else:
+        model_path = MODEL_SAVE_PATH
+        with open(model_path, "wb") as f:
+            pickle.dump(runtime, f)
 
-# 5. Train an SVM classifier
-model = SVC(kernel="rbf", probability=True, class_weight="balanced")
-model.fit(X_train, y_train)
+    with open(LABELS_SAVE_PATH, "w") as f:
+        json.dump(labels, f, indent=2)
 
-# 6. Evaluate
-y_pred = model.predict(X_test)
-print("\n✅ Model Training Complete!")
-print("\n📊 Classification Report:\n")
-print(classification_report(y_test, y_pred, target_names=label_encoder.classes_))
+    manifest = {
+        "model": best["name"],
+        "model_path": model_path,
+        "runtime": "fast_npz" if best["exportable"] else "sklearn_pickle",
+        "labels_path": LABELS_SAVE_PATH,
+        "features": "normalize_pose_features(raw 33 x (x, y, z, visibility))",
+        "latency_budget_us": args.latency_budget_us,
+        "dataset": {
+            "path": args.dataset,
+            "rows": len(dataset),
+            "sha1": hashlib.sha1(raw.tobytes()).hexdigest(),
+        },
+        "trained_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "candidates": report,
+    }
+    with open(MANIFEST_SAVE_PATH, "w") as f:
+        json.dump(manifest, f, indent=2)
 
-# 7. Save the model and encoder
-with open(MODEL_SAVE_PATH, "wb") as f:
-    pickle.dump(model, f)
+    print(f"\n✅ Model saved to: {model_path}")
+    print(f"✅ Labels saved to: {LABELS_SAVE_PATH}")
+    print(f"✅ Manifest saved to: {MANIFEST_SAVE_PATH}")
 
-with open(ENCODER_SAVE_PATH, "wb") as f:
-    pickle.dump(label_encoder, f)
 
-print(f"\n✅ Model saved to: {MODEL_SAVE_PATH}")
-print(f"✅ Label encoder saved to: {ENCODER_SAVE_PATH}")
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,9 @@
 import os
-from playsound import playsound
-from gtts import gTTS
-import tempfile
+from backend.voice.audio_service import get_audio_service, PRIORITY_NORMAL
 
 VOICE_DIR = os.path.join("backend", "voice", "voice_feedback_clips")
 
-def speak(tag_or_message):
-    # Check if it's a saved audio tag
-    mp3_file = os.path.join(VOICE_DIR, f"{tag_or_message}.mp3")
-
-    if os.path.exists(mp3_file):
-        try:
-            playsound(mp3_file)
-        except Exception as e:
-            print(f"[Voice Error] Could not play pre-saved sound: {e}")
-    else:
-        try:
-            # Fallback: dynamically generate TTS
-            tts = gTTS(text=tag_or_message, lang='en')
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as fp:
-                tts.save(fp.name)
-                playsound(fp.name)
-                os.remove(fp.name)
-        except Exception as e:
-            print(f"[Voice Error] Failed to generate TTS: {e}")
+def speak(tag_or_message, priority=PRIORITY_NORMAL):
+    # Saved audio tags play from memory; anything else is synthesized offline.
+    # Queued on the audio worker thread, so this returns immediately.
+    get_audio_service().speak(tag_or_message, priority=priority)
@@ -1,18 +1,20 @@
 # webcam_feed.py
 
-import cv2
-import tempfile
 import streamlit as st
 import time
 import os
 
 from backend.pose_detection.mediapipe_model import PoseDetector
+from backend.pose_detection.frame_pipeline import FramePipeline
+from backend.pose_detection.display_sink import DisplaySink
+from components.live_ui import LiveView
 from backend.feedback_engine.pose_comparator import (
-    load_single_reference_landmarks,
     compute_pose_accuracy,
     check_enough_landmarks
 )
-from backend.feedback_engine.motion_tools import load_motion_reference, compute_motion_similarity
+from backend.feedback_engine.motion_tools import load_motion_reference, StreamingMotionMatcher
+from backend.feedback_engine.reference_store import load_reference_index
+from backend.feedback_engine.workout_pose_classifier import WorkoutPoseClassifier
 from backend.voice.voice_feedback_clips.tts_engine import speak
 
 from backend.feedback_engine.yoga_feedback_engine import (
@@ -21,6 +23,23 @@ from backend.feedback_engine.yoga_feedback_engine import (
     feedback_lines
 )
 from database.logger import init_db, log_session
+from database.session_metrics import SessionMetricsRecorder
+
+POSE_CLASSIFIER_PATH = "yoga_pose_model_fast.npz"
+
+
+def get_detector():
+    # One detector (and its MediaPipe graphs) per browser session, reused
+    # across Streamlit reruns until the session ends
+    if "pose_detector" not in st.session_state:
+        st.session_state.pose_detector = PoseDetector(adaptive=True, motion_gate=True)
+    return st.session_state.pose_detector
+
+
+def close_detector():
+    detector = st.session_state.pop("pose_detector", None)
+    if detector is not None:
+        detector.close()
 
 
 def run_pose_detection(pose_name="tadasana", category="Yoga & Meditation"):
@@ -33,19 +52,26 @@ def run_pose_detection(pose_name="tadasana", category="Yoga & Meditation"):
     st.session_state.setdefault("reps", 0)
     st.session_state.setdefault("pose_held", False)
 
-    detector = PoseDetector()
     coach = speak
 
     reference_landmarks = None
     motion_reference = None
+    classifier = None
 
     if category == "Yoga & Meditation":
         try:
             corrected_pose_name = pose_name.capitalize()
-            reference_landmarks = load_single_reference_landmarks(f"pose_references/{corrected_pose_name}.npz")
+            # Reference angles (and their mirror) are computed once per process and cached
+            reference_landmarks = load_reference_index(f"pose_references/{corrected_pose_name}.npz")
         except Exception:
             st.error(f"❌ Could not load reference for {pose_name}.")
             return
+        try:
+            # Names the pose being held; the session works without it. While the
+            # pose is held still, the last label is reused instead of re-classifying.
+            classifier = WorkoutPoseClassifier(POSE_CLASSIFIER_PATH)
+        except (OSError, ValueError, KeyError):
+            classifier = None
     elif category == "Workout & Training":
         motion_reference = load_motion_reference(f"motion_references/{pose_name}_motion.npz")
         if motion_reference is None:
@@ -62,132 +88,147 @@ def run_pose_detection(pose_name="tadasana", category="Yoga & Meditation"):
         st.success("✅ Session started. Your form will now be monitored...")
         coach("start_session")
 
-    process_camera(pose_name, detector, coach, reference_landmarks, motion_reference)
+    process_camera(pose_name, get_detector(), coach, reference_landmarks, motion_reference, classifier)
 
 
-def process_camera(pose_name, detector, coach, reference_landmarks, motion_reference):
-    camera = cv2.VideoCapture(0)
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
+def process_camera(pose_name, detector, coach, reference_landmarks, motion_reference, classifier=None):
+    pipeline = FramePipeline(detector, source=0, flip=True)
     stframe = st.empty()
-    feedback_placeholder = st.empty()
-    accuracy_display = st.empty()
-    reps_display = st.empty()
+    display = DisplaySink(stframe)
+    view = LiveView(refresh_hz=8)
+    feedback_placeholder = view.add("feedback", st.empty())
+    accuracy_display = view.add("accuracy", st.empty())
+    reps_display = view.add("reps", st.empty())
+    latency_display = view.add("latency", st.empty())
+    detected_display = view.add("detected", st.empty())
 
     # Only show stop button when running
     if st.session_state.running:
         st.button("🔚 Stop Session", key="stop_button", on_click=lambda: st.session_state.update({"stop": True}))
 
     last_accuracy = 0
-    motion_buffer = []
+    motion_matcher = StreamingMotionMatcher(motion_reference, band=30) if motion_reference is not None else None
     spoken_tags = set()
     last_feedback = None
-
-    while camera.isOpened():
-        if st.session_state.stop:
-            camera.release()
-            break
-
-        ret, frame = camera.read()
-        if not ret:
-            st.error("❌ Camera error.")
-            break
-
-        frame = cv2.flip(frame, 1)
-
-        results = detector.detect_pose(frame)
-        frame = detector.draw_landmarks(frame, results)
-        named_landmarks = detector.get_named_landmarks(results)
-        raw_landmarks = detector.get_landmarks(results)
-
-        if named_landmarks and category_is_yoga(pose_name):
-            if pose_name == "tadasana":
-                tags = get_feedback_tags(named_landmarks)
-            elif pose_name == "vrikshasana":
-                tags = get_feedback_tags_vrikshasana(named_landmarks)
-            else:
-                tags = []
-
-            print("🧠 Detected Tags:", tags)  # debug
-
-            for tag in tags:
-                if tag not in spoken_tags:
-                    coach(tag)
-                    spoken_tags.add(tag)
-                    st.session_state.feedback_collected.add(tag)
-                    last_feedback = tag
-                    time.sleep(0.5)
-
-            if "pose_correct" in tags:
-                spoken_tags.clear()
-
-        elif raw_landmarks and motion_reference is not None:
-            if not check_enough_landmarks(raw_landmarks):
-                feedback_placeholder.warning("⚠️ Pose not fully visible.")
-                accuracy_display.metric("🎯 Accuracy", "0%")
-                if last_feedback != "pose_not_visible":
-                    coach("pose_not_visible")
-                    last_feedback = "pose_not_visible"
-            else:
-                motion_buffer.append(raw_landmarks)
-                if len(motion_buffer) > 10:
-                    motion_buffer = motion_buffer[-10:]
-
-                accuracy = compute_motion_similarity(motion_buffer, motion_reference)
-                last_accuracy = (0.7 * last_accuracy) + (0.3 * accuracy)
-                accuracy_display.metric("🎯 Accuracy", f"{last_accuracy:.2f}%")
-                reps_display.metric("✅ Reps", st.session_state.reps)
-
-                if accuracy > 80 and not st.session_state.pose_held:
-                    st.session_state.reps += 1
-                    st.session_state.pose_held = True
-                    coach("great_rep")
-
-                if accuracy < 40:
-                    st.session_state.pose_held = False
-
-                if accuracy < 60:
-                    feedback_placeholder.markdown("### ⚠️ Adjust your form!")
-                    coach("adjust_form")
+    metrics = SessionMetricsRecorder()
+
+    if not pipeline.start():
+        close_detector()
+        st.error("❌ Camera error.")
+        return
+
+    try:
+        for packet in pipeline:
+            if st.session_state.stop:
+                break
+            view.render()
+
+            frame = packet.frame
+            results = packet.results
+            frame = detector.draw_landmarks(frame, results)
+            named_landmarks = detector.get_named_landmarks(results)
+            raw_landmarks = detector.get_landmark_array(results)
+
+            if classifier is not None and raw_landmarks is not None:
+                detected_display.caption(f"🧘 Detected pose: {classifier.predict_pose(raw_landmarks)}")
+
+            if named_landmarks and category_is_yoga(pose_name):
+                if pose_name == "tadasana":
+                    tags = get_feedback_tags(named_landmarks)
+                elif pose_name == "vrikshasana":
+                    tags = get_feedback_tags_vrikshasana(named_landmarks)
+                else:
+                    tags = []
+
+                print("🧠 Detected Tags:", tags)  # debug
+
+                for tag in tags:
+                    if tag not in spoken_tags:
+                        coach(tag)
+                        spoken_tags.add(tag)
+                        st.session_state.feedback_collected.add(tag)
+                        metrics.event(tag)
+                        last_feedback = tag
+
+                if "pose_correct" in tags:
+                    spoken_tags.clear()
+
+            elif raw_landmarks is not None and motion_reference is not None:
+                if not check_enough_landmarks(raw_landmarks):
+                    feedback_placeholder.warning("⚠️ Pose not fully visible.")
+                    accuracy_display.metric("🎯 Accuracy", "0%")
+                    if last_feedback != "pose_not_visible":
+                        coach("pose_not_visible")
+                        last_feedback = "pose_not_visible"
                 else:
-                    feedback_placeholder.markdown("### ✅ Looking good!")
+                    accuracy, phase = motion_matcher.update(raw_landmarks)
+                    last_accuracy = (0.7 * last_accuracy) + (0.3 * accuracy)
+                    metrics.frame("accuracy", accuracy)
+                    phase_text = f"{phase * 100:.0f}% through rep" if phase is not None else "searching..."
+                    accuracy_display.metric("🎯 Accuracy", f"{last_accuracy:.2f}%", phase_text, delta_color="off")
+                    reps_display.metric("✅ Reps", st.session_state.reps)
+
+                    if accuracy > 80 and not st.session_state.pose_held:
+                        st.session_state.reps += 1
+                        st.session_state.pose_held = True
+                        metrics.rep("rep_accuracy", accuracy)
+                        coach("great_rep")
+
+                    if accuracy < 40:
+                        st.session_state.pose_held = False
+
+                    if accuracy < 60:
+                        feedback_placeholder.markdown("### ⚠️ Adjust your form!")
+                        coach("adjust_form")
+                    else:
+                        feedback_placeholder.markdown("### ✅ Looking good!")
+
+            elif named_landmarks and reference_landmarks is not None:
+                if not check_enough_landmarks(raw_landmarks):
+                    feedback_placeholder.warning("⚠️ Pose not fully visible.")
+                    accuracy_display.metric("🎯 Accuracy", "0%")
+                    if last_feedback != "pose_not_visible":
+                        coach("pose_not_visible")
+                        last_feedback = "pose_not_visible"
+                else:
+                    accuracy = compute_pose_accuracy(raw_landmarks, reference_landmarks)
+                    last_accuracy = (0.7 * last_accuracy) + (0.3 * accuracy)
+                    metrics.frame("accuracy", accuracy)
+                    accuracy_display.metric("🎯 Accuracy", f"{last_accuracy:.2f}%")
+
+                    if last_accuracy >= 90 and last_feedback != "pose_correct":
+                        feedback_placeholder.success("✅ Excellent posture!")
+                        coach("pose_correct")
+                        last_feedback = "pose_correct"
+
+                    elif last_accuracy >= 75 and last_feedback != "minor_correction":
+                        feedback_placeholder.warning("⚠️ Minor Adjustments Needed!")
+                        coach("minor_correction")
+                        last_feedback = "minor_correction"
+
+                    elif last_feedback != "major_correction":
+                        feedback_placeholder.error("❌ Major correction needed.")
+                        coach("major_correction")
+                        last_feedback = "major_correction"
 
-        elif named_landmarks and reference_landmarks is not None:
-            if not check_enough_landmarks(raw_landmarks):
-                feedback_placeholder.warning("⚠️ Pose not fully visible.")
-                accuracy_display.metric("🎯 Accuracy", "0%")
+            else:
+                feedback_placeholder.warning("⚠️ No pose detected.")
                 if last_feedback != "pose_not_visible":
                     coach("pose_not_visible")
                     last_feedback = "pose_not_visible"
-            else:
-                accuracy = compute_pose_accuracy(raw_landmarks, reference_landmarks)
-                last_accuracy = (0.7 * last_accuracy) + (0.3 * accuracy)
-                accuracy_display.metric("🎯 Accuracy", f"{last_accuracy:.2f}%")
-
-                if last_accuracy >= 90 and last_feedback != "pose_correct":
-                    feedback_placeholder.success("✅ Excellent posture!")
-                    coach("pose_correct")
-                    last_feedback = "pose_correct"
-
-                elif last_accuracy >= 75 and last_feedback != "minor_correction":
-                    feedback_placeholder.warning("⚠️ Minor Adjustments Needed!")
-                    coach("minor_correction")
-                    last_feedback = "minor_correction"
-
-                elif last_feedback != "major_correction":
-                    feedback_placeholder.error("❌ Major correction needed.")
-                    coach("major_correction")
-                    last_feedback = "major_correction"
-
-        else:
-            feedback_placeholder.warning("⚠️ No pose detected.")
-            if last_feedback != "pose_not_visible":
-                coach("pose_not_visible")
-                last_feedback = "pose_not_visible"
 
-        cv2.imwrite(temp_file.name, frame)
-        stframe.image(temp_file.name, channels="BGR", use_container_width=True)
+            display.show(frame)
+            latency_display.caption(f"⏱️ {pipeline.fps:.1f} FPS | {packet.latency_ms:.0f} ms latency | {detector.quality_label()} | 💤 {detector.gate.skip_ratio:.0%} skipped | {display.caption()}")
+    finally:
+        pipeline.stop()
 
-        time.sleep(0.1)
+    view.render(force=True)
+    print(f"📊 Display: {display.stats()} | UI: {view.stats()} | Pose quality: {detector.quality.stats()} | Tracking: {detector.tracking_stats()}")
+    if classifier is not None:
+        print(f"📊 Pose classifier cache: {classifier.cache_stats()}")
+    close_detector()
+    if pipeline.source_failed and not st.session_state.stop:
+        st.error("❌ Camera error.")
 
     duration = round(time.time() - st.session_state.start_time, 2)
 
@@ -195,7 +236,8 @@ def process_camera(pose_name, detector, coach, reference_landmarks, motion_refer
         pose=pose_name,
         reps=st.session_state.reps,
         feedback_list=list(st.session_state.feedback_collected),
-        duration=duration
+        duration=duration,
+        metrics=metrics
     )
 
     st.session_state.running = False
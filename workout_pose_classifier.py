@@ -1,12 +1,87 @@
+import time
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 import joblib
+from backend.feedback_engine.motion_tools import normalize_motion_frames
+from backend.feedback_engine.pose_classifier_runtime import load_classifier
+
+
+class PosePredictionCache:
+    """
+    Reuses the last predicted label while the pose hasn't changed.
+
+    The pose embedding is the hip-centred, torso-scaled body joints. A cached
+    label is returned while the mean joint drift from the embedding that was
+    last classified stays below `drift_threshold` (in torso lengths), and
+    until `max_age_seconds` have passed, after which the pose is re-classified.
+    """
+
+    def __init__(self, drift_threshold=0.05, max_age_seconds=2.0):
+        self.drift_threshold = drift_threshold
+        self.max_age_seconds = max_age_seconds
+        self._anchor = None
+        self._label = None
+        self._classified_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.classify_seconds = 0.0
+
+    def lookup(self, embedding, now):
+        if self._anchor is None or now - self._classified_at > self.max_age_seconds:
+            return None
+        drift = np.linalg.norm(embedding - self._anchor, axis=-1).mean()
+        if drift > self.drift_threshold:
+            return None
+        self.hits += 1
+        return self._label
+
+    def store(self, embedding, label, now, elapsed):
+        self._anchor = embedding
+        self._label = label
+        self._classified_at = now
+        self.misses += 1
+        self.classify_seconds += elapsed
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        avg_classify = self.classify_seconds / self.misses if self.misses else 0.0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+            "classifier_seconds": round(self.classify_seconds, 3),
+            "saved_seconds": round(self.hits * avg_classify, 3),
+        }
+
 
 class WorkoutPoseClassifier:
-    def __init__(self, model_path='Pose_classifier/workout_pose_model.pkl'):
-        self.model = joblib.load(model_path)
+    def __init__(self, model_path='Pose_classifier/workout_pose_model.pkl', use_cache=True,
+                 drift_threshold=0.05, max_age_seconds=2.0):
+        # Exported .npz models run on the NumPy-only runtime; anything else is a pickled sklearn model
+        self.model = load_classifier(model_path) if str(model_path).endswith('.npz') else joblib.load(model_path)
+        self.cache = PosePredictionCache(drift_threshold, max_age_seconds) if use_cache else None
 
     def predict_pose(self, landmarks):
-        input_data = np.array(landmarks).flatten().reshape(1, -1)
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        embedding = None
+        now = time.monotonic()
+        if self.cache is not None and landmarks.size % 33 == 0:
+            embedding = normalize_motion_frames(landmarks.reshape(33, -1))
+            label = self.cache.lookup(embedding, now)
+            if label is not None:
+                return label
+
+        start = time.perf_counter()
+        input_data = landmarks.flatten().reshape(1, -1)
         prediction = self.model.predict(input_data)
+        if embedding is not None:
+            self.cache.store(embedding, prediction[0], now, time.perf_counter() - start)
         return prediction[0]
+
+    def cache_stats(self):
+        """Hit-rate counters and estimated classifier time saved by the cache."""
+        return self.cache.stats() if self.cache is not None else {}